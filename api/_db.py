@@ -0,0 +1,147 @@
+"""
+API 共享数据库访问
+- 模块级连接池：serverless 实例热启动时在多次调用之间复用连接，借出前探测连接是否可用
+- 进程内 TTL 缓存：按规范化后的查询参数缓存结果，
+  最新一次抓取（crawl_records.crawl_time）变化时自动失效
+- 流式查询：服务端游标分批读取，用于逐行输出的大结果集
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import RealDictCursor
+
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+
+POOL_MIN_CONN = 1
+POOL_MAX_CONN = int(os.environ.get('API_POOL_MAX_CONN', 4))
+
+STREAM_BATCH_SIZE = 500   # 流式查询每次从服务端游标读取的行数
+
+CACHE_TTL = 300         # 结果缓存时间（秒）
+VERSION_TTL = 5         # 最新抓取时间的缓存时间（秒），避免每个请求都查询一次
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_cache = {}
+_cache_lock = threading.Lock()
+_version = (0.0, None)
+
+def get_pool():
+    """获取模块级连接池（首次调用时创建）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if not DATABASE_URL:
+                    raise ValueError("DATABASE_URL 环境变量未设置")
+                _pool = ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, DATABASE_URL)
+    return _pool
+
+def _is_alive(conn):
+    """执行 SELECT 1 探测连接：实例空闲期间连接可能已被服务端或网络断开"""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+def _checkout(pool):
+    """
+    借出一个可用的连接，已断开的连接关闭后丢弃；
+    池中空闲连接最多 POOL_MAX_CONN 个，全部丢弃后连接池会新建连接
+    """
+    for _ in range(POOL_MAX_CONN + 1):
+        conn = pool.getconn()
+        if _is_alive(conn):
+            return conn
+        pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("无法从连接池获得可用的数据库连接")
+
+@contextmanager
+def get_connection():
+    """从连接池借出一个连接，用完归还；连接已断开时丢弃"""
+    pool = get_pool()
+    conn = _checkout(pool)
+    try:
+        yield conn
+        conn.rollback()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+def fetch_all(sql, params=None):
+    """执行查询，返回字典列表"""
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+def stream_rows(sql, params=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    使用服务端游标逐批读取查询结果（字典），生成器，内存占用与结果行数无关
+    生成器结束或被关闭时归还连接
+    """
+    with get_connection() as conn:
+        with conn.cursor(name='stream_rows', cursor_factory=RealDictCursor) as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(sql, params)
+            yield from cursor
+
+def fetch_one(sql, params=None):
+    rows = fetch_all(sql, params)
+    return rows[0] if rows else None
+
+def latest_crawl_version():
+    """最新一次抓取的时间，作为缓存版本号"""
+    global _version
+    checked_at, version = _version
+    if time.time() - checked_at < VERSION_TTL:
+        return version
+
+    row = fetch_one("SELECT MAX(crawl_time) AS crawl_time FROM crawl_records")
+    version = row['crawl_time'].isoformat() if row and row['crawl_time'] else None
+    _version = (time.time(), version)
+    return version
+
+def normalize_params(params, keys):
+    """从 parse_qs 结果中取出相关参数，生成与顺序无关的缓存键"""
+    return tuple(
+        (key, tuple(sorted(params[key])))
+        for key in sorted(keys)
+        if key in params
+    )
+
+def cached(name, params, loader, versioned=True):
+    """
+    按 (name, params) 缓存 loader() 的结果
+    versioned 为 True 时，最新抓取时间变化后缓存失效
+    """
+    version = latest_crawl_version() if versioned else None
+    key = (name, params)
+    now = time.time()
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > now and entry[1] == version:
+            return entry[2]
+
+    value = loader()
+
+    with _cache_lock:
+        # 清理过期条目，避免缓存无限增长
+        for expired_key in [k for k, v in _cache.items() if v[0] <= now]:
+            del _cache[expired_key]
+        _cache[key] = (now + CACHE_TTL, version, value)
+
+    return value
@@ -0,0 +1,156 @@
+"""
+API 实时更新分发
+同一进程内的所有 SSE 连接共用一个数据库监听连接：
+- 有订阅者时启动后台线程，LISTEN news_updates，收到通知后按 id 从 news_updates 读取新记录，
+  再分发给每个订阅者的队列；最后一个订阅者退出后线程停止并关闭连接
+- 通知只用来唤醒，读取时取上次分发之后的全部记录，多条通知被合并或重连期间错过的通知都不会丢更新
+- 订阅者来不及消费（队列已满）时被断开，客户端重连后按 Last-Event-ID 补齐
+"""
+
+import os
+import queue
+import select
+import threading
+import time
+
+import psycopg2
+
+from _db import fetch_all
+
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+
+# LISTEN / NOTIFY 频道（与 crawler/updates.py 一致）
+NOTIFY_CHANNEL = 'news_updates'
+
+SUBSCRIBER_QUEUE_SIZE = 100   # 每个订阅者最多积压的更新数
+POLL_SECONDS = 5              # 等待通知的超时，超时后检查是否还有订阅者
+RECONNECT_SECONDS = 5         # 监听连接断开后的重连间隔
+REPLAY_LIMIT = 500            # 断线重连时最多补发的更新数
+
+UPDATES_SQL = """
+    SELECT id, event, platform_id, payload
+    FROM news_updates
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+class Subscription:
+    """一个订阅者：platforms 为空时接收所有平台的更新"""
+
+    def __init__(self, platforms=None):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.platforms = set(platforms or [])
+        self.overflowed = False
+
+    def wants(self, update):
+        # 首页快照等不属于某个平台的更新总是发送
+        return not self.platforms or update['platform_id'] is None or update['platform_id'] in self.platforms
+
+    def get(self, timeout):
+        """等待下一条更新，超时返回 None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class UpdateHub:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_id = None
+
+    def subscribe(self, platforms=None):
+        subscription = Subscription(platforms)
+        with self._lock:
+            if self._thread is None:
+                # 首个订阅者：登记之前读取起始 id，监听线程 LISTEN 之后从这里开始读取，
+                # 两者之间提交的更新不会遗漏；更早的由订阅者按 Last-Event-ID 自行补齐
+                self._last_id = fetch_all("SELECT COALESCE(MAX(id), 0) AS id FROM news_updates")[0]['id']
+                self._thread = threading.Thread(target=self._run, name='update-hub', daemon=True)
+                self._thread.start()
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _publish(self, updates):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for update in updates:
+            for subscription in subscribers:
+                if subscription.overflowed or not subscription.wants(update):
+                    continue
+                try:
+                    subscription.queue.put_nowait(update)
+                except queue.Full:
+                    subscription.overflowed = True
+
+    def _fetch_new(self, cursor):
+        """读取上次分发之后的所有更新"""
+        while True:
+            cursor.execute(UPDATES_SQL, (self._last_id, REPLAY_LIMIT))
+            columns = [column.name for column in cursor.description]
+            updates = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            if not updates:
+                return
+            self._last_id = updates[-1]['id']
+            self._publish(updates)
+            if len(updates) < REPLAY_LIMIT:
+                return
+
+    def _should_stop(self):
+        with self._lock:
+            if not self._subscribers:
+                self._thread = None
+                self._last_id = None
+                return True
+            return False
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                if self._should_stop():
+                    return
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.autocommit = True
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # 补齐 LISTEN 之前提交的更新：首次启动时为读取起始 id 之后的，重连时为断开期间的
+                self._fetch_new(cursor)
+
+                while True:
+                    if self._should_stop():
+                        return
+                    if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self._fetch_new(cursor)
+
+            except Exception as e:
+                print(f"实时更新监听出错，{RECONNECT_SECONDS} 秒后重连: {e}")
+                time.sleep(RECONNECT_SECONDS)
+
+            finally:
+                if conn is not None:
+                    conn.close()
+
+_hub = UpdateHub()
+
+def subscribe(platforms=None):
+    """订阅实时更新，返回 Subscription；用完需调用 unsubscribe"""
+    return _hub.subscribe(platforms)
+
+def unsubscribe(subscription):
+    _hub.unsubscribe(subscription)
+
+def fetch_updates_since(last_id, platforms=None, limit=REPLAY_LIMIT):
+    """读取 id 大于 last_id 的更新（断线重连时补发）"""
+    subscription = Subscription(platforms)
+    return [update for update in fetch_all(UPDATES_SQL, (last_id, limit)) if subscription.wants(update)]
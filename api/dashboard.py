@@ -0,0 +1,83 @@
+from http.server import BaseHTTPRequestHandler
+import json
+from urllib.parse import urlparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _db import fetch_one
+
+# 浏览器每次都向服务器确认；CDN 可缓存一小段时间，过期后先返回旧快照再后台更新
+CACHE_CONTROL = 'public, max-age=0, must-revalidate, s-maxage=30, stale-while-revalidate=60'
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """处理 GET 请求"""
+        path = urlparse(self.path).path
+
+        if path != '/api/dashboard':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        try:
+            self.send_snapshot()
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+
+    def do_OPTIONS(self):
+        """处理 OPTIONS 请求 (CORS 预检)"""
+        self.send_response(200)
+        self.send_cors_headers()
+        self.end_headers()
+
+    def send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+
+    def send_json(self, status, response):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode())
+
+    def client_etags(self):
+        header = self.headers.get('If-None-Match') or ''
+        return {tag.strip().removeprefix('W/').strip('"') for tag in header.split(',') if tag.strip()}
+
+    def send_snapshot(self):
+        """
+        返回爬虫预先生成的首页快照（按主键读取一行）
+        客户端的 If-None-Match 与当前 ETag 相同时返回 304，此时不读取文档内容
+        """
+        etags = self.client_etags()
+        row = fetch_one("""
+            SELECT etag, CASE WHEN etag = ANY(%s) THEN NULL ELSE document END AS document
+            FROM dashboard_snapshot
+            WHERE id = 1
+        """, (list(etags),))
+
+        if not row:
+            self.send_json(503, {'error': '首页快照尚未生成，请等待下一次抓取'})
+            return
+
+        if row['document'] is None:
+            self.send_response(304)
+            self.send_header('ETag', f'"{row["etag"]}"')
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_cors_headers()
+            self.end_headers()
+            return
+
+        body = row['document'].encode()
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', f'"{row["etag"]}"')
+        self.send_header('Cache-Control', CACHE_CONTROL)
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
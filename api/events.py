@@ -0,0 +1,105 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import time
+from urllib.parse import urlparse, parse_qs
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _hub import subscribe, unsubscribe, fetch_updates_since
+
+# 没有更新时发送心跳注释的间隔（秒），避免代理断开空闲连接
+HEARTBEAT_SECONDS = 15
+# 单个连接最长保持的时间（秒），之后由浏览器带 Last-Event-ID 自动重连
+MAX_STREAM_SECONDS = 300
+# 浏览器断线后的重连间隔（毫秒）
+RETRY_MS = 3000
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """处理 GET 请求"""
+        parsed_path = urlparse(self.path)
+        path = parsed_path.path
+        query_params = parse_qs(parsed_path.query)
+
+        if path != '/api/events':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        platforms = [pid.strip() for pid in query_params.get('platform', [''])[0].split(',') if pid.strip()]
+        last_event_id = self.headers.get('Last-Event-ID') or query_params.get('last_event_id', [None])[0]
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            self.send_json(400, {'error': f'Last-Event-ID 无效: {last_event_id}'})
+            return
+
+        self.stream_events(platforms, last_event_id)
+
+    def do_OPTIONS(self):
+        """处理 OPTIONS 请求 (CORS 预检)"""
+        self.send_response(200)
+        self.send_cors_headers()
+        self.end_headers()
+
+    def send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Last-Event-ID')
+
+    def send_json(self, status, response):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode())
+
+    def write_event(self, update):
+        self.wfile.write(
+            f"id: {update['id']}\nevent: {update['event']}\ndata: {update['payload']}\n\n".encode()
+        )
+        self.wfile.flush()
+
+    def stream_events(self, platforms, last_event_id):
+        """
+        以 Server-Sent Events 推送爬虫写入的更新
+        - event: delta，data 为某个平台的变化 {platform_id, crawl_time, new, moved, dropped}
+        - event: snapshot，data 为 {crawl_time, version, etag}，首页快照已更新
+        - platform：只接收这些平台的 delta，逗号分隔
+        带 Last-Event-ID 重连时先补发之后的更新
+        """
+        # 先订阅再补发，补发期间到达的更新在队列中等待，按 id 去重
+        subscription = subscribe(platforms)
+        try:
+            self.send_response(200)
+            self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache, no-transform')
+            self.send_header('X-Accel-Buffering', 'no')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(f"retry: {RETRY_MS}\n\n".encode())
+            self.wfile.flush()
+
+            sent_id = last_event_id or 0
+            if last_event_id is not None:
+                for update in fetch_updates_since(last_event_id, platforms):
+                    self.write_event(update)
+                    sent_id = update['id']
+
+            deadline = time.monotonic() + MAX_STREAM_SECONDS
+            while time.monotonic() < deadline and not subscription.overflowed:
+                update = subscription.get(timeout=HEARTBEAT_SECONDS)
+                if update is None:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                elif update['id'] > sent_id:
+                    self.write_event(update)
+                    sent_id = update['id']
+
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已断开
+            pass
+
+        finally:
+            unsubscribe(subscription)
@@ -0,0 +1,219 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import base64
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _db import stream_rows
+
+# 每页默认 / 最多返回的条目数
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+# 未指定 start 时查询最近多少小时
+DEFAULT_WINDOW_HOURS = 24
+# 累积到该大小（字节）后写出一个分块
+FLUSH_BYTES = 16 * 1024
+
+# 可投影的字段 -> SQL 表达式
+FIELDS = {
+    'id': 'n.id',
+    'title': 'n.title',
+    'platform_id': 'n.platform_id',
+    'platform_name': 'p.name',
+    'rank': 'n.rank',
+    'url': 'n.url',
+    'mobile_url': 'n.mobile_url',
+    'hot_value': 'n.hot_value',
+    'first_crawl_time': 'n.first_crawl_time',
+    'last_crawl_time': 'n.last_crawl_time',
+    'crawl_count': 'n.crawl_count',
+    'topic_id': 'n.topic_id',
+}
+DEFAULT_FIELDS = [
+    'id', 'title', 'platform_id', 'platform_name', 'rank', 'url', 'hot_value',
+    'first_crawl_time', 'last_crawl_time', 'crawl_count',
+]
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+def encode_cursor(last_crawl_time, item_id):
+    payload = json.dumps([last_crawl_time.isoformat(), item_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(value):
+    try:
+        payload = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        last_crawl_time, item_id = json.loads(payload)
+        return datetime.fromisoformat(last_crawl_time), int(item_id)
+    except (ValueError, TypeError):
+        raise ValueError(f"cursor 参数无效: {value}")
+
+def parse_time(name, value):
+    """解析 YYYY-MM-DD 或 ISO 8601 时间，没有时区时按服务器本地时区"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone()
+    except ValueError:
+        raise ValueError(f"{name} 参数格式应为 YYYY-MM-DD 或 ISO 8601 时间: {value}")
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+class handler(BaseHTTPRequestHandler):
+    # 分块传输需要 HTTP/1.1
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """处理 GET 请求"""
+        parsed_path = urlparse(self.path)
+        path = parsed_path.path
+        query_params = parse_qs(parsed_path.query)
+
+        # 路由处理
+        try:
+            if path == '/api/items':
+                query = self.build_query(query_params)
+            else:
+                self.send_json(404, {'error': 'Not found'})
+                return
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        self.stream_items(*query)
+
+    def do_OPTIONS(self):
+        """处理 OPTIONS 请求 (CORS 预检)"""
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+    def send_json(self, status, response):
+        body = json.dumps(response, ensure_ascii=False, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+    def build_query(self, params):
+        """
+        根据查询参数生成 (SQL, 参数, 输出字段, 输出格式, 每页条数)
+        - start / end：last_crawl_time 的范围（end 包含在内），默认最近 24 小时
+        - platform：只返回这些平台，逗号分隔
+        - fields：返回的字段，逗号分隔
+        - limit：每页条数；cursor：上一页返回的 next_cursor
+        - format：ndjson（默认）或 json
+        """
+        def param(name):
+            return params.get(name, [None])[0]
+
+        end = parse_time('end', param('end')) if param('end') else datetime.now().astimezone()
+        start = (parse_time('start', param('start')) if param('start')
+                 else end - timedelta(hours=DEFAULT_WINDOW_HOURS))
+
+        fields = [field.strip() for field in (param('fields') or '').split(',') if field.strip()]
+        fields = fields or DEFAULT_FIELDS
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"不支持的字段: {', '.join(unknown)}，可选: {', '.join(FIELDS)}")
+
+        try:
+            limit = int(param('limit') or DEFAULT_PAGE_SIZE)
+        except ValueError:
+            raise ValueError("limit 参数应为整数")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        output = param('format') or 'ndjson'
+        if output not in FORMATS:
+            raise ValueError(f"format 参数应为 {' 或 '.join(FORMATS)}")
+
+        conditions = ['n.last_crawl_time >= %(start)s', 'n.last_crawl_time <= %(end)s']
+        values = {'start': start, 'end': end, 'limit': limit}
+
+        platforms = [pid.strip() for pid in (param('platform') or '').split(',') if pid.strip()]
+        if platforms:
+            conditions.append('n.platform_id = ANY(%(platforms)s)')
+            values['platforms'] = platforms
+
+        if param('cursor'):
+            values['cursor_time'], values['cursor_id'] = decode_cursor(param('cursor'))
+            conditions.append('(n.last_crawl_time, n.id) < (%(cursor_time)s, %(cursor_id)s)')
+
+        # 游标字段总是查询，只输出请求的字段
+        columns = [f"{FIELDS[field]} AS {field}" for field in fields]
+        columns += ['n.id AS _cursor_id', 'n.last_crawl_time AS _cursor_time']
+        join = 'LEFT JOIN platforms p ON p.id = n.platform_id' if 'platform_name' in fields else ''
+
+        sql = f"""
+            SELECT {', '.join(columns)}
+            FROM news_items n
+            {join}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY n.last_crawl_time DESC, n.id DESC
+            LIMIT %(limit)s
+        """
+        return sql, values, fields, output, limit
+
+    def stream_items(self, sql, values, fields, output, limit):
+        """
+        逐行输出查询结果，按 FLUSH_BYTES 分块写出
+        - ndjson：每行一个条目，最后一行为 {"next_cursor": ...}
+        - json：{"data": [...], "next_cursor": ...}
+        没有下一页时 next_cursor 为 null
+        """
+        self.send_response(200)
+        self.send_header('Content-type', FORMATS[output])
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_cors_headers()
+        self.end_headers()
+
+        ndjson = output == 'ndjson'
+        buffer = bytearray(b'' if ndjson else b'{"data":[')
+        count = 0
+        last = None
+
+        try:
+            for row in stream_rows(sql, values):
+                item = {field: row[field] for field in fields}
+                if ndjson:
+                    buffer += dumps(item).encode() + b'\n'
+                else:
+                    buffer += (b',' if count else b'') + dumps(item).encode()
+                count += 1
+                last = row
+
+                if len(buffer) >= FLUSH_BYTES:
+                    self.write_chunk(bytes(buffer))
+                    buffer.clear()
+
+            next_cursor = (encode_cursor(last['_cursor_time'], last['_cursor_id'])
+                           if count == limit else None)
+            tail = {'next_cursor': next_cursor}
+        except Exception as e:
+            # 状态码已经发出，把错误作为最后一条记录返回
+            tail = {'error': f'查询失败: {e}'}
+
+        if ndjson:
+            buffer += dumps(tail).encode() + b'\n'
+        else:
+            buffer += b'],' + dumps(tail).encode()[1:]
+        self.write_chunk(bytes(buffer))
+        self.wfile.write(b"0\r\n\r\n")
@@ -2,6 +2,14 @@ from http.server import BaseHTTPRequestHandler
 import json
 from urllib.parse import urlparse, parse_qs
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _db import cached, fetch_all
+
+# 单次最多返回的条目数
+MAX_ITEMS_LIMIT = 200
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -10,23 +18,32 @@ class handler(BaseHTTPRequestHandler):
         path = parsed_path.path
         query_params = parse_qs(parsed_path.query)
 
+        # 路由处理
+        status = 200
+        try:
+            if path == '/api/rss/feeds':
+                response = self.get_feeds()
+            elif path == '/api/rss/items':
+                response = self.get_items(query_params)
+            else:
+                status = 404
+                response = {'error': 'Not found'}
+        except ValueError as e:
+            status = 400
+            response = {'error': str(e)}
+        except Exception as e:
+            status = 500
+            response = {'error': f'查询失败: {e}'}
+
         # 设置 CORS 头
-        self.send_response(200)
+        self.send_response(status)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
-        # 路由处理
-        if path == '/api/rss/feeds':
-            response = self.get_feeds()
-        elif path == '/api/rss/items':
-            response = self.get_items(query_params)
-        else:
-            response = {'error': 'Not found'}
-
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode())
+        self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode())
 
     def do_OPTIONS(self):
         """处理 OPTIONS 请求 (CORS 预检)"""
@@ -38,41 +55,34 @@ class handler(BaseHTTPRequestHandler):
 
     def get_feeds(self):
         """获取 RSS 订阅源列表"""
-        # TODO: 实现从 Supabase 查询
-        return {
-            'data': [
-                {
-                    'id': 'hacker-news',
-                    'name': 'Hacker News',
-                    'url': 'https://hnrss.org/frontpage',
-                    'enabled': True
-                },
-                {
-                    'id': 'ruanyifeng',
-                    'name': '阮一峰的网络日志',
-                    'url': 'http://www.ruanyifeng.com/blog/atom.xml',
-                    'enabled': True
-                }
-            ]
-        }
+        def load():
+            rows = fetch_all("""
+                SELECT id, name, url, enabled, max_age_days
+                FROM rss_feeds
+                ORDER BY name
+            """)
+            return {'data': rows}
+
+        return cached('rss_feeds', (), load, versioned=False)
 
     def get_items(self, params):
         """获取 RSS 条目"""
         feed_id = params.get('feed_id', [None])[0]
-        limit = int(params.get('limit', [50])[0])
+        try:
+            limit = int(params.get('limit', [50])[0])
+        except ValueError:
+            raise ValueError("limit 参数应为整数")
+        limit = max(1, min(limit, MAX_ITEMS_LIMIT))
+
+        def load():
+            rows = fetch_all("""
+                SELECT id, feed_id, feed_name, title, link,
+                       published_at, summary, created_at
+                FROM rss_items_with_feed
+                WHERE %(feed_id)s::text IS NULL OR feed_id = %(feed_id)s
+                ORDER BY published_at DESC NULLS LAST, id DESC
+                LIMIT %(limit)s
+            """, {'feed_id': feed_id, 'limit': limit})
+            return {'data': rows}
 
-        # TODO: 实现从 Supabase 查询
-        return {
-            'data': [
-                {
-                    'id': 1,
-                    'feed_id': 'hacker-news',
-                    'feed_name': 'Hacker News',
-                    'title': 'Sample RSS Item',
-                    'link': 'https://example.com',
-                    'published_at': '2025-01-27T10:00:00Z',
-                    'summary': 'This is a sample RSS item',
-                    'created_at': '2025-01-27T10:00:00Z'
-                }
-            ]
-        }
+        return cached('rss_items', (('feed_id', feed_id), ('limit', limit)), load, versioned=False)
@@ -1,11 +1,27 @@
 from http.server import BaseHTTPRequestHandler
 import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from urllib.parse import urlparse, parse_qs
 import os
+import sys
 
-# Supabase 配置
-SUPABASE_URL = os.environ.get('SUPABASE_URL', '')
-SUPABASE_KEY = os.environ.get('SUPABASE_ANON_KEY', '')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _db import cached, fetch_all, normalize_params
+
+# 关键词统计返回的数量
+KEYWORD_LIMIT = 20
+# 每个关键词附带的新闻条数
+KEYWORD_NEWS_LIMIT = 5
+# 平台统计中每个平台附带的热门关键词数
+PLATFORM_TOP_KEYWORDS = 3
+# 飙升榜每个范围保存的条数（与 crawler/rising.py 的 RISING_TOP_K 一致）
+RISING_LIMIT = 20
+# 趋势数据最多查询的天数
+MAX_TREND_DAYS = 90
+# 每日汇总表划分日期使用的时区（与 crawler/rollups.py 一致）
+ROLLUP_TIMEZONE = 'Asia/Shanghai'
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -14,25 +30,36 @@ class handler(BaseHTTPRequestHandler):
         path = parsed_path.path
         query_params = parse_qs(parsed_path.query)
 
+        # 路由处理
+        status = 200
+        try:
+            if path == '/api/stats/platforms':
+                response = self.get_platform_stats(query_params)
+            elif path == '/api/stats/keywords':
+                response = self.get_keyword_stats(query_params)
+            elif path == '/api/stats/trends':
+                response = self.get_trend_data(query_params)
+            elif path == '/api/stats/rising':
+                response = self.get_rising_items(query_params)
+            else:
+                status = 404
+                response = {'error': 'Not found'}
+        except ValueError as e:
+            status = 400
+            response = {'error': str(e)}
+        except Exception as e:
+            status = 500
+            response = {'error': f'查询失败: {e}'}
+
         # 设置 CORS 头
-        self.send_response(200)
+        self.send_response(status)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
-        # 路由处理
-        if path == '/api/stats/platforms':
-            response = self.get_platform_stats(query_params)
-        elif path == '/api/stats/keywords':
-            response = self.get_keyword_stats(query_params)
-        elif path == '/api/stats/trends':
-            response = self.get_trend_data(query_params)
-        else:
-            response = {'error': 'Not found'}
-
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode())
+        self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode())
 
     def do_OPTIONS(self):
         """处理 OPTIONS 请求 (CORS 预检)"""
@@ -42,63 +69,174 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+    @staticmethod
+    def _time_window(params):
+        """
+        根据 date 参数生成查询时间范围
+        指定日期时查询当天（ROLLUP_TIMEZONE 的自然日，与每日汇总表一致），否则查询最近 24 小时
+        """
+        value = params.get('date', [None])[0]
+        if not value:
+            end = datetime.now().astimezone()
+            return end - timedelta(hours=24), end
+
+        try:
+            start = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=ZoneInfo(ROLLUP_TIMEZONE))
+        except ValueError:
+            raise ValueError(f"date 参数格式应为 YYYY-MM-DD: {value}")
+        return start, start + timedelta(days=1)
+
+    @staticmethod
+    def _day(params):
+        """解析 date 参数，未指定时返回 None（表示当天）"""
+        value = params.get('date', [None])[0]
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError(f"date 参数格式应为 YYYY-MM-DD: {value}")
+
     def get_platform_stats(self, params):
         """获取平台统计数据"""
-        # TODO: 实现从 Supabase 查询
-        return {
-            'data': [
-                {
-                    'platform_id': 'weibo',
-                    'platform_name': '微博',
-                    'total_items': 50,
-                    'avg_rank': 25,
-                    'top_keywords': ['热点', '新闻', '科技']
-                },
-                {
-                    'platform_id': 'zhihu',
-                    'platform_name': '知乎',
-                    'total_items': 45,
-                    'avg_rank': 22,
-                    'top_keywords': ['问答', '技术', '生活']
-                }
-            ]
-        }
+        def load():
+            start, end = self._time_window(params)
+            rows = fetch_all("""
+                SELECT
+                    p.id AS platform_id,
+                    p.name AS platform_name,
+                    COUNT(n.id) AS total_items,
+                    COALESCE(ROUND(AVG(n.rank)::numeric, 1), 0)::float AS avg_rank,
+                    COALESCE(k.top_keywords, ARRAY[]::text[]) AS top_keywords
+                FROM platforms p
+                JOIN news_items n ON n.platform_id = p.id
+                LEFT JOIN LATERAL (
+                    SELECT array_agg(t.keyword ORDER BY t.cnt DESC, t.keyword) AS top_keywords
+                    FROM (
+                        SELECT kp.keyword, COUNT(*) AS cnt
+                        FROM keyword_postings kp
+                        WHERE kp.platform_id = p.id
+                        AND kp.first_seen >= %(start)s AND kp.first_seen < %(end)s
+                        GROUP BY kp.keyword
+                        ORDER BY cnt DESC, kp.keyword
+                        LIMIT %(top)s
+                    ) t
+                ) k ON true
+                WHERE n.last_crawl_time >= %(start)s AND n.last_crawl_time < %(end)s
+                GROUP BY p.id, p.name, k.top_keywords
+                ORDER BY total_items DESC
+            """, {'start': start, 'end': end, 'top': PLATFORM_TOP_KEYWORDS})
+            return {'data': rows}
+
+        return cached('platforms', normalize_params(params, ['date']), load)
 
     def get_keyword_stats(self, params):
-        """获取关键词统计数据"""
-        # TODO: 实现从 Supabase 查询
-        return {
-            'data': [
-                {
-                    'keyword': 'AI',
-                    'count': 120,
-                    'platforms': ['weibo', 'zhihu', 'toutiao'],
-                    'news_items': []
-                },
-                {
-                    'keyword': '科技',
-                    'count': 95,
-                    'platforms': ['toutiao', 'ithome'],
-                    'news_items': []
-                }
-            ]
-        }
+        """获取关键词统计数据（读取爬虫入库时建立的关键词索引）"""
+        day = self._day(params)
+
+        def load():
+            rows = fetch_all("""
+                WITH top AS (
+                    SELECT keyword, item_count, platforms
+                    FROM keyword_counts
+                    WHERE day = COALESCE(%(day)s::date, (NOW() AT TIME ZONE %(tz)s)::date)
+                    ORDER BY item_count DESC, keyword
+                    LIMIT %(limit)s
+                )
+                SELECT
+                    t.keyword,
+                    t.item_count AS count,
+                    t.platforms,
+                    COALESCE(m.news_items, '[]'::json) AS news_items
+                FROM top t
+                LEFT JOIN LATERAL (
+                    SELECT json_agg(json_build_object(
+                        'id', i.id,
+                        'title', i.title,
+                        'platform_id', i.platform_id,
+                        'rank', i.rank,
+                        'url', i.url,
+                        'last_crawl_time', i.last_crawl_time
+                    ) ORDER BY i.last_crawl_time DESC) AS news_items
+                    FROM (
+                        SELECT n.id, n.title, n.platform_id, n.rank, n.url, n.last_crawl_time
+                        FROM keyword_postings kp
+                        JOIN news_items n ON n.id = kp.news_item_id
+                        WHERE kp.keyword = t.keyword
+                        ORDER BY n.last_crawl_time DESC
+                        LIMIT %(news_limit)s
+                    ) i
+                ) m ON true
+                ORDER BY t.item_count DESC, t.keyword
+            """, {
+                'day': day,
+                'tz': ROLLUP_TIMEZONE,
+                'limit': KEYWORD_LIMIT,
+                'news_limit': KEYWORD_NEWS_LIMIT,
+            })
+            return {'data': rows}
+
+        return cached('keywords', normalize_params(params, ['date']), load)
 
     def get_trend_data(self, params):
         """获取趋势数据"""
-        days = int(params.get('days', [7])[0])
-        # TODO: 实现从 Supabase 查询
-        return {
-            'data': [
-                {
-                    'date': '2025-01-26',
-                    'count': 150,
-                    'platforms': {'weibo': 50, 'zhihu': 45, 'toutiao': 55}
-                },
-                {
-                    'date': '2025-01-27',
-                    'count': 165,
-                    'platforms': {'weibo': 55, 'zhihu': 50, 'toutiao': 60}
-                }
-            ]
-        }
+        try:
+            days = int(params.get('days', [7])[0])
+        except ValueError:
+            raise ValueError("days 参数应为整数")
+        days = max(1, min(days, MAX_TREND_DAYS))
+
+        def load():
+            # 读取爬虫维护的每日汇总表，只涉及 天数 × 平台数 行
+            rows = fetch_all("""
+                SELECT
+                    to_char(day, 'YYYY-MM-DD') AS date,
+                    platform_id,
+                    item_count AS count
+                FROM platform_stats_daily
+                WHERE day > (NOW() AT TIME ZONE %s)::date - %s
+                ORDER BY day, platform_id
+            """, (ROLLUP_TIMEZONE, days))
+
+            trends = {}
+            for row in rows:
+                day = trends.setdefault(row['date'], {'date': row['date'], 'count': 0, 'platforms': {}})
+                day['platforms'][row['platform_id']] = row['count']
+                day['count'] += row['count']
+            return {'data': list(trends.values())}
+
+        return cached('trends', (('days', days),), load)
+
+    def get_rising_items(self, params):
+        """获取飙升榜：读取爬虫每次运行后计算好的 rising_items，不扫描排名历史"""
+        scope = params.get('platform', ['all'])[0] or 'all'
+        try:
+            limit = int(params.get('limit', [RISING_LIMIT])[0])
+        except ValueError:
+            raise ValueError("limit 参数应为整数")
+        limit = max(1, min(limit, RISING_LIMIT))
+
+        def load():
+            rows = fetch_all("""
+                SELECT
+                    r.news_item_id AS id,
+                    r.title,
+                    r.platform_id,
+                    p.name AS platform_name,
+                    r.url,
+                    r.rank,
+                    r.previous_rank,
+                    r.rank_delta,
+                    r.hot_value,
+                    r.hot_growth,
+                    r.score,
+                    r.crawl_time
+                FROM rising_items r
+                LEFT JOIN platforms p ON p.id = r.platform_id
+                WHERE r.scope = %s
+                ORDER BY r.position
+                LIMIT %s
+            """, (scope, limit))
+            return {'data': rows}
+
+        return cached('rising', (('platform', scope), ('limit', limit)), load)
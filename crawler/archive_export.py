@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+TrendRadar 历史数据列式归档
+把已经结束的时间范围（UTC 整天）内的 news_items / rank_history 导出为按日期分区的 Parquet：
+- 使用服务端游标分批读取，每批转换成一个 row group 后立即写出，内存占用与导出范围大小无关
+- platform_id / title 使用字典编码；rank_history 附带条目的平台和标题，原条目被清理后仍可单独分析。
+  平台和标题在导出时从 news_items 关联得到，而新闻只保留 NEWS_RETENTION_DAYS 天：
+  需要在 maintenance.py 清理新闻之前导出（工作流每天 UTC 0 点导出前一天），更早的日期这两列为空，
+  导出时会提示并统计缺失的行数
+- news_items 按最后一次抓取的日期（last_crawl_time）分区：导出时这些条目的抓取次数等字段已不再变化，
+  已导出的日期不必重新导出；条目之后重新上榜时会在更晚的日期再出现一次，分析时按 id 取 last_crawl_time 最大的一行
+- 目录结构为 <输出目录>/<表名>/date=YYYY-MM-DD/part-0.parquet（hive 分区），已存在的日期默认跳过
+
+read_archive() 以内存映射方式读取归档，用于离线查询
+
+使用方法:
+    python archive_export.py --days 1 --out ./archive                     # 导出昨天（每天在清理新闻前运行）
+    python archive_export.py --days 30 --out ./archive                    # 导出最近 30 个整天
+    python archive_export.py --start 2026-01-01 --end 2026-02-01 --out ./archive
+    python archive_export.py --days 7 --out ./archive --tables rank_history --overwrite
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, date, timedelta, timezone
+import psycopg2
+
+from maintenance import NEWS_RETENTION_DAYS
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    print("请安装依赖: pip install pyarrow")
+    sys.exit(1)
+
+# 每批读取的行数，同时也是每个 row group 的行数
+BATCH_ROWS = 50000
+
+STRING_DICT = pa.dictionary(pa.int32(), pa.string())
+TIMESTAMP = pa.timestamp('us', tz='UTC')
+
+# 从 news_items 关联得到的列：条目已被清理时为空
+JOINED_COLUMNS = {'rank_history': 'platform_id'}
+
+# 表名 -> (查询语句, 结构)；查询按日期列取半开区间 [start, end)
+EXPORTS = {
+    'news_items': ("""
+        SELECT id, platform_id, title, url, rank, hot_value,
+               first_crawl_time, last_crawl_time, crawl_count, topic_id
+        FROM news_items
+        WHERE last_crawl_time >= %s AND last_crawl_time < %s
+        ORDER BY last_crawl_time
+    """, pa.schema([
+        ('id', pa.int64()),
+        ('platform_id', STRING_DICT),
+        ('title', STRING_DICT),
+        ('url', pa.string()),
+        ('rank', pa.int32()),
+        ('hot_value', pa.string()),
+        ('first_crawl_time', TIMESTAMP),
+        ('last_crawl_time', TIMESTAMP),
+        ('crawl_count', pa.int32()),
+        ('topic_id', pa.int64()),
+    ])),
+    'rank_history': ("""
+        SELECT rh.id, rh.news_item_id, n.platform_id, n.title,
+               rh.rank, rh.hot_value, rh.crawl_time
+        FROM rank_history rh
+        LEFT JOIN news_items n ON n.id = rh.news_item_id
+        WHERE rh.crawl_time >= %s AND rh.crawl_time < %s
+        ORDER BY rh.crawl_time
+    """, pa.schema([
+        ('id', pa.int64()),
+        ('news_item_id', pa.int64()),
+        ('platform_id', STRING_DICT),
+        ('title', STRING_DICT),
+        ('rank', pa.int32()),
+        ('hot_value', pa.string()),
+        ('crawl_time', TIMESTAMP),
+    ])),
+}
+
+def get_database_connection():
+    """获取数据库连接"""
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        raise ValueError("DATABASE_URL 环境变量未设置")
+    return psycopg2.connect(db_url)
+
+def partition_path(out_dir, table, day):
+    return os.path.join(out_dir, table, f"date={day.isoformat()}", 'part-0.parquet')
+
+def to_record_batch(rows, schema):
+    """把一批查询结果转换成 RecordBatch，字典类型的列在批内编码"""
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=field.type.value_type).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def export_day(conn, table, day, out_dir, batch_rows=BATCH_ROWS):
+    """
+    导出一张表某一天（UTC）的数据，返回 (行数, 关联不到 news_items 的行数)；当天没有数据时不生成文件
+    """
+    query, schema = EXPORTS[table]
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    path = partition_path(out_dir, table, day)
+    tmp_path = f"{path}.tmp"
+    writer = None
+    total = 0
+    missing = 0
+    joined = schema.get_field_index(JOINED_COLUMNS[table]) if table in JOINED_COLUMNS else None
+
+    # 命名游标即服务端游标，每次只从数据库取 batch_rows 行
+    cursor = conn.cursor(name=f"archive_{table}_{day.strftime('%Y%m%d')}")
+    cursor.itersize = batch_rows
+
+    try:
+        cursor.execute(query, (start, start + timedelta(days=1)))
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            if writer is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+            writer.write_batch(to_record_batch(rows, schema))
+            total += len(rows)
+            if joined is not None:
+                missing += sum(1 for row in rows if row[joined] is None)
+
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, path)
+
+    finally:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        cursor.close()
+        conn.rollback()
+
+    return total, missing
+
+def export_range(conn, start, end, out_dir, tables=None, overwrite=False):
+    """导出 [start, end) 之间的整天数据；end 不能晚于今天（UTC），避免导出仍在写入的日期"""
+    today = datetime.now(timezone.utc).date()
+    if end > today:
+        raise ValueError(f"只能导出已经结束的日期，结束日期不能晚于 {today.isoformat()}")
+
+    # 早于该日期的数据，关联的新闻条目可能已被 maintenance.py 清理
+    purged_before = (datetime.now(timezone.utc) - timedelta(days=NEWS_RETENTION_DAYS)).date()
+    if start < purged_before and any(table in JOINED_COLUMNS for table in tables or EXPORTS):
+        print(f"⚠️  {start.isoformat()} ~ {min(end, purged_before).isoformat()} 早于新闻保留期（{NEWS_RETENTION_DAYS} 天），"
+              f"其中已被清理的条目导出后平台和标题为空")
+
+    for table in tables or EXPORTS:
+        exported_days = 0
+        exported_rows = 0
+        missing_rows = 0
+        day = start
+        while day < end:
+            if overwrite or not os.path.exists(partition_path(out_dir, table, day)):
+                rows, missing = export_day(conn, table, day, out_dir)
+                if rows:
+                    exported_days += 1
+                    exported_rows += rows
+                if missing:
+                    missing_rows += missing
+                    print(f"  ⚠️  {table} {day.isoformat()}: {missing}/{rows} 行关联不到新闻条目，平台和标题为空")
+            day += timedelta(days=1)
+        print(f"✓ {table}: 导出 {exported_days} 天，共 {exported_rows} 行"
+              + (f"，其中 {missing_rows} 行缺少平台和标题" if missing_rows else ""))
+
+def read_archive(out_dir, table, start=None, end=None, columns=None):
+    """
+    以内存映射方式读取归档，返回 pyarrow.Table
+    start / end 为日期（[start, end) 半开区间），只读取范围内的分区
+    """
+    filters = []
+    if start is not None:
+        filters.append(('date', '>=', start.isoformat()))
+    if end is not None:
+        filters.append(('date', '<', end.isoformat()))
+
+    return pq.read_table(
+        os.path.join(out_dir, table),
+        columns=columns,
+        filters=filters or None,
+        memory_map=True,
+        partitioning=ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive'),
+    )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='把 TrendRadar 历史数据导出为按日期分区的 Parquet')
+    parser.add_argument('--out', required=True, help='输出目录')
+    parser.add_argument('--start', type=date.fromisoformat, default=None, help='开始日期（含），YYYY-MM-DD')
+    parser.add_argument('--end', type=date.fromisoformat, default=None,
+                        help='结束日期（不含），YYYY-MM-DD，默认今天（UTC）')
+    parser.add_argument('--days', type=int, default=None, help='导出结束日期之前的 N 天')
+    parser.add_argument('--tables', default=','.join(EXPORTS), help='要导出的表，逗号分隔')
+    parser.add_argument('--overwrite', action='store_true', help='重新导出已存在的日期')
+    args = parser.parse_args()
+
+    if args.start is None and args.days is None:
+        parser.error('需要指定 --start 或 --days')
+    args.tables = [table.strip() for table in args.tables.split(',') if table.strip()]
+    unknown = [table for table in args.tables if table not in EXPORTS]
+    if unknown:
+        parser.error(f"不支持的表: {', '.join(unknown)}，可选: {', '.join(EXPORTS)}")
+    return args
+
+if __name__ == '__main__':
+    args = parse_args()
+    end = args.end or datetime.now(timezone.utc).date()
+    start = args.start or end - timedelta(days=args.days)
+
+    print(f"开始导出 {start.isoformat()} ~ {end.isoformat()}（不含）的历史数据到 {args.out}")
+    conn = get_database_connection()
+    try:
+        export_range(conn, start, end, args.out, args.tables, args.overwrite)
+    except Exception as e:
+        print(f"❌ 导出失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        conn.close()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+TrendRadar 爬虫性能基准
+用 fixtures/ 中录制的响应回放各平台的解析函数，并在本地 Postgres 上回放数据库写入，
+输出每个用例的吞吐量、最短 / p50 / p99 耗时和内存峰值；与 baseline.json 比较，退化超过容差时以非零状态退出
+
+使用方法:
+    python benchmarks/bench.py                      # 运行全部用例并与基线比较
+    python benchmarks/bench.py --save-baseline      # 以本次结果作为新的基线
+    python benchmarks/bench.py --filter v2.         # 只运行名称包含 v2. 的用例
+    python benchmarks/bench.py --ci                 # 没有基线文件时也以非零状态退出
+    python benchmarks/bench.py --record             # 从线上重新录制 fixtures
+
+数据库用例需要设置 BENCH_DATABASE_URL（已执行 supabase/schema.sql 的本地数据库），
+每次迭代结束后回滚，不会留下数据
+"""
+
+import os
+import io
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import crawler
+import http_client
+import registry
+import html_parser
+import rising
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+DEFAULT_ITERATIONS = 200
+DEFAULT_DB_ITERATIONS = 20
+# 解析用例的迭代次数平均分成的轮数：每个用例取各轮最短耗时的中位数，个别轮次受机器负载影响时不改变结果
+DEFAULT_ROUNDS = 25
+# 相对基线允许的退化比例
+DEFAULT_TOLERANCE = 0.25
+# 耗时增加不超过该值（毫秒）时不算退化：亚毫秒级用例的计时抖动会超过相对容差
+MIN_REGRESSION_MS = 0.1
+# 基线比较的指标：耗时比较各轮最短耗时的中位数，机器负载造成的噪声只会让耗时变长，比 p50 稳定
+COMPARED_METRICS = ('min_ms', 'peak_kb')
+# 校准用例：只用标准库，不依赖被测代码；比较耗时前按它相对基线的快慢缩放基线，抵消机器整体负载的变化
+CALIBRATION_CASE = 'calibration'
+
+# crawler_v2 各平台插件对应的 fixture 文件
+V2_FIXTURES = {
+    'weibo': 'weibo.html',
+    'zhihu': 'zhihu.json',
+    'bilibili': 'bilibili.json',
+    'baidu': 'baidu.html',
+}
+
+def newsnow_fixture(platform_id):
+    return f'newsnow_{platform_id}.json'
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+def record_fixtures():
+    """从线上重新录制所有 fixtures，失败的平台保留原文件"""
+    targets = [
+        (newsnow_fixture(pid), crawler.get_platform_url(pid), crawler.HEADERS)
+        for pid in crawler.PLATFORMS
+    ]
+    for pid, name in V2_FIXTURES.items():
+        platform = registry.load_platform(pid)
+        targets.append((name, platform.url, platform.headers))
+
+    for name, url, headers in targets:
+        try:
+            response = http_client.get(url, headers=headers)
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            with open(os.path.join(FIXTURES_DIR, name), 'w', encoding='utf-8') as f:
+                f.write(response.text)
+            print(f"  ✓ {name}: {len(response.text)} 字符")
+        except Exception as e:
+            print(f"  ❌ {name}: {e}")
+
+    http_client.close_client()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def time_samples(func, iterations, setup=None, teardown=None):
+    """运行 func 若干次，返回 (每次耗时的列表, 处理的条目总数)；func 返回本次处理的条目数"""
+    samples = []
+    total_items = 0
+    for _ in range(iterations):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        total_items += func(state)
+        samples.append(time.perf_counter() - start)
+        if teardown:
+            teardown(state)
+    return samples, total_items
+
+def peak_memory_kb(func, setup=None, teardown=None):
+    """单独运行一次 func，测量内存峰值：计时时不开启 tracemalloc，避免其开销影响耗时"""
+    state = setup() if setup else None
+    tracemalloc.start()
+    try:
+        func(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if teardown:
+            teardown(state)
+    return round(peak / 1024, 1)
+
+def summarize(samples, total_items, peak_kb, round_mins=None):
+    """
+    汇总耗时样本；min_ms 为各轮最短耗时的中位数（只有一轮时即最短耗时）：
+    机器负载的变化可以持续数秒，单次最短耗时在两次运行之间相差可达一倍，各轮的中位数稳定得多
+    """
+    elapsed = sum(samples)
+    round_mins = round_mins or [min(samples)]
+    return {
+        'iterations': len(samples),
+        'items_per_sec': round(total_items / elapsed, 1) if elapsed else 0.0,
+        'min_ms': round(statistics.median(round_mins) * 1000, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'peak_kb': peak_kb,
+    }
+
+def measure(func, iterations, setup=None, teardown=None):
+    """运行 func 若干次并汇总耗时和内存峰值"""
+    samples, total_items = time_samples(func, iterations, setup, teardown)
+    return summarize(samples, total_items, peak_memory_kb(func, setup, teardown))
+
+def parser_cases():
+    """各平台解析函数的用例：{名称: 解析函数(无参)}"""
+    cases = {}
+
+    for pid in crawler.PLATFORMS:
+        text = load_fixture(newsnow_fixture(pid))
+        cases[f'newsnow.{pid}'] = (
+            lambda text=text, pid=pid: crawler.parse_platform_data(pid, json.loads(text))
+        )
+
+    for pid, name in V2_FIXTURES.items():
+        text = load_fixture(name)
+        cases[f'v2.{pid}'] = lambda text=text, platform=registry.load_platform(pid): platform.parse(text)
+
+    # 微博页面按各解析后端分别测量，便于比较
+    text = load_fixture(V2_FIXTURES['weibo'])
+    weibo = registry.load_platform('weibo')
+    for backend in html_parser.HTML_PARSERS:
+        if backend == 'lxml' and html_parser.get_html_parser() != 'lxml':
+            continue
+        cases[f'v2.weibo[{backend}]'] = (
+            lambda backend=backend: weibo.parse(text, parser=backend)
+        )
+
+    return cases
+
+def rising_case(platforms=40, items=50, crawls=24, seed=0):
+    """飙升榜计算用例：随机生成一个窗口的排名历史（每小时一次抓取），只测量向量化计算部分"""
+    rng = random.Random(seed)
+    rows = []
+    for item_id in range(platforms * items):
+        first = rng.randrange(crawls)
+        first_seen = first * 3600.0 if rng.random() < 0.5 else -1e9
+        for crawl in range(first, crawls):
+            rows.append((item_id, crawl * 3600.0, rng.randrange(items),
+                         f"{rng.randrange(1, 10000)}万", item_id // items, first_seen))
+
+    item_ids, times, ranks, hot_values, platform_codes, first_seen = zip(*rows)
+    arrays = (
+        rising.np.array(item_ids, dtype=rising.np.int64),
+        rising.np.array(times),
+        rising.np.array(ranks, dtype=rising.np.float64),
+        rising.parse_hot_values(hot_values),
+        rising.np.array(platform_codes, dtype=rising.np.int64),
+        rising.np.array(first_seen),
+    )
+    return lambda: rising.compute_scores(*arrays)[0].tolist()
+
+def calibration_case(size=2000, seed=0):
+    """校准用例：JSON 编解码、正则匹配和排序，与解析用例的开销类型相近"""
+    rng = random.Random(seed)
+    text = json.dumps([
+        {'title': f"标题{rng.randrange(10 ** 6)}", 'hot': f"{rng.randrange(1, 10000)}万"}
+        for _ in range(size)
+    ], ensure_ascii=False)
+    pattern = re.compile(r'(\d+)万')
+
+    def run():
+        rows = json.loads(text)
+        return sorted(int(pattern.match(row['hot']).group(1)) for row in rows)
+
+    return run
+
+def run_parser_benchmarks(iterations, name_filter, rounds=DEFAULT_ROUNDS):
+    results = {}
+    cases = parser_cases()
+    cases['rising.scores'] = rising_case()
+    cases = {CALIBRATION_CASE: calibration_case(), **cases}
+    cases = {name: parse for name, parse in cases.items()
+             if not name_filter or name_filter in name or name == CALIBRATION_CASE}
+    for name, parse in cases.items():
+        if not parse():
+            raise ValueError(f"{name}: fixture 没有解析出任何条目，请检查 fixture 或解析函数")
+
+    # 迭代次数平均分到各轮，各轮交替运行所有用例，机器负载的变化会分摊到每个用例
+    per_round = max(1, iterations // rounds)
+    samples = {name: [] for name in cases}
+    round_mins = {name: [] for name in cases}
+    items = dict.fromkeys(cases, 0)
+    for _ in range(rounds):
+        for name, parse in cases.items():
+            measured, count = time_samples(lambda _: len(parse()), per_round)
+            samples[name].extend(measured)
+            round_mins[name].append(min(measured))
+            items[name] += count
+
+    for name, parse in cases.items():
+        peak_kb = peak_memory_kb(lambda _: len(parse()))
+        results[name] = summarize(samples[name], items[name], peak_kb, round_mins[name])
+    return results
+
+class _UncommittedConnection:
+    """包装数据库连接：忽略 commit，使写入路径的多个事务都在同一个事务中，结束时整体回滚"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+def fixture_items():
+    """所有平台 fixture 解析出的条目，作为写库用例的输入"""
+    return [items for items in (parse() for parse in parser_cases().values()) if items]
+
+def reshuffle(items, rng, new_ratio=0.2):
+    """模拟下一次抓取：打乱排名，替换一部分标题为新标题"""
+    batch = [dict(item) for item in items]
+    rng.shuffle(batch)
+    for rank, item in enumerate(batch, 1):
+        item['rank'] = rank
+        if rng.random() < new_ratio:
+            item['title'] = f"{item['title']} #{rng.randrange(10**6)}"
+    return batch
+
+def run_db_benchmarks(db_url, iterations, name_filter):
+    """回放数据库写入：insert 为全部新标题，update 为已有数据上的增量写入"""
+    import psycopg2
+    from db_writer import CrawlRun, update_database
+
+    raw_conn = psycopg2.connect(db_url)
+    conn = _UncommittedConnection(raw_conn)
+    batches = fixture_items()
+    rng = random.Random(0)
+    crawl_time = [datetime.now()]
+
+    def write(state):
+        run = CrawlRun(crawl_time[0])
+        count = 0
+        with redirect_stdout(io.StringIO()):
+            for items in state:
+                update_database(conn, items, run)
+                count += len(items)
+            run.save(conn)
+        return count
+
+    def seeded():
+        write(batches)
+        crawl_time[0] += timedelta(minutes=30)
+        return [reshuffle(items, rng) for items in batches]
+
+    def rollback(_):
+        raw_conn.rollback()
+        crawl_time[0] = datetime.now()
+
+    cases = {
+        'db.insert': lambda: batches,
+        'db.update': seeded,
+    }
+
+    results = {}
+    try:
+        for name, setup in cases.items():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = measure(write, iterations, setup=setup, teardown=rollback)
+    finally:
+        raw_conn.rollback()
+        raw_conn.close()
+    return results
+
+def machine_scale(results, baseline):
+    """本机相对生成基线时的快慢：校准用例本次最短耗时 / 基线最短耗时，缺少校准数据时为 1"""
+    current = results.get(CALIBRATION_CASE, {}).get('min_ms')
+    base = baseline.get(CALIBRATION_CASE, {}).get('min_ms')
+    return current / base if current and base else 1.0
+
+def compare(results, baseline, tolerance):
+    """返回超过容差的退化项：[(用例, 指标, 基线值, 本次值)]，耗时基线先按校准用例缩放"""
+    scale = machine_scale(results, baseline)
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base or name == CALIBRATION_CASE:
+            continue
+        for metric in COMPARED_METRICS:
+            expected = base.get(metric)
+            if expected and metric == 'min_ms':
+                expected = round(expected * scale, 3)
+            if not expected or metrics[metric] <= expected * (1 + tolerance):
+                continue
+            if metric == 'min_ms' and metrics[metric] - expected <= MIN_REGRESSION_MS:
+                continue
+            regressions.append((name, metric, expected, metrics[metric]))
+    return regressions
+
+def print_results(results, baseline):
+    print(f"{'用例':<24}{'items/s':>12}{'min(ms)':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'峰值(KB)':>10}{'min 对比基线':>14}")
+    for name, m in results.items():
+        base = baseline.get(name, {}).get('min_ms')
+        delta = f"{(m['min_ms'] / base - 1) * 100:+.1f}%" if base else '-'
+        print(f"{name:<24}{m['items_per_sec']:>12}{m['min_ms']:>10}{m['p50_ms']:>10}{m['p99_ms']:>10}"
+              f"{m['peak_kb']:>10}{delta:>14}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='TrendRadar 爬虫解析与写库性能基准')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='解析用例的迭代次数')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help='解析用例的迭代次数平均分成的轮数，取各轮最短耗时的中位数')
+    parser.add_argument('--db-iterations', type=int, default=DEFAULT_DB_ITERATIONS, help='写库用例的迭代次数')
+    parser.add_argument('--filter', default=None, help='只运行名称包含该字符串的用例')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='相对基线允许的退化比例')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='基线文件路径')
+    parser.add_argument('--save-baseline', action='store_true', help='以本次结果覆盖基线')
+    parser.add_argument('--ci', action='store_true', help='CI 模式：没有基线文件时以非零状态退出')
+    parser.add_argument('--record', action='store_true', help='从线上重新录制 fixtures 后退出')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if args.record:
+        print("开始录制 fixtures...")
+        record_fixtures()
+        sys.exit(0)
+
+    print(f"开始性能基准 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    results = run_parser_benchmarks(args.iterations, args.filter, args.rounds)
+
+    db_url = os.environ.get('BENCH_DATABASE_URL')
+    if db_url:
+        results.update(run_db_benchmarks(db_url, args.db_iterations, args.filter))
+    else:
+        print("⚠️  未设置 BENCH_DATABASE_URL，跳过写库用例\n")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        # 只覆盖本次运行过的用例，保留其他用例的基线
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\n✓ 基线已保存到 {args.baseline}")
+        sys.exit(0)
+
+    if not baseline:
+        print("\n⚠️  没有基线文件，使用 --save-baseline 生成")
+        sys.exit(1 if args.ci else 0)
+
+    # 没有基线的用例（如未提交基线的写库用例）只提示，不参与比较
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"\n⚠️  以下用例没有基线，跳过比较: {', '.join(missing)}")
+
+    print(f"\n本机相对基线的耗时比例（校准用例）: {machine_scale(results, baseline):.2f}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ 性能退化超过 {args.tolerance:.0%}:")
+        for name, metric, base, value in regressions:
+            print(f"  {name} {metric}: {base} -> {value}")
+        sys.exit(1)
+
+    print(f"\n✓ 所有用例均在基线 {args.tolerance:.0%} 容差范围内")
@@ -0,0 +1,112 @@
+"""
+TrendRadar 热榜缓存
+按平台在本地磁盘保存上次成功写库时的 ETag / Last-Modified 和条目内容哈希：
+- 请求时带上 If-None-Match / If-Modified-Since，服务端返回 304 时不再解析
+- 服务端不支持条件请求时，解析后比较内容哈希
+两种情况都不逐条写库，只把上一次的榜单整体顺延到本次抓取（见 db_writer.refresh_unchanged_board）
+各数据源（NewsNow、网页爬取、RSS）使用各自的缓存文件：平台 ID 相同但请求的地址不同，
+校验头和内容哈希不能混用
+"""
+
+import os
+import json
+import time
+import hashlib
+
+CACHE_DIR = os.environ.get(
+    'CRAWLER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'),
+)
+
+# 缓存条目的有效期（秒），超过后不带校验头、不比较哈希，强制完整写库一次；
+# 需明显长于抓取间隔（每小时一次），默认 6 小时，即大约每 6 次抓取完整刷新一次
+CACHE_MAX_AGE = int(os.environ.get('CRAWLER_CACHE_MAX_AGE', 6 * 3600))
+
+# fetch_platform_data 在热榜没有变化时返回的标记
+UNCHANGED = 'unchanged'
+
+# 计算内容哈希时使用的条目字段
+BOARD_FIELDS = ('title', 'url', 'rank', 'hot_value')
+
+def content_hash(items, fields=BOARD_FIELDS):
+    """计算解析后条目列表的内容哈希"""
+    payload = json.dumps(
+        [[item[field] for field in fields] for item in items],
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class BoardCache:
+    """按平台保存的条件请求 / 内容哈希缓存"""
+
+    def __init__(self, path, max_age=CACHE_MAX_AGE, fields=BOARD_FIELDS):
+        self.path = path
+        self.max_age = max_age
+        self.fields = fields
+        self.entries = {}
+        # 本次运行收到、但还没有成功写库的校验头
+        self.pending = {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  缓存文件读取失败，忽略缓存: {e}")
+
+    def _fresh_entry(self, platform_id):
+        entry = self.entries.get(platform_id)
+        if entry and time.time() - entry.get('updated_at', 0) < self.max_age:
+            return entry
+        return None
+
+    def request_headers(self, platform_id):
+        """生成条件请求头"""
+        entry = self._fresh_entry(platform_id)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def remember(self, platform_id, response):
+        """记录响应的校验头，写库成功后由 commit 落盘"""
+        self.pending[platform_id] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+
+    def is_unchanged(self, platform_id, items):
+        """解析后的条目与上次写库时完全相同"""
+        entry = self._fresh_entry(platform_id)
+        return bool(entry) and entry.get('hash') == content_hash(items, self.fields)
+
+    def commit(self, platform_id, items):
+        """写库成功后更新该平台的缓存"""
+        validators = self.pending.pop(platform_id, {})
+        self.entries[platform_id] = {
+            'etag': validators.get('etag'),
+            'last_modified': validators.get('last_modified'),
+            'hash': content_hash(items, self.fields),
+            'updated_at': time.time(),
+        }
+
+    def forget(self, platform_id):
+        """丢弃该平台的缓存，下次抓取时完整写库"""
+        self.entries.pop(platform_id, None)
+        self.pending.pop(platform_id, None)
+
+    def save(self):
+        """原子写入缓存文件"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"  ⚠️  缓存文件写入失败: {e}")
@@ -0,0 +1,171 @@
+"""
+TrendRadar 跨平台话题聚类
+同一事件在微博、知乎、百度、头条上的标题措辞略有不同，
+这里用 MinHash + LSH 分桶把相近标题归到同一个话题（news_items.topic_id）：
+- 标题归一化后按相邻两字切片，计算 MinHash 签名
+- 签名分成若干段，任意一段完全相同即成为候选，再用签名估计相似度确认
+- 每次运行只为新条目分配话题，候选范围为最近 24 小时已有话题的条目
+整体开销与条目数成线性关系，不需要两两比较
+"""
+
+import re
+import random
+import zlib
+from functools import lru_cache
+from psycopg2.extras import execute_values
+
+# MinHash 参数：NUM_BANDS × ROWS_PER_BAND = NUM_PERM
+# 相似度约 (1 / NUM_BANDS) ** (1 / ROWS_PER_BAND) ≈ 0.5 时开始成为候选
+NUM_PERM = 64
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+
+# 估计相似度达到该值才归为同一话题
+SIMILARITY_THRESHOLD = 0.5
+
+# 参与匹配的已有条目时间范围
+CLUSTER_WINDOW = '24 hours'
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(20250127)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_NON_CONTENT = re.compile(r'[^\w]+')
+
+def shingles(title):
+    """标题归一化（去掉标点空白、转小写）后按相邻两字切片"""
+    text = _NON_CONTENT.sub('', title.lower())
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+@lru_cache(maxsize=20000)
+def minhash(title):
+    """计算标题的 MinHash 签名（常驻进程中重复出现的标题只计算一次）"""
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(title)]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+def similarity(sig_a, sig_b):
+    """用签名中相同位置相等的比例估计 Jaccard 相似度"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+class LSHIndex:
+    """按签名分段建立的桶索引"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def _keys(self, signature):
+        for band in range(NUM_BANDS):
+            start = band * ROWS_PER_BAND
+            yield band, signature[start:start + ROWS_PER_BAND]
+
+    def add(self, signature, topic):
+        for key in self._keys(signature):
+            self.buckets.setdefault(key, []).append((signature, topic))
+
+    def best_match(self, signature, threshold=SIMILARITY_THRESHOLD):
+        """返回候选中相似度最高且不低于阈值的话题，没有则返回 None"""
+        best_topic = None
+        best_score = threshold
+        seen = set()
+        for key in self._keys(signature):
+            for candidate, topic in self.buckets.get(key, ()):
+                if (id(candidate), topic) in seen:
+                    continue
+                seen.add((id(candidate), topic))
+                score = similarity(signature, candidate)
+                if score >= best_score:
+                    best_topic, best_score = topic, score
+        return best_topic
+
+def cluster_titles(entries, existing=()):
+    """
+    为新条目分配话题
+    entries: [(news_item_id, title)]，existing: [(title, topic_id)]
+    返回 {news_item_id: topic}，topic 为已有 topic_id，
+    或 ('new', 代表标题) 表示需要新建的话题
+    """
+    index = LSHIndex()
+    for title, topic_id in existing:
+        index.add(minhash(title), topic_id)
+
+    assignments = {}
+    for news_item_id, title in entries:
+        signature = minhash(title)
+        topic = index.best_match(signature)
+        if topic is None:
+            topic = ('new', title)
+        assignments[news_item_id] = topic
+        index.add(signature, topic)
+
+    return assignments
+
+def assign_topics(cursor, entries, crawl_time):
+    """
+    为本次运行新入库的条目分配 topic_id，返回新建的话题数
+    entries: [(news_item_id, platform_id, title)]
+    """
+    if not entries:
+        return 0
+
+    cursor.execute(f"""
+        SELECT title, topic_id
+        FROM news_items
+        WHERE topic_id IS NOT NULL
+        AND last_crawl_time >= %s::timestamptz - INTERVAL '{CLUSTER_WINDOW}'
+    """, (crawl_time,))
+    existing = cursor.fetchall()
+
+    assignments = cluster_titles(
+        [(news_item_id, title) for news_item_id, _, title in entries],
+        existing,
+    )
+
+    # 新建话题，以首个条目的标题作为代表标题
+    new_titles = sorted({topic[1] for topic in assignments.values() if isinstance(topic, tuple)})
+    topic_ids = {}
+    if new_titles:
+        created = execute_values(cursor, """
+            INSERT INTO topics (title, first_seen, last_seen)
+            VALUES %s
+            RETURNING id, title
+        """, [(title, crawl_time, crawl_time) for title in new_titles], fetch=True)
+        topic_ids = {('new', title): topic_id for topic_id, title in created}
+
+    rows = [
+        (news_item_id, topic_ids.get(topic, topic))
+        for news_item_id, topic in assignments.items()
+    ]
+    execute_values(cursor, """
+        UPDATE news_items AS n SET topic_id = v.topic_id
+        FROM (VALUES %s) AS v(id, topic_id)
+        WHERE n.id = v.id
+    """, rows, page_size=1000)
+
+    # 刷新涉及话题的条目数、平台和最后出现时间
+    cursor.execute("""
+        UPDATE topics AS t SET
+            item_count = s.item_count,
+            platforms = s.platforms,
+            last_seen = %s
+        FROM (
+            SELECT topic_id, COUNT(*) AS item_count, array_agg(DISTINCT platform_id) AS platforms
+            FROM news_items
+            WHERE topic_id = ANY(%s)
+            GROUP BY topic_id
+        ) AS s
+        WHERE t.id = s.topic_id
+    """, (crawl_time, sorted({topic_id for _, topic_id in rows})))
+
+    return len(new_titles)
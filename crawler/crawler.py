@@ -8,20 +8,31 @@ import os
 import sys
 import json
 import time
-import random
+import signal
+import asyncio
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from urllib.parse import urlparse
 import psycopg2
-from psycopg2.extras import execute_values
 
 try:
-    import requests
+    import http_client
+    from pipeline import PARSE_WORKERS, QUEUE_SIZE, run_pipeline
+    from db_writer import CrawlRun, update_database, refresh_unchanged_board
+    from board_cache import BoardCache, CACHE_DIR, UNCHANGED
+    from source_health import SourceHealth
 except ImportError:
-    print("请安装依赖: pip install requests")
+    print("请安装依赖: pip install httpx")
     sys.exit(1)
 
 # NewsNow API 配置
 API_BASE = "https://newsnow.busiyi.world/api/s"
 
+# 热榜缓存文件（位于 CACHE_DIR，与 crawler_v2.py 的缓存分开）
+BOARD_CACHE_FILE = 'newsnow.json'
+
 # 支持的平台配置（基于 TrendRadar）
 PLATFORMS = {
     'weibo': {'name': '微博热搜', 'api_id': 'weibo'},
@@ -32,6 +43,34 @@ PLATFORMS = {
     'toutiao': {'name': '今日头条', 'api_id': 'toutiao'},
 }
 
+# 异步模式配置
+ASYNC_MAX_PER_HOST = 4      # 每个主机的最大并发请求数
+ASYNC_RUN_TIMEOUT = 120     # 整次运行的超时时间（秒）
+ASYNC_PARSE_WORKERS = 0     # 解析进程数，0 表示在事件循环中直接解析
+
+# 常驻模式下各平台的抓取间隔（秒），未列出的平台使用 DAEMON_DEFAULT_INTERVAL
+DAEMON_INTERVALS = {
+    'weibo': 120,
+    'douyin': 300,
+    'zhihu': 300,
+    'baidu': 300,
+    'toutiao': 300,
+    'bilibili': 600,
+}
+DAEMON_DEFAULT_INTERVAL = 600
+
+# 模拟浏览器请求头（参考 TrendRadar）
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Referer': 'https://newsnow.busiyi.world/',
+    'Origin': 'https://newsnow.busiyi.world',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin',
+}
+
 def get_database_connection():
     """获取数据库连接"""
     db_url = os.environ.get('DATABASE_URL')
@@ -39,132 +78,153 @@ def get_database_connection():
         raise ValueError("DATABASE_URL 环境变量未设置")
     return psycopg2.connect(db_url)
 
-def fetch_platform_data(platform_id, max_retries=3):
+def get_platform_url(platform_id):
+    """获取平台对应的 NewsNow API 地址"""
+    return f"{API_BASE}?id={PLATFORMS[platform_id]['api_id']}&latest"
+
+def get_platform_host(platform_id):
+    """平台所属的数据源主机（熔断按主机统计）"""
+    return urlparse(get_platform_url(platform_id)).netloc
+
+def parse_platform_data(platform_id, data):
+    """解析 NewsNow API 返回的数据"""
+    items = []
+    if isinstance(data, dict) and 'items' in data:
+        for item in data['items'][:20]:  # 只取前20条
+            title = item.get('title')
+            if not title or isinstance(title, (float, int)) or not title.strip():
+                continue
+
+            items.append({
+                'platform_id': platform_id,
+                'title': title.strip(),
+                'url': item.get('url', item.get('mobileUrl', '')),
+                'rank': item.get('rank', 0),
+                'hot_value': str(item.get('extra', {}).get('hot', '')),
+            })
+
+    return items
+
+def parse_content(platform_id, content):
+    """解析 API 返回的原始内容（流水线模式下在解析进程中执行）"""
+    return parse_platform_data(platform_id, json.loads(content))
+
+def get_request_headers(platform_id, cache=None):
+    """生成请求头，有缓存时附带条件请求头"""
+    if cache is None:
+        return HEADERS
+    return {**HEADERS, **cache.request_headers(platform_id)}
+
+def handle_response(platform_id, response, cache=None):
+    """
+    处理 API 响应
+    返回 304 或解析后内容与上次写库时相同，则返回 UNCHANGED
+    """
+    if response.status_code == 304:
+        return UNCHANGED
+
+    response.raise_for_status()
+    items = parse_platform_data(platform_id, response.json())
+
+    if cache is not None:
+        cache.remember(platform_id, response)
+        if items and cache.is_unchanged(platform_id, items):
+            return UNCHANGED
+
+    return items
+
+def fetch_platform_data(platform_id, max_retries=3, cache=None):
     """
     从 NewsNow API 获取平台数据
-    参考 TrendRadar 的实现
+    参考 TrendRadar 的实现；限速和失败重试由 http_client 按主机统一处理
+    请求失败时返回 None；请求成功但内容无法解析或没有条目时返回 []（不计入数据源熔断）
     """
     config = PLATFORMS.get(platform_id)
     if not config:
         return []
 
-    api_id = config['api_id']
-    url = f"{API_BASE}?id={api_id}&latest"
-
-    # 模拟浏览器请求头（参考 TrendRadar）
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://newsnow.busiyi.world/',
-        'Origin': 'https://newsnow.busiyi.world',
-        'Connection': 'keep-alive',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-origin',
-    }
-
-    for attempt in range(max_retries):
-        try:
-            # 添加随机延迟（3-5秒）
-            if attempt > 0:
-                delay = random.uniform(3, 5)
-                print(f"  重试 {attempt}/{max_retries}，等待 {delay:.1f}秒...")
-                time.sleep(delay)
+    url = get_platform_url(platform_id)
+    headers = get_request_headers(platform_id, cache)
 
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-
-            data = response.json()
+    try:
+        response = http_client.get(url, headers=headers, timeout=15, retries=max_retries - 1)
+        return handle_response(platform_id, response, cache)
 
-            # 解析数据
-            items = []
-            if isinstance(data, dict) and 'items' in data:
-                for item in data['items'][:20]:  # 只取前20条
-                    title = item.get('title')
-                    if not title or isinstance(title, (float, int)) or not title.strip():
-                        continue
+    except http_client.HTTPError as e:
+        print(f"  请求失败: {e}")
+        print(f"❌ {config['name']} 获取失败")
+        return None
 
-                    items.append({
-                        'platform_id': platform_id,
-                        'title': title.strip(),
-                        'url': item.get('url', item.get('mobileUrl', '')),
-                        'rank': item.get('rank', 0),
-                        'hot_value': str(item.get('extra', {}).get('hot', '')),
-                    })
+    except json.JSONDecodeError as e:
+        print(f"  JSON 解析失败: {e}")
+        return []
 
-            return items
+    except Exception as e:
+        print(f"  未知错误: {e}")
+        return []
 
-        except requests.exceptions.RequestException as e:
-            print(f"  请求失败: {e}")
-            if attempt == max_retries - 1:
-                print(f"❌ {config['name']} 获取失败（已重试 {max_retries} 次）")
-                return []
+async def request_platform_async(client, platform_id, max_retries=3, cache=None):
+    """
+    异步请求平台 API，返回响应（可能是 304），失败时返回 None
+    重试等待使用 asyncio.sleep，不会阻塞其他平台的请求
+    """
+    config = PLATFORMS[platform_id]
+    url = get_platform_url(platform_id)
+    headers = get_request_headers(platform_id, cache)
 
-        except json.JSONDecodeError as e:
-            print(f"  JSON 解析失败: {e}")
-            return []
+    try:
+        response = await http_client.async_get(
+            client, url, headers=headers, timeout=15, retries=max_retries - 1)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
 
-        except Exception as e:
-            print(f"  未知错误: {e}")
-            return []
+    except http_client.HTTPError as e:
+        print(f"  {platform_id} 请求失败: {e}")
+        print(f"❌ {config['name']} 获取失败")
+        return None
 
-    return []
+    except Exception as e:
+        print(f"  {platform_id} 未知错误: {e}")
+        return None
 
-def update_database(conn, items):
-    """更新数据库"""
-    if not items:
-        return
+async def fetch_platform_data_async(client, platform_id, max_retries=3, cache=None):
+    """异步获取平台数据（逻辑与 fetch_platform_data 相同）"""
+    if platform_id not in PLATFORMS:
+        return []
 
-    cursor = conn.cursor()
+    response = await request_platform_async(client, platform_id, max_retries, cache)
+    if response is None:
+        return None
 
     try:
-        platform_id = items[0]['platform_id']
-
-        # 删除该平台的旧数据（保留最近24小时的历史）
-        cursor.execute("""
-            DELETE FROM news_items
-            WHERE platform_id = %s
-            AND last_crawl_time < NOW() - INTERVAL '24 hours'
-        """, (platform_id,))
-
-        # 插入新数据
-        insert_query = """
-            INSERT INTO news_items (platform_id, title, url, rank, hot_value, last_crawl_time)
-            VALUES %s
-            ON CONFLICT (platform_id, title)
-            DO UPDATE SET
-                rank = EXCLUDED.rank,
-                hot_value = EXCLUDED.hot_value,
-                last_crawl_time = EXCLUDED.last_crawl_time
-        """
-
-        values = [
-            (
-                item['platform_id'],
-                item['title'],
-                item['url'],
-                item['rank'],
-                item['hot_value'],
-                datetime.now()
-            )
-            for item in items
-        ]
+        return handle_response(platform_id, response, cache)
 
-        execute_values(cursor, insert_query, values)
-        conn.commit()
-
-        print(f"✓ {platform_id}: 成功更新 {len(items)} 条数据")
+    except json.JSONDecodeError as e:
+        print(f"  {platform_id} JSON 解析失败: {e}")
+        return []
 
     except Exception as e:
-        conn.rollback()
-        print(f"❌ 数据库更新失败: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"  {platform_id} 未知错误: {e}")
+        return []
 
-    finally:
-        cursor.close()
+async def fetch_platform_raw_async(client, platform_id, max_retries=3, cache=None):
+    """
+    异步获取平台 API 的原始响应内容（bytes），由解析进程调用 parse_content 解析
+    返回 304 时返回 UNCHANGED，请求失败返回 None
+    """
+    if platform_id not in PLATFORMS:
+        return []
+
+    response = await request_platform_async(client, platform_id, max_retries, cache)
+    if response is None:
+        return None
+    if response.status_code == 304:
+        return UNCHANGED
+
+    if cache is not None:
+        cache.remember(platform_id, response)
+    return response.content
 
 def crawl_all_platforms():
     """爬取所有平台数据"""
@@ -174,38 +234,335 @@ def crawl_all_platforms():
     print(f"{'='*60}\n")
 
     conn = get_database_connection()
+    cache = BoardCache(os.path.join(CACHE_DIR, BOARD_CACHE_FILE))
+    health = SourceHealth()
+    run = CrawlRun()
     total_items = 0
     success_count = 0
+    unchanged_count = 0
     fail_count = 0
 
     for platform_id, config in PLATFORMS.items():
         print(f"正在爬取: {config['name']} ({platform_id})...")
 
-        items = fetch_platform_data(platform_id)
-
-        if items:
-            update_database(conn, items)
+        host = get_platform_host(platform_id)
+        if not health.allow(host):
+            print(f"  {platform_id}: {host} 熔断中，跳过")
+            run.set_status(platform_id, 'failed')
+            fail_count += 1
+            continue
+
+        started = time.perf_counter()
+        items = fetch_platform_data(platform_id, cache=cache)
+        # 熔断只统计请求本身是否成功，解析不出条目属于解析问题
+        health.record(host, platform_id, items is not None, time.perf_counter() - started)
+
+        if items == UNCHANGED:
+            if refresh_unchanged_board(conn, platform_id, run):
+                run.set_status(platform_id, 'success')
+                unchanged_count += 1
+            else:
+                cache.forget(platform_id)
+                run.set_status(platform_id, 'failed')
+                fail_count += 1
+        elif items and update_database(conn, items, run):
+            cache.commit(platform_id, items)
+            run.set_status(platform_id, 'success')
             total_items += len(items)
             success_count += 1
         else:
+            run.set_status(platform_id, 'failed')
             fail_count += 1
 
-        # 请求间隔（100ms + 随机偏差）
-        time.sleep(0.1 + random.uniform(0, 0.05))
-
+    run.save(conn)
     conn.close()
+    cache.save()
+    health.save()
+    http_client.close_client()
 
     print(f"\n{'='*60}")
     print(f"✓ 爬取完成！")
     print(f"  成功: {success_count}/{len(PLATFORMS)} 个平台")
+    print(f"  未变化: {unchanged_count}/{len(PLATFORMS)} 个平台")
     print(f"  失败: {fail_count}/{len(PLATFORMS)} 个平台")
     print(f"  数据: 共获取 {total_items} 条")
     print(f"  结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
 
+async def _fetch_with_host_limit(client, semaphores, platform_id, cache=None, fetch=fetch_platform_data_async,
+                                health=None):
+    """在主机并发上限内获取单个平台的数据，数据源熔断时直接返回空结果"""
+    host = get_platform_host(platform_id)
+    if health is not None and not health.allow(host):
+        print(f"  {platform_id}: {host} 熔断中，跳过")
+        return platform_id, []
+
+    async with semaphores[host]:
+        started = time.perf_counter()
+        items = await fetch(client, platform_id, cache=cache)
+
+    if health is not None:
+        # 熔断只统计请求本身是否成功（失败时 fetch 返回 None）
+        health.record(host, platform_id, items is not None, time.perf_counter() - started)
+    return platform_id, items
+
+async def crawl_platforms_async(client, conn, cache, health, platform_ids,
+                                max_per_host=ASYNC_MAX_PER_HOST, run_timeout=ASYNC_RUN_TIMEOUT,
+                                parse_workers=ASYNC_PARSE_WORKERS, queue_size=QUEUE_SIZE, pool=None):
+    """
+    使用已有的 HTTP 客户端和数据库连接并发爬取指定平台，作为一次抓取运行写入数据库
+    返回统计：{'success', 'unchanged', 'failed', 'items'}
+    """
+    run = CrawlRun()
+    stats = {'success': 0, 'unchanged': 0, 'failed': 0, 'items': 0}
+
+    semaphores = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+    # 多个解析结果可能同时到达，数据库连接同一时间只给一个平台使用
+    db_lock = asyncio.Lock()
+
+    async def handle(platform_id, items):
+        if items and items != UNCHANGED and cache.is_unchanged(platform_id, items):
+            items = UNCHANGED
+
+        if items == UNCHANGED:
+            async with db_lock:
+                saved = await asyncio.to_thread(refresh_unchanged_board, conn, platform_id, run)
+            if saved:
+                run.set_status(platform_id, 'success')
+                stats['unchanged'] += 1
+            else:
+                cache.forget(platform_id)
+                run.set_status(platform_id, 'failed')
+        elif items:
+            # 数据库写入放到线程中执行，避免阻塞其他平台的网络请求
+            async with db_lock:
+                saved = await asyncio.to_thread(update_database, conn, items, run)
+            if saved:
+                cache.commit(platform_id, items)
+                run.set_status(platform_id, 'success')
+                stats['items'] += len(items)
+                stats['success'] += 1
+            else:
+                run.set_status(platform_id, 'failed')
+        else:
+            run.set_status(platform_id, 'failed')
+
+    if parse_workers > 0:
+        async def fetch(platform_id):
+            _, content = await _fetch_with_host_limit(
+                client, semaphores, platform_id, cache, fetch=fetch_platform_raw_async, health=health)
+            return content
+
+        abandoned = await run_pipeline(
+            platform_ids, fetch, parse_content, handle, parse_workers, queue_size, run_timeout, pool)
+        if abandoned:
+            print(f"❌ 运行超时（{run_timeout}秒），放弃 {abandoned} 个未完成的平台")
+    else:
+        tasks = [
+            asyncio.create_task(_fetch_with_host_limit(client, semaphores, platform_id, cache, health=health))
+            for platform_id in platform_ids
+        ]
+
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=run_timeout):
+                platform_id, items = await next_done
+                await handle(platform_id, items)
+
+        except asyncio.TimeoutError:
+            pending = [task for task in tasks if not task.done()]
+            print(f"❌ 运行超时（{run_timeout}秒），放弃 {len(pending)} 个未完成的平台")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    stats['failed'] = len(platform_ids) - stats['success'] - stats['unchanged']
+    for platform_id in platform_ids:
+        run.statuses.setdefault(platform_id, 'failed')
+
+    await asyncio.to_thread(run.save, conn)
+    return stats
+
+async def crawl_all_platforms_async(max_per_host=ASYNC_MAX_PER_HOST, run_timeout=ASYNC_RUN_TIMEOUT,
+                                    parse_workers=ASYNC_PARSE_WORKERS, queue_size=QUEUE_SIZE):
+    """
+    并发爬取所有平台数据
+    所有平台同时发起请求，每个主机的并发数受 max_per_host 限制；
+    哪个平台先返回就先写入数据库，整次运行超过 run_timeout 秒后放弃未完成的平台
+
+    parse_workers 大于 0 时使用两阶段流水线：原始响应进入长度为 queue_size 的队列，
+    由 parse_workers 个解析进程解析，网络请求不受解析占用 CPU 的影响
+    """
+    print(f"\n{'='*60}")
+    print(f"TrendRadar Dashboard 数据爬虫（异步模式）")
+    print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if parse_workers > 0:
+        print(f"解析进程: {parse_workers} 个，队列长度: {queue_size}")
+    print(f"{'='*60}\n")
+
+    conn = get_database_connection()
+    cache = BoardCache(os.path.join(CACHE_DIR, BOARD_CACHE_FILE))
+    health = SourceHealth()
+
+    async with http_client.create_async_client() as client:
+        stats = await crawl_platforms_async(
+            client, conn, cache, health, list(PLATFORMS),
+            max_per_host, run_timeout, parse_workers, queue_size)
+
+    conn.close()
+    cache.save()
+    health.save()
+
+    print(f"\n{'='*60}")
+    print(f"✓ 爬取完成！")
+    print(f"  成功: {stats['success']}/{len(PLATFORMS)} 个平台")
+    print(f"  未变化: {stats['unchanged']}/{len(PLATFORMS)} 个平台")
+    print(f"  失败: {stats['failed']}/{len(PLATFORMS)} 个平台")
+    print(f"  数据: 共获取 {stats['items']} 条")
+    print(f"  结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+def ensure_connection(conn):
+    """常驻模式下复用数据库连接；连接已断开（包括服务端关闭空闲连接）时重新连接"""
+    if conn is not None and not conn.closed:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            print("  ⚠️  数据库连接已断开，重新连接")
+            conn.close()
+    return get_database_connection()
+
+async def run_daemon(intervals=None, max_per_host=ASYNC_MAX_PER_HOST, run_timeout=ASYNC_RUN_TIMEOUT,
+                     parse_workers=ASYNC_PARSE_WORKERS, queue_size=QUEUE_SIZE):
+    """
+    常驻模式：按各平台的间隔循环抓取
+    HTTP 客户端、数据库连接、解析进程池和缓存在多轮之间复用；同一时刻到期的平台作为一次抓取运行写入。
+    收到 SIGINT / SIGTERM 后等待当前一轮结束再退出，再次收到信号时立即退出
+    """
+    intervals = {**DAEMON_INTERVALS, **(intervals or {})}
+    intervals = {platform_id: intervals.get(platform_id, DAEMON_DEFAULT_INTERVAL) for platform_id in PLATFORMS}
+
+    print(f"\n{'='*60}")
+    print(f"TrendRadar Dashboard 数据爬虫（常驻模式）")
+    print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    for platform_id, interval in intervals.items():
+        print(f"  {platform_id}: 每 {interval} 秒")
+    print(f"{'='*60}\n")
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    main_task = asyncio.current_task()
+
+    def request_stop(signame):
+        if stop.is_set():
+            print(f"\n再次收到 {signame}，立即退出")
+            main_task.cancel()
+            return
+        print(f"\n收到 {signame}，当前一轮抓取结束后退出...")
+        stop.set()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_stop, sig.name)
+        except NotImplementedError:
+            # Windows 不支持，Ctrl+C 时直接中断
+            pass
+
+    cache = BoardCache(os.path.join(CACHE_DIR, BOARD_CACHE_FILE))
+    health = SourceHealth()
+    conn = None
+    pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+    next_due = {platform_id: loop.time() for platform_id in PLATFORMS}
+
+    try:
+        async with http_client.create_async_client() as client:
+            while not stop.is_set():
+                now = loop.time()
+                due = [platform_id for platform_id, due_at in next_due.items() if due_at <= now]
+
+                if due:
+                    try:
+                        conn = await asyncio.to_thread(ensure_connection, conn)
+                        stats = await crawl_platforms_async(
+                            client, conn, cache, health, due,
+                            max_per_host, run_timeout, parse_workers, queue_size, pool)
+                        print(f"[{datetime.now().strftime('%H:%M:%S')}] {', '.join(due)}: "
+                              f"成功 {stats['success']}，未变化 {stats['unchanged']}，"
+                              f"失败 {stats['failed']}，共 {stats['items']} 条")
+                    except Exception as e:
+                        print(f"❌ 本轮抓取失败: {e}")
+
+                    cache.save()
+                    health.save()
+
+                    # 按计划时间推进，避免间隔随抓取耗时漂移；落后太多时从当前时间重新计算
+                    for platform_id in due:
+                        next_due[platform_id] = max(next_due[platform_id] + intervals[platform_id], loop.time())
+
+                wait = min(next_due.values()) - loop.time()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+
+    except asyncio.CancelledError:
+        pass
+
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if conn is not None and not conn.closed:
+            conn.close()
+        cache.save()
+        health.save()
+        print(f"✓ 爬虫已退出 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+def parse_interval(value):
+    """解析 --interval 参数：平台ID=秒数"""
+    platform_id, sep, seconds = value.partition('=')
+    if not sep or platform_id not in PLATFORMS:
+        raise argparse.ArgumentTypeError(f"格式应为 平台ID=秒数，平台ID 可选: {', '.join(PLATFORMS)}")
+    try:
+        interval = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"抓取间隔应为数字: {seconds}")
+    if interval <= 0:
+        raise argparse.ArgumentTypeError(f"抓取间隔应大于 0: {seconds}")
+    return platform_id, interval
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='TrendRadar Dashboard 数据爬虫')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='并发爬取所有平台（异步模式）')
+    parser.add_argument('--max-per-host', type=int, default=ASYNC_MAX_PER_HOST,
+                        help='异步模式下每个主机的最大并发请求数')
+    parser.add_argument('--run-timeout', type=float, default=ASYNC_RUN_TIMEOUT,
+                        help='异步模式下整次运行的超时时间（秒）')
+    parser.add_argument('--parse-workers', type=int, default=ASYNC_PARSE_WORKERS,
+                        help=f'异步模式下的解析进程数，0 表示不使用解析进程（建议 {PARSE_WORKERS}）')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help='等待解析的原始响应最多排队的数量')
+    parser.add_argument('--daemon', action='store_true',
+                        help='常驻模式：按各平台的间隔循环抓取（使用异步模式）')
+    parser.add_argument('--interval', type=parse_interval, action='append', default=[],
+                        metavar='PLATFORM=SECONDS', help='常驻模式下覆盖平台的抓取间隔，可重复指定')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
+
     try:
-        crawl_all_platforms()
+        if args.daemon:
+            asyncio.run(run_daemon(
+                dict(args.interval), args.max_per_host, args.run_timeout, args.parse_workers, args.queue_size))
+        elif args.use_async:
+            asyncio.run(crawl_all_platforms_async(
+                args.max_per_host, args.run_timeout, args.parse_workers, args.queue_size))
+        else:
+            crawl_all_platforms()
     except Exception as e:
         print(f"\n❌ 爬虫运行失败: {e}")
         import traceback
@@ -2,31 +2,33 @@
 """
 TrendRadar 数据爬虫 v2
 使用网页爬取方式获取热点数据
+各平台的抓取地址、解析函数和限制由 platforms/ 中的插件定义，只导入本次启用的平台
+
+使用方法:
+    python crawler_v2.py                        # 爬取全部平台
+    python crawler_v2.py --platforms weibo      # 只爬取指定平台（逗号分隔）
 """
 
 import os
 import sys
-import json
 import time
-import re
+import argparse
 from datetime import datetime
+from urllib.parse import urlparse
 import psycopg2
-from psycopg2.extras import execute_values
 
 try:
-    import requests
-    from bs4 import BeautifulSoup
+    import http_client
+    import registry
+    from db_writer import CrawlRun, update_database, refresh_unchanged_board
+    from board_cache import BoardCache, CACHE_DIR, UNCHANGED
+    from source_health import SourceHealth
 except ImportError:
-    print("请安装依赖: pip install requests beautifulsoup4")
+    print("请安装依赖: pip install httpx beautifulsoup4")
     sys.exit(1)
 
-# 支持的平台配置
-PLATFORMS = {
-    'weibo': {'name': '微博热搜', 'enabled': True},
-    'zhihu': {'name': '知乎热榜', 'enabled': True},
-    'bilibili': {'name': 'B站热门', 'enabled': True},
-    'baidu': {'name': '百度热搜', 'enabled': True},
-}
+# 热榜缓存文件（位于 CACHE_DIR，与 crawler.py 的缓存分开）
+BOARD_CACHE_FILE = 'web.json'
 
 def get_database_connection():
     """获取数据库连接"""
@@ -35,239 +37,125 @@ def get_database_connection():
         raise ValueError("DATABASE_URL 环境变量未设置")
     return psycopg2.connect(db_url)
 
-def fetch_weibo_hot():
-    """爬取微博热搜"""
+def conditional_get(platform_id, url, headers, cache=None, timeout=10, retries=0):
+    """发送请求，有缓存时带上条件请求头；服务端返回 304 时返回 None"""
+    if cache is not None:
+        headers = {**headers, **cache.request_headers(platform_id)}
+
+    response = http_client.get(url, headers=headers, timeout=timeout, retries=retries)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+
+    if cache is not None:
+        cache.remember(platform_id, response)
+    return response
+
+def fetch_platform(platform, cache=None):
+    """按插件配置请求并解析平台数据，热榜没有变化时返回 UNCHANGED"""
+    if platform.fetch:
+        return platform.fetch(platform, cache)
+
+    response = conditional_get(
+        platform.id, platform.url, platform.headers, cache, platform.timeout, platform.retries)
+    if response is None:
+        return UNCHANGED
+    response.encoding = platform.encoding
+
+    return platform.parse(response.text)
+
+def fetch_platform_data(platform, cache=None):
+    """
+    获取平台数据，热榜没有变化时返回 UNCHANGED
+    请求失败时返回 None；请求成功但解析失败或没有条目时返回 []（不计入数据源熔断）
+    """
     try:
-        # 使用微博热搜榜页面
-        url = "https://s.weibo.com/top/summary"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
-        response.encoding = 'utf-8'
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        items = []
-
-        # 查找热搜列表
-        hot_list = soup.find_all('td', class_='td-02')
-
-        for idx, item in enumerate(hot_list[:20], 1):
-            link = item.find('a')
-            if link:
-                title = link.get_text(strip=True)
-                href = link.get('href', '')
-
-                # 获取热度值
-                hot_span = item.find_next('td', class_='td-03')
-                hot_value = hot_span.get_text(strip=True) if hot_span else ''
-
-                items.append({
-                    'platform_id': 'weibo',
-                    'title': title,
-                    'url': f"https://s.weibo.com{href}" if href else '',
-                    'rank': idx,
-                    'hot_value': hot_value,
-                })
-
-        return items
+        items = fetch_platform(platform, cache)
+    except http_client.HTTPError as e:
+        print(f"❌ {platform.name}请求失败: {e}")
+        return None
     except Exception as e:
-        print(f"❌ 微博爬取失败: {e}")
+        print(f"❌ {platform.name}解析失败: {e}")
         return []
 
-def fetch_zhihu_hot():
-    """爬取知乎热榜"""
-    try:
-        # 使用知乎 API
-        url = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
-        data = response.json()
-
-        items = []
-        for idx, item in enumerate(data.get('data', [])[:20], 1):
-            target = item.get('target', {})
-            items.append({
-                'platform_id': 'zhihu',
-                'title': target.get('title', ''),
-                'url': target.get('url', ''),
-                'rank': idx,
-                'hot_value': str(item.get('detail_text', '')),
-            })
-
-        return items
-    except Exception as e:
-        print(f"❌ 知乎爬取失败: {e}")
-        return []
-
-def fetch_bilibili_hot():
-    """爬取B站热门"""
-    try:
-        # 使用B站热门视频 API
-        url = "https://api.bilibili.com/x/web-interface/popular"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
-        data = response.json()
-
-        items = []
-        if data.get('code') == 0:
-            for idx, item in enumerate(data.get('data', {}).get('list', [])[:20], 1):
-                items.append({
-                    'platform_id': 'bilibili',
-                    'title': item.get('title', ''),
-                    'url': item.get('short_link_v2', ''),
-                    'rank': idx,
-                    'hot_value': str(item.get('stat', {}).get('view', '')),
-                })
-
-        return items
-    except Exception as e:
-        print(f"❌ B站爬取失败: {e}")
-        return []
-
-def fetch_baidu_hot():
-    """爬取百度热搜"""
-    try:
-        # 使用百度热搜榜
-        url = "https://top.baidu.com/board?tab=realtime"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
-        response.encoding = 'utf-8'
-
-        # 从页面中提取数据（百度热搜数据在 JS 中）
-        pattern = r'<!--s-data:(.*?)-->'
-        match = re.search(pattern, response.text)
+    if cache is not None and items and items != UNCHANGED and cache.is_unchanged(platform.id, items):
+        return UNCHANGED
+    return items
 
-        items = []
-        if match:
-            data = json.loads(match.group(1))
-            cards = data.get('data', {}).get('cards', [])
-
-            for card in cards:
-                if card.get('type') == 'toplist1':
-                    for idx, item in enumerate(card.get('content', [])[:20], 1):
-                        items.append({
-                            'platform_id': 'baidu',
-                            'title': item.get('word', ''),
-                            'url': item.get('url', ''),
-                            'rank': idx,
-                            'hot_value': str(item.get('hotScore', '')),
-                        })
-                    break
-
-        return items
-    except Exception as e:
-        print(f"❌ 百度爬取失败: {e}")
-        return []
-
-def fetch_platform_data(platform_id):
-    """根据平台ID获取数据"""
-    fetchers = {
-        'weibo': fetch_weibo_hot,
-        'zhihu': fetch_zhihu_hot,
-        'bilibili': fetch_bilibili_hot,
-        'baidu': fetch_baidu_hot,
-    }
-
-    fetcher = fetchers.get(platform_id)
-    if fetcher:
-        return fetcher()
-    return []
-
-def update_database(conn, items):
-    """更新数据库"""
-    if not items:
-        return
-
-    cursor = conn.cursor()
-
-    try:
-        # 删除该平台的旧数据（保留最近24小时的历史）
-        platform_id = items[0]['platform_id']
-        cursor.execute("""
-            DELETE FROM news_items
-            WHERE platform_id = %s
-            AND last_crawl_time < NOW() - INTERVAL '24 hours'
-        """, (platform_id,))
-
-        # 插入新数据
-        insert_query = """
-            INSERT INTO news_items (platform_id, title, url, rank, hot_value, last_crawl_time)
-            VALUES %s
-            ON CONFLICT (platform_id, title)
-            DO UPDATE SET
-                rank = EXCLUDED.rank,
-                hot_value = EXCLUDED.hot_value,
-                last_crawl_time = EXCLUDED.last_crawl_time
-        """
-
-        values = [
-            (
-                item['platform_id'],
-                item['title'],
-                item['url'],
-                item['rank'],
-                item['hot_value'],
-                datetime.now()
-            )
-            for item in items
-        ]
-
-        execute_values(cursor, insert_query, values)
-        conn.commit()
-
-        print(f"✓ {platform_id}: 成功更新 {len(items)} 条数据")
-
-    except Exception as e:
-        conn.rollback()
-        print(f"❌ 数据库更新失败: {e}")
-
-    finally:
-        cursor.close()
-
-def crawl_all_platforms():
-    """爬取所有平台数据"""
+def crawl_all_platforms(selected=None):
+    """爬取所有启用的平台数据"""
     print(f"\n{'='*50}")
     print(f"开始爬取数据 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*50}\n")
 
+    platform_ids = registry.enabled_platforms(selected)
+
     conn = get_database_connection()
+    cache = BoardCache(os.path.join(CACHE_DIR, BOARD_CACHE_FILE))
+    health = SourceHealth()
+    run = CrawlRun()
     total_items = 0
-
-    for platform_id, config in PLATFORMS.items():
-        if not config.get('enabled'):
+    unchanged_count = 0
+
+    for platform_id in platform_ids:
+        try:
+            platform = registry.load_platform(platform_id)
+        except Exception as e:
+            print(f"❌ {platform_id} 插件加载失败: {e}")
+            run.set_status(platform_id, 'failed')
             continue
 
-        print(f"正在爬取: {config['name']}...")
+        print(f"正在爬取: {platform.name}...")
+        if platform.url:
+            http_client.set_rate_limit(platform.url, platform.rate)
 
-        items = fetch_platform_data(platform_id)
+        # 没有 URL 的插件（自定义 fetch）按平台 ID 熔断
+        host = urlparse(platform.url).netloc if platform.url else platform_id
+        if not health.allow(host):
+            print(f"  {platform_id}: {host} 熔断中，跳过")
+            run.set_status(platform_id, 'failed')
+            continue
 
-        if items:
-            update_database(conn, items)
+        started = time.perf_counter()
+        items = fetch_platform_data(platform, cache)
+        # 熔断只统计请求本身是否成功，解析不出条目属于解析问题
+        health.record(host, platform_id, items is not None, time.perf_counter() - started)
+
+        if items == UNCHANGED:
+            if refresh_unchanged_board(conn, platform_id, run):
+                run.set_status(platform_id, 'success')
+                unchanged_count += 1
+            else:
+                cache.forget(platform_id)
+                run.set_status(platform_id, 'failed')
+        elif items and update_database(conn, items, run):
+            cache.commit(platform_id, items)
+            run.set_status(platform_id, 'success')
             total_items += len(items)
+        else:
+            run.set_status(platform_id, 'failed')
 
-        # 避免请求过快
-        time.sleep(2)
-
+    run.save(conn)
     conn.close()
+    cache.save()
+    health.save()
+    http_client.close_client()
 
     print(f"\n{'='*50}")
-    print(f"✓ 爬取完成！共获取 {total_items} 条数据")
+    print(f"✓ 爬取完成！共获取 {total_items} 条数据，{unchanged_count} 个平台未变化")
     print(f"{'='*50}\n")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='TrendRadar 数据爬虫 v2（网页爬取）')
+    parser.add_argument('--platforms', default=None,
+                        help='只爬取指定平台，逗号分隔（默认全部，也可通过 CRAWLER_PLATFORMS 指定）')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
+
     try:
-        crawl_all_platforms()
+        crawl_all_platforms(args.platforms)
     except Exception as e:
         print(f"❌ 爬虫运行失败: {e}")
         import traceback
@@ -0,0 +1,307 @@
+"""
+TrendRadar 数据库写入
+两个爬虫共用的 news_items 增量写入：
+先查出该平台本批标题对应的已有记录，与本批数据比较后
+- 新标题：插入，并建立关键词倒排索引
+- 排名或热度变化：只更新这些行
+- 没有变化：一条语句批量更新 last_crawl_time / crawl_count
+避免每次运行都重写全部行，减少表和 GIN 索引的死元组
+热榜缓存判断整个榜单没有变化时（见 board_cache.py）不再逐条比较，
+用 refresh_unchanged_board 把上一次的榜单顺延到本次抓取，排名历史照常记录
+写入时不删除旧数据，保留期清理见 maintenance.py
+
+每次运行的 crawl_records / crawl_source_status / rank_history 由 CrawlRun 收集，
+运行结束时在一个事务里批量写入，为新条目分配跨平台话题，刷新本次抓取所在小时 / 天的汇总表，
+重新计算飙升榜，并重建首页快照
+
+每个平台写入时与上一次的榜单比较，把变化（新上榜 / 排名变化 / 掉出榜单）随同一个事务发布给
+/api/events 的订阅者，首页快照更新后也会发布通知（见 updates.py）
+"""
+
+from datetime import datetime
+from psycopg2.extras import execute_values
+
+from clustering import assign_topics
+from keywords import index_keywords
+from rising import refresh_rising
+from rollups import refresh_rollups
+from snapshot import refresh_snapshot
+from updates import load_previous_board, build_delta, publish_delta, publish_update
+
+def _dedupe_items(items):
+    """同一批数据中标题重复时只保留第一条（排名靠前的）"""
+    seen = set()
+    unique_items = []
+    for item in items:
+        if item['title'] in seen:
+            continue
+        seen.add(item['title'])
+        unique_items.append(item)
+    return unique_items
+
+def load_snapshot(cursor, platform_id, titles):
+    """查询本批标题在数据库中的已有记录：{title: (id, rank, hot_value)}"""
+    cursor.execute("""
+        SELECT id, title, rank, hot_value
+        FROM news_items
+        WHERE platform_id = %s AND title = ANY(%s)
+    """, (platform_id, titles))
+    return {title: (item_id, rank, hot_value) for item_id, title, rank, hot_value in cursor.fetchall()}
+
+def diff_items(items, snapshot):
+    """
+    将本批数据与已有记录比较
+    返回 (新增条目, 变化条目 [(id, item)], 未变化的 id 列表)
+    """
+    new_items = []
+    changed = []
+    unchanged_ids = []
+
+    for item in items:
+        existing = snapshot.get(item['title'])
+        if existing is None:
+            new_items.append(item)
+            continue
+
+        item_id, rank, hot_value = existing
+        if rank != item['rank'] or (hot_value or '') != item['hot_value']:
+            changed.append((item_id, item))
+        else:
+            unchanged_ids.append(item_id)
+
+    return new_items, changed, unchanged_ids
+
+class CrawlRun:
+    """一次抓取运行的记录，运行结束时由 save 一次性写入"""
+
+    def __init__(self, crawl_time=None):
+        self.crawl_time = crawl_time or datetime.now()
+        self.statuses = {}
+        # rank_history 行：(news_item_id, rank, hot_value)
+        self.history = []
+        # 本次运行新入库的条目：(news_item_id, platform_id, title)
+        self.new_items = []
+
+    def set_status(self, platform_id, status):
+        """记录平台抓取状态：success / failed"""
+        self.statuses[platform_id] = status
+
+    def add_history(self, rows):
+        self.history.extend(rows)
+
+    def add_new_items(self, entries):
+        self.new_items.extend(entries)
+
+    def save(self, conn):
+        """在一个事务中写入抓取记录、各平台状态和排名历史，成功返回 True"""
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                INSERT INTO crawl_records (crawl_time, total_items)
+                VALUES (%s, %s)
+                ON CONFLICT (crawl_time) DO UPDATE SET
+                    total_items = EXCLUDED.total_items
+                RETURNING id
+            """, (self.crawl_time, len(self.history)))
+            crawl_record_id = cursor.fetchone()[0]
+
+            if self.statuses:
+                execute_values(cursor, """
+                    INSERT INTO crawl_source_status (crawl_record_id, platform_id, status)
+                    VALUES %s
+                    ON CONFLICT (crawl_record_id, platform_id) DO UPDATE SET
+                        status = EXCLUDED.status
+                """, [
+                    (crawl_record_id, platform_id, status)
+                    for platform_id, status in self.statuses.items()
+                ])
+
+            if self.history:
+                execute_values(cursor, """
+                    INSERT INTO rank_history (news_item_id, rank, hot_value, crawl_time)
+                    VALUES %s
+                """, [
+                    (news_item_id, rank, hot_value, self.crawl_time)
+                    for news_item_id, rank, hot_value in self.history
+                ], page_size=1000)
+
+            topic_count = assign_topics(cursor, self.new_items, self.crawl_time)
+            refresh_rollups(cursor, self.crawl_time)
+            rising_count = refresh_rising(cursor, self.crawl_time, [
+                platform_id for platform_id, status in self.statuses.items() if status == 'success'
+            ])
+            version, etag = refresh_snapshot(cursor, self.crawl_time)
+            if version is not None:
+                publish_update(cursor, 'snapshot', {
+                    'crawl_time': self.crawl_time, 'version': version, 'etag': etag,
+                }, crawl_time=self.crawl_time)
+
+            conn.commit()
+
+            print(f"✓ 抓取记录 #{crawl_record_id}: {len(self.statuses)} 个平台状态，"
+                  f"{len(self.history)} 条排名历史，新建 {topic_count} 个话题，飙升榜 {rising_count} 条")
+            return True
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ 抓取记录写入失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        finally:
+            cursor.close()
+
+def update_database(conn, items, run=None):
+    """
+    增量更新数据库，成功返回 True
+    传入 run 时使用本次运行的抓取时间，并把每个条目的排名记入 run 的排名历史
+    """
+    if not items:
+        return False
+
+    crawl_time = run.crawl_time if run else datetime.now()
+    items = _dedupe_items(items)
+    platform_id = items[0]['platform_id']
+    cursor = conn.cursor()
+
+    try:
+        # 过期数据由 maintenance.py 单独清理，这里不再删除
+        # news_items 分区后没有 (platform_id, title) 唯一约束，按平台加事务级咨询锁，
+        # 避免两个爬虫同时写入同一平台时重复插入
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"news_items:{platform_id}",))
+
+        previous_board = load_previous_board(cursor, platform_id, crawl_time)
+        snapshot = load_snapshot(cursor, platform_id, [item['title'] for item in items])
+        new_items, changed, unchanged_ids = diff_items(items, snapshot)
+
+        # 标题 -> news_item_id，新插入的行通过 RETURNING 取得 id
+        item_ids = {title: existing[0] for title, existing in snapshot.items()}
+        new_entries = []
+
+        # 新标题
+        if new_items:
+            inserted = execute_values(cursor, """
+                INSERT INTO news_items
+                    (platform_id, title, url, rank, hot_value,
+                     first_crawl_time, last_crawl_time, crawl_count)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+                RETURNING id, title
+            """, [
+                (
+                    item['platform_id'],
+                    item['title'],
+                    item['url'],
+                    item['rank'],
+                    item['hot_value'],
+                    crawl_time,
+                    crawl_time,
+                    1,
+                )
+                for item in new_items
+            ], fetch=True)
+            item_ids.update({title: item_id for item_id, title in inserted})
+
+            new_entries = [(item_id, platform_id, title) for item_id, title in inserted]
+
+            # 新标题入库时分词一次，建立关键词倒排索引
+            index_keywords(cursor, new_entries, crawl_time)
+
+        # 排名或热度变化的行
+        if changed:
+            execute_values(cursor, """
+                UPDATE news_items AS n SET
+                    rank = v.rank,
+                    hot_value = v.hot_value,
+                    last_crawl_time = v.crawl_time,
+                    crawl_count = n.crawl_count + 1,
+                    updated_at = v.crawl_time
+                FROM (VALUES %s) AS v(id, rank, hot_value, crawl_time)
+                WHERE n.id = v.id
+            """, [
+                (item_id, item['rank'], item['hot_value'], crawl_time)
+                for item_id, item in changed
+            ], template="(%s, %s, %s, %s::timestamptz)")
+
+        # 没有变化的行只刷新抓取时间和次数
+        if unchanged_ids:
+            cursor.execute("""
+                UPDATE news_items SET
+                    last_crawl_time = %s,
+                    crawl_count = crawl_count + 1
+                WHERE id = ANY(%s)
+            """, (crawl_time, unchanged_ids))
+
+        # 通知在事务提交后才会送达订阅者
+        publish_delta(cursor, platform_id, crawl_time, build_delta(items, item_ids, previous_board))
+
+        conn.commit()
+
+        if run is not None:
+            run.add_new_items(new_entries)
+            run.add_history([
+                (item_ids[item['title']], item['rank'], item['hot_value'])
+                for item in items
+                if item['title'] in item_ids
+            ])
+
+        print(f"✓ {platform_id}: 新增 {len(new_items)} 条，"
+              f"更新 {len(changed)} 条，未变化 {len(unchanged_ids)} 条")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 数据库更新失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        cursor.close()
+
+def refresh_unchanged_board(conn, platform_id, run=None):
+    """
+    热榜与上一次写库时相同：把该平台上一次抓取的榜单整体顺延到本次抓取，成功返回 True
+    一条语句更新 last_crawl_time / crawl_count，并把这些条目的排名记入 run 的排名历史，
+    保证排名历史和汇总表没有空缺；数据库中找不到上一次的榜单时返回 False
+    """
+    crawl_time = run.crawl_time if run else datetime.now()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"news_items:{platform_id}",))
+        cursor.execute("""
+            UPDATE news_items SET
+                last_crawl_time = %(crawl_time)s,
+                crawl_count = crawl_count + 1
+            WHERE platform_id = %(platform_id)s
+              AND last_crawl_time = (
+                  SELECT MAX(last_crawl_time) FROM news_items
+                  WHERE platform_id = %(platform_id)s AND last_crawl_time < %(crawl_time)s
+              )
+            RETURNING id, rank, hot_value
+        """, {'platform_id': platform_id, 'crawl_time': crawl_time})
+        rows = cursor.fetchall()
+        conn.commit()
+
+        if not rows:
+            print(f"  ⚠️  {platform_id}: 数据库中没有上一次的榜单")
+            return False
+
+        if run is not None:
+            run.add_history(sorted(rows, key=lambda row: row[1]))
+
+        print(f"✓ {platform_id}: 热榜未变化，顺延 {len(rows)} 条")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 数据库更新失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        cursor.close()
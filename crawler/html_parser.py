@@ -0,0 +1,34 @@
+"""
+TrendRadar 网页解析后端
+抓取网页的平台插件通过 make_soup 构建 BeautifulSoup，解析后端可通过环境变量 CRAWLER_HTML_PARSER 指定：
+- html.parser：完整解析整个页面
+- strainer：html.parser + SoupStrainer，只为需要的元素建树
+- lxml：lxml + SoupStrainer，安装了 lxml 时默认使用
+"""
+
+import os
+from bs4 import BeautifulSoup
+
+HTML_PARSERS = ('html.parser', 'strainer', 'lxml')
+
+def get_html_parser(name=None):
+    """获取网页解析后端，未指定时优先使用 lxml"""
+    name = name or os.environ.get('CRAWLER_HTML_PARSER')
+    if name:
+        if name not in HTML_PARSERS:
+            raise ValueError(f"不支持的解析后端: {name}，可选: {', '.join(HTML_PARSERS)}")
+        return name
+
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'strainer'
+
+def make_soup(html, parser=None, parse_only=None):
+    """按解析后端构建 BeautifulSoup；html.parser 后端忽略 parse_only，构建完整的树"""
+    parser = get_html_parser(parser)
+    if parser == 'html.parser':
+        return BeautifulSoup(html, 'html.parser')
+    builder = 'lxml' if parser == 'lxml' else 'html.parser'
+    return BeautifulSoup(html, builder, parse_only=parse_only)
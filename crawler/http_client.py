@@ -0,0 +1,247 @@
+"""
+TrendRadar 共享 HTTP 客户端
+两个爬虫的所有请求都通过这里发出：
+- 按主机复用连接池（keep-alive），避免每次请求重新进行 TCP + TLS 握手
+- 服务端支持时自动协商 HTTP/2（需要安装 h2）
+- 自动解压 gzip / brotli 响应（brotli 需要安装 brotli）
+- 按主机的令牌桶限速，所有爬虫共享；遇到 429 / 5xx 时按 Retry-After 或带抖动的指数退避重试，
+  并临时降低该主机的请求速率，之后逐步恢复
+"""
+
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 连接池配置：httpx 按 (协议, 主机, 端口) 维护连接，空闲连接保留 keepalive_expiry 秒
+POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=300,
+)
+
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+# 爬虫统一捕获的请求异常类型
+HTTPError = httpx.HTTPError
+
+# 每个主机默认的请求速率（次/秒）和突发上限
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 5
+
+# 需要重试的状态码；其中 429 / 503 表示服务端要求限流
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+# 指数退避：第 n 次重试等待 [0, min(BACKOFF_MAX, BACKOFF_BASE * 2^n)] 之间的随机时间
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+# Retry-After 超过该值（秒）时不再重试，直接返回响应
+RETRY_AFTER_MAX = 120.0
+# 被限流后速率最低降到配置值的比例
+MIN_RATE_RATIO = 0.1
+
+_client = None
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+class TokenBucket:
+    """
+    令牌桶：每秒补充 rate 个令牌，最多积累 burst 个
+    采用预约方式：reserve 立即扣除令牌并返回需要等待的秒数，调用方在锁外等待，
+    同步线程和协程都可以共用同一个桶
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """取一个令牌，返回需要等待的秒数"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def configure(self, rate, burst):
+        """修改配置的速率，保留当前的令牌和限流状态"""
+        with self.lock:
+            throttled = self.rate < self.max_rate
+            self.max_rate = rate
+            self.rate = min(self.rate, rate) if throttled else rate
+            self.burst = burst
+            self.tokens = min(self.tokens, burst)
+
+    def throttle(self, delay):
+        """服务端要求限流：delay 秒内暂停该主机的请求，并将速率减半"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.rate = max(self.max_rate * MIN_RATE_RATIO, self.rate / 2)
+
+    def recover(self):
+        """请求成功后逐步恢复速率"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * MIN_RATE_RATIO)
+
+def _host(url_or_host):
+    return urlparse(url_or_host).netloc or url_or_host
+
+def get_bucket(url_or_host):
+    """获取主机对应的令牌桶（首次使用时按默认速率创建）"""
+    host = _host(url_or_host)
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket()
+        return _buckets[host]
+
+def set_rate_limit(url_or_host, rate, burst=None):
+    """设置主机的请求速率（次/秒）和突发上限，已有的令牌桶保留当前状态"""
+    host = _host(url_or_host)
+    burst = burst if burst is not None else max(1, int(rate))
+    with _buckets_lock:
+        if host in _buckets:
+            _buckets[host].configure(rate, burst)
+        else:
+            _buckets[host] = TokenBucket(rate, burst)
+
+def parse_retry_after(value):
+    """解析 Retry-After 头（秒数或 HTTP 日期），无法解析时返回 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt):
+    """第 attempt 次重试前的等待时间（full jitter）"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _retry_delay(bucket, attempt, retries, response=None):
+    """
+    根据响应决定是否重试，返回等待秒数，不重试时返回 None
+    response 为 None 表示请求本身失败（连接错误、超时等）
+    """
+    if response is not None:
+        if response.status_code not in RETRY_STATUSES:
+            bucket.recover()
+            return None
+
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        delay = retry_after if retry_after is not None else backoff_delay(attempt)
+        if response.status_code in THROTTLE_STATUSES:
+            bucket.throttle(delay)
+        if attempt >= retries or delay > RETRY_AFTER_MAX:
+            return None
+        return delay
+
+    if attempt >= retries:
+        return None
+    return backoff_delay(attempt)
+
+def _client_options():
+    """同步 / 异步客户端共用的配置"""
+    # 不手动设置 Accept-Encoding 和 Connection：
+    # httpx 会根据已安装的解码器声明 gzip/deflate/br，并自行管理长连接
+    return {
+        'http2': HTTP2_AVAILABLE,
+        'limits': POOL_LIMITS,
+        'timeout': DEFAULT_TIMEOUT,
+        'follow_redirects': True,
+    }
+
+def get_client():
+    """获取进程内共享的同步客户端（线程安全，首次调用时创建）"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.Client(**_client_options())
+    return _client
+
+def create_async_client():
+    """
+    创建异步客户端
+    异步客户端绑定在创建它的事件循环上，因此每次运行单独创建，用 async with 管理
+    """
+    return httpx.AsyncClient(**_client_options())
+
+def get(url, headers=None, timeout=None, retries=0, **kwargs):
+    """
+    使用共享客户端发送 GET 请求
+    请求前按主机限速；遇到 429 / 5xx 或连接错误时最多重试 retries 次，
+    重试用尽后返回最后一次响应（或抛出最后一次请求异常）
+    """
+    if timeout is not None:
+        kwargs['timeout'] = timeout
+    bucket = get_bucket(url)
+
+    for attempt in range(retries + 1):
+        time.sleep(bucket.reserve())
+        try:
+            response = get_client().get(url, headers=headers, **kwargs)
+        except httpx.TransportError as e:
+            delay = _retry_delay(bucket, attempt, retries)
+            if delay is None:
+                raise
+            print(f"  {_host(url)} 请求失败: {e}，{delay:.1f}秒后重试 ({attempt + 1}/{retries})")
+        else:
+            delay = _retry_delay(bucket, attempt, retries, response)
+            if delay is None:
+                return response
+            print(f"  {_host(url)} 返回 {response.status_code}，{delay:.1f}秒后重试 ({attempt + 1}/{retries})")
+        time.sleep(delay)
+
+async def async_get(client, url, headers=None, timeout=None, retries=0, **kwargs):
+    """异步版本的 get，使用调用方创建的异步客户端，限速和重试规则相同"""
+    if timeout is not None:
+        kwargs['timeout'] = timeout
+    bucket = get_bucket(url)
+
+    for attempt in range(retries + 1):
+        await asyncio.sleep(bucket.reserve())
+        try:
+            response = await client.get(url, headers=headers, **kwargs)
+        except httpx.TransportError as e:
+            delay = _retry_delay(bucket, attempt, retries)
+            if delay is None:
+                raise
+            print(f"  {_host(url)} 请求失败: {e}，{delay:.1f}秒后重试 ({attempt + 1}/{retries})")
+        else:
+            delay = _retry_delay(bucket, attempt, retries, response)
+            if delay is None:
+                return response
+            print(f"  {_host(url)} 返回 {response.status_code}，{delay:.1f}秒后重试 ({attempt + 1}/{retries})")
+        await asyncio.sleep(delay)
+
+def close_client():
+    """关闭共享客户端，释放连接池"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
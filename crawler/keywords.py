@@ -0,0 +1,127 @@
+"""
+TrendRadar 关键词提取
+新标题入库时分词一次，写入 keyword_postings（关键词 -> news_item_id 倒排表）
+并累加 keyword_counts 中当天的计数，关键词页面只需按索引查询
+
+分词器可插拔：
+- jieba：安装了 jieba 时默认使用
+- bigram：不依赖第三方库，中文按相邻两字切分，英文 / 数字按单词切分
+可通过环境变量 KEYWORD_TOKENIZER 指定，或用 register_tokenizer 注册新的分词器
+"""
+
+import os
+import re
+from collections import defaultdict
+from psycopg2.extras import execute_values
+
+from rollups import ROLLUP_TIMEZONE
+
+# 关键词最短长度
+MIN_KEYWORD_LENGTH = 2
+
+STOPWORDS = {
+    '的', '了', '是', '在', '和', '与', '及', '或', '被', '把', '对', '为', '将', '从',
+    '一个', '这个', '那个', '什么', '怎么', '如何', '为什么', '还是', '就是', '已经',
+    '可以', '没有', '不是', '我们', '你们', '他们', '自己', '大家', '如果', '因为',
+    '所以', '但是', '而且', '然后', '这些', '那些', '其中', '回应', '网友', '官方',
+    'the', 'and', 'for', 'with', 'from', 'this', 'that',
+}
+
+_CJK_RUN = re.compile(r'[\u4e00-\u9fff]+')
+_WORD = re.compile(r'[A-Za-z][A-Za-z0-9+#.\-]*|\d+(?:\.\d+)?')
+_HAS_CONTENT = re.compile(r'[\u4e00-\u9fffA-Za-z]')
+
+def _bigram_tokenize(text):
+    """中文按相邻两字切分，英文 / 数字按单词切分"""
+    tokens = [match.group(0).lower() for match in _WORD.finditer(text)]
+    for run in _CJK_RUN.findall(text):
+        if len(run) <= MIN_KEYWORD_LENGTH:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+def _jieba_tokenize(text):
+    import jieba
+    return [token.strip().lower() for token in jieba.lcut(text)]
+
+TOKENIZERS = {
+    'bigram': _bigram_tokenize,
+    'jieba': _jieba_tokenize,
+}
+
+def register_tokenizer(name, func):
+    """注册分词器：func(text) -> list[str]"""
+    TOKENIZERS[name] = func
+
+def get_tokenizer(name=None):
+    """获取分词器，未指定时优先使用 jieba"""
+    name = name or os.environ.get('KEYWORD_TOKENIZER')
+    if name:
+        return TOKENIZERS[name]
+
+    try:
+        import jieba  # noqa: F401
+        return TOKENIZERS['jieba']
+    except ImportError:
+        return TOKENIZERS['bigram']
+
+def extract_keywords(title, tokenizer=None):
+    """提取标题中的关键词（去重，保持出现顺序）"""
+    tokenizer = tokenizer or get_tokenizer()
+    keywords = []
+    seen = set()
+    for token in tokenizer(title):
+        if (len(token) < MIN_KEYWORD_LENGTH
+                or token in STOPWORDS
+                or token in seen
+                or not _HAS_CONTENT.search(token)):
+            continue
+        seen.add(token)
+        keywords.append(token)
+    return keywords
+
+def index_keywords(cursor, entries, crawl_time, tokenizer=None):
+    """
+    为新入库的条目建立关键词倒排索引
+    entries: [(news_item_id, platform_id, title)]
+    与新闻写入在同一事务中执行，返回写入的倒排记录数
+    """
+    tokenizer = tokenizer or get_tokenizer()
+    postings = [
+        (keyword, news_item_id, platform_id, crawl_time)
+        for news_item_id, platform_id, title in entries
+        for keyword in extract_keywords(title, tokenizer)
+    ]
+    if not postings:
+        return 0
+
+    inserted = execute_values(cursor, """
+        INSERT INTO keyword_postings (keyword, news_item_id, platform_id, first_seen)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING keyword, platform_id
+    """, postings, page_size=1000, fetch=True)
+
+    # 按关键词汇总本批新增的计数和平台
+    counts = defaultdict(lambda: [0, set()])
+    for keyword, platform_id in inserted:
+        counts[keyword][0] += 1
+        counts[keyword][1].add(platform_id)
+
+    if counts:
+        execute_values(cursor, """
+            INSERT INTO keyword_counts (keyword, day, item_count, platforms)
+            VALUES %s
+            ON CONFLICT (day, keyword) DO UPDATE SET
+                item_count = keyword_counts.item_count + EXCLUDED.item_count,
+                platforms = ARRAY(
+                    SELECT DISTINCT unnest(keyword_counts.platforms || EXCLUDED.platforms)
+                )
+        """, [
+            (keyword, crawl_time, count, sorted(platforms))
+            for keyword, (count, platforms) in counts.items()
+        ], template=f"(%s, (%s::timestamptz AT TIME ZONE '{ROLLUP_TIMEZONE}')::date, %s, %s::text[])",
+            page_size=1000)
+
+    return len(inserted)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+TrendRadar 数据保留维护
+与抓取分开执行，抓取写入时不再删除旧数据：
+- 分区表（执行过 supabase/partitioning.sql）：预先创建未来几天的分区，
+  过期分区先分离，可选导出为 csv.gz 归档，再删除；关键词倒排和标题变更中对应的行一并删除
+- 未分区的表：分批删除超过保留期的新闻，先删除关键词倒排和标题变更中对应的行
+  （title_changes 的外键没有级联删除），排名历史通过外键级联删除
+- 实时更新记录（news_updates）只保留最近一天，用于订阅方断线重连后补齐
+
+news_items 按首次抓取时间分区，分区中仍有条目在保留期内被抓到时暂不删除该分区
+维护中断超过预建天数时，超出分区范围的行会写入默认分区；下次运行时为这些日期补建分区并把行移出
+
+使用方法:
+    python maintenance.py                              # 创建分区并清理过期数据
+    python maintenance.py --archive-dir ./archive      # 删除前把过期分区导出为 csv.gz
+    python maintenance.py --keep-detached              # 只分离过期分区，不删除
+    python maintenance.py --news-days 3 --history-days 90
+"""
+
+import os
+import sys
+import gzip
+import argparse
+from datetime import datetime, timedelta, timezone
+import psycopg2
+from psycopg2 import sql
+
+from updates import UPDATES_RETENTION_DAYS
+
+# 新闻保留天数：最后一次被抓到的时间超过该天数的条目会被清理
+NEWS_RETENTION_DAYS = 1
+# 排名历史保留天数（仅分区表；未分区时随新闻级联删除）
+HISTORY_RETENTION_DAYS = 30
+# 预先创建未来多少天的分区
+PREMAKE_DAYS = 7
+# 未分区时每批删除的行数，避免长事务和大量锁
+DELETE_BATCH_SIZE = 5000
+
+# 分区表及其分区键
+PARTITIONED_TABLES = {
+    'news_items': 'first_crawl_time',
+    'rank_history': 'crawl_time',
+}
+
+# 引用 news_items(id) 的表，删除新闻（分区）时先行清理
+NEWS_DEPENDENTS = ('keyword_postings', 'title_changes')
+
+def get_database_connection():
+    """获取数据库连接"""
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        raise ValueError("DATABASE_URL 环境变量未设置")
+    return psycopg2.connect(db_url)
+
+def partition_name(table, day):
+    return f"{table}_p{day.strftime('%Y%m%d')}"
+
+def is_partitioned(cursor, table):
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)
+        )
+    """, (table,))
+    return cursor.fetchone()[0]
+
+def list_partitions(cursor, table):
+    """按天的分区：[(分区名, 日期)]，按日期排序，不包含默认分区"""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, (table,))
+
+    prefix = f"{table}_p"
+    partitions = []
+    for (name,) in cursor.fetchall():
+        if not name.startswith(prefix):
+            continue
+        try:
+            day = datetime.strptime(name[len(prefix):], '%Y%m%d').date()
+        except ValueError:
+            continue
+        partitions.append((name, day))
+    return sorted(partitions, key=lambda p: p[1])
+
+def default_partition_days(cursor, table):
+    """默认分区中的行所在的日期（UTC）：[日期]"""
+    name = f"{table}_default"
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (name,))
+    if not cursor.fetchone()[0]:
+        return []
+    cursor.execute(sql.SQL("""
+        SELECT DISTINCT ({} AT TIME ZONE 'UTC')::date FROM {} ORDER BY 1
+    """).format(sql.Identifier(PARTITIONED_TABLES[table]), sql.Identifier(name)))
+    return [row[0] for row in cursor.fetchall()]
+
+def create_partition(cursor, table, day, move_from_default=False):
+    """
+    创建某一天（UTC）的分区
+    默认分区中已有该范围的行时，Postgres 不允许直接创建分区：先分离默认分区，创建分区并把这些行移入，
+    再重新挂回默认分区；在调用方的事务中执行
+    """
+    name = partition_name(table, day)
+    default = f"{table}_default"
+    lower = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    upper = lower + timedelta(days=1)
+
+    if move_from_default:
+        cursor.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+            sql.Identifier(table), sql.Identifier(default)))
+
+    cursor.execute(sql.SQL("""
+        CREATE TABLE IF NOT EXISTS {} PARTITION OF {}
+        FOR VALUES FROM (%s) TO (%s)
+    """).format(sql.Identifier(name), sql.Identifier(table)), (lower, upper))
+
+    if move_from_default:
+        key = sql.Identifier(PARTITIONED_TABLES[table])
+        cursor.execute(sql.SQL("""
+            WITH moved AS (
+                DELETE FROM {} WHERE {} >= %s AND {} < %s RETURNING *
+            )
+            INSERT INTO {} SELECT * FROM moved
+        """).format(sql.Identifier(default), key, key, sql.Identifier(name)), (lower, upper))
+        print(f"  ✓ {name}: 从默认分区移入 {cursor.rowcount} 行")
+        cursor.execute(sql.SQL("ALTER TABLE {} ATTACH PARTITION {} DEFAULT").format(
+            sql.Identifier(table), sql.Identifier(default)))
+
+def ensure_partitions(conn, table, days_ahead=PREMAKE_DAYS):
+    """
+    创建从今天起未来 days_ahead 天的分区（UTC），返回新建的分区数
+    维护中断期间写入默认分区的行，按日期补建分区并移出默认分区，之后可按保留期正常清理
+    """
+    cursor = conn.cursor()
+    created = 0
+
+    try:
+        today = datetime.now(timezone.utc).date()
+        existing = {name for name, _ in list_partitions(cursor, table)}
+        stranded = set(default_partition_days(cursor, table))
+        days = sorted(stranded | {today + timedelta(days=offset) for offset in range(days_ahead + 1)})
+
+        for day in days:
+            if partition_name(table, day) in existing:
+                continue
+            create_partition(cursor, table, day, move_from_default=day in stranded)
+            # 每个分区单独提交，分离默认分区期间会阻塞写入，事务尽量短
+            conn.commit()
+            created += 1
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+    return created
+
+def archive_partition(cursor, name, archive_dir):
+    """把分区导出为 archive_dir/<分区名>.csv.gz，边读边压缩，不占用额外内存"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        cursor.copy_expert(
+            sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER)").format(sql.Identifier(name)).as_string(cursor),
+            f,
+        )
+    os.replace(tmp_path, path)
+    return path
+
+def _partition_is_live(cursor, name, cutoff):
+    """新闻分区中是否还有在保留期内被抓到的条目"""
+    cursor.execute(sql.SQL("SELECT EXISTS (SELECT 1 FROM {} WHERE last_crawl_time >= %s)").format(
+        sql.Identifier(name)), (cutoff,))
+    return cursor.fetchone()[0]
+
+def expire_partitions(conn, table, cutoff, archive_dir=None, keep_detached=False):
+    """分离（并归档 / 删除）整个时间范围都早于 cutoff 的分区，返回处理的分区数"""
+    cursor = conn.cursor()
+    expired = 0
+
+    try:
+        for name, day in list_partitions(cursor, table):
+            upper = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(days=1)
+            if upper > cutoff:
+                break
+            if table == 'news_items' and _partition_is_live(cursor, name, cutoff):
+                print(f"  {name}: 仍有条目在保留期内，暂不清理")
+                continue
+
+            cursor.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                sql.Identifier(table), sql.Identifier(name)))
+
+            if table == 'news_items':
+                for dependent in NEWS_DEPENDENTS:
+                    cursor.execute(sql.SQL("""
+                        DELETE FROM {} WHERE news_item_id IN (SELECT id FROM {})
+                    """).format(sql.Identifier(dependent), sql.Identifier(name)))
+
+            if archive_dir:
+                path = archive_partition(cursor, name, archive_dir)
+                print(f"  ✓ {name} 已归档到 {path}")
+
+            if keep_detached:
+                print(f"  ✓ {name} 已分离")
+            else:
+                cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+                print(f"  ✓ {name} 已删除")
+
+            # 每个分区单独提交，归档失败时不影响已处理的分区
+            conn.commit()
+            expired += 1
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+    return expired
+
+def delete_expired_news(conn, cutoff, batch_size=DELETE_BATCH_SIZE):
+    """
+    未分区时分批删除过期新闻，返回删除的行数
+    每批先删除 NEWS_DEPENDENTS 中引用这些新闻的行，再删除新闻本身；排名历史由外键级联删除
+    """
+    cursor = conn.cursor()
+    total = 0
+
+    try:
+        while True:
+            # 锁定本批条目，避免爬虫在删除期间把它们重新写入榜单
+            cursor.execute("""
+                SELECT id FROM news_items
+                WHERE last_crawl_time < %s
+                LIMIT %s
+                FOR UPDATE
+            """, (cutoff, batch_size))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+
+            for dependent in NEWS_DEPENDENTS:
+                cursor.execute(sql.SQL("DELETE FROM {} WHERE news_item_id = ANY(%s)").format(
+                    sql.Identifier(dependent)), (ids,))
+            cursor.execute("DELETE FROM news_items WHERE id = ANY(%s)", (ids,))
+            total += cursor.rowcount
+            conn.commit()
+            if len(ids) < batch_size:
+                break
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+    return total
+
+def delete_expired_updates(conn, cutoff):
+    """删除过期的实时更新记录，返回删除的行数"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM news_updates WHERE created_at < %s", (cutoff,))
+        conn.commit()
+        return cursor.rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def run_maintenance(conn, news_days=NEWS_RETENTION_DAYS, history_days=HISTORY_RETENTION_DAYS,
+                    archive_dir=None, keep_detached=False):
+    """执行一次保留维护"""
+    now = datetime.now(timezone.utc)
+    cutoffs = {
+        'news_items': now - timedelta(days=news_days),
+        'rank_history': now - timedelta(days=history_days),
+    }
+
+    cursor = conn.cursor()
+    partitioned = {table: is_partitioned(cursor, table) for table in PARTITIONED_TABLES}
+    cursor.close()
+    conn.rollback()
+
+    for table in PARTITIONED_TABLES:
+        if not partitioned[table]:
+            continue
+        created = ensure_partitions(conn, table)
+        expired = expire_partitions(conn, table, cutoffs[table], archive_dir, keep_detached)
+        print(f"✓ {table}: 新建 {created} 个分区，清理 {expired} 个过期分区")
+
+    if not partitioned['news_items']:
+        deleted = delete_expired_news(conn, cutoffs['news_items'])
+        print(f"✓ news_items: 删除 {deleted} 条过期新闻")
+
+    deleted = delete_expired_updates(conn, now - timedelta(days=UPDATES_RETENTION_DAYS))
+    print(f"✓ news_updates: 删除 {deleted} 条过期更新记录")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='TrendRadar 数据保留维护')
+    parser.add_argument('--news-days', type=float, default=NEWS_RETENTION_DAYS, help='新闻保留天数')
+    parser.add_argument('--history-days', type=float, default=HISTORY_RETENTION_DAYS,
+                        help='排名历史保留天数（仅分区表）')
+    parser.add_argument('--archive-dir', default=None, help='删除前把过期分区导出为 csv.gz 的目录')
+    parser.add_argument('--keep-detached', action='store_true', help='只分离过期分区，不删除')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print(f"开始数据保留维护 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    conn = get_database_connection()
+    try:
+        run_maintenance(conn, args.news_days, args.history_days, args.archive_dir, args.keep_detached)
+    except Exception as e:
+        print(f"❌ 维护失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        conn.close()
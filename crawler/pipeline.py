@@ -0,0 +1,86 @@
+"""
+TrendRadar 抓取流水线
+把网络请求和 CPU 密集的解析拆成两个阶段，解析不再与事件循环争抢 GIL：
+- 抓取：各数据源的协程并发请求，原始响应内容放入有界队列；
+  队列满时抓取协程等待（背压），内存占用不随数据源数量增长
+- 解析：ProcessPoolExecutor 中的工作进程把原始内容解析成条目
+解析结果按完成顺序交给 handle 协程（写库）
+"""
+
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+# 默认解析进程数
+PARSE_WORKERS = os.cpu_count() or 1
+
+# 等待解析的原始响应最多排队的数量
+QUEUE_SIZE = 32
+
+async def run_pipeline(sources, fetch, parse, handle, workers=PARSE_WORKERS, queue_size=QUEUE_SIZE,
+                       timeout=None, pool=None):
+    """
+    运行两阶段流水线，返回超时后放弃的数据源数量
+    - fetch(source)：协程，返回 bytes 时交给解析进程，返回其他值（如 UNCHANGED、[]）时直接交给 handle
+    - parse(source, content)：在解析进程中执行，必须是模块级函数（可被 pickle）
+    - handle(source, items)：协程，处理解析结果；多个结果可能同时到达，需要自行串行化写库。
+      抓取或解析抛出异常时 items 为 None（失败），与解析出空列表区分开
+    timeout 只限制抓取阶段：超时后取消未完成的请求；已取得的内容（包括因队列已满还在等待入队的）
+    仍会解析并交给 handle，不会在写库过程中途取消
+    pool 为调用方创建的进程池时复用该进程池（常驻进程中避免每次运行重新启动解析进程），
+    否则本次运行单独创建
+    """
+    queue = asyncio.Queue(maxsize=queue_size)
+    loop = asyncio.get_running_loop()
+    # 超时时已取得内容、但还在等待入队的结果
+    fetched = []
+
+    async def produce(source):
+        try:
+            result = await fetch(source)
+        except Exception as e:
+            print(f"  {source} 抓取失败: {e}")
+            result = None
+        try:
+            await queue.put((source, result))
+        except asyncio.CancelledError:
+            fetched.append((source, result))
+            raise
+
+    async def consume(pool):
+        while True:
+            source, result = await queue.get()
+            try:
+                if isinstance(result, bytes):
+                    try:
+                        result = await loop.run_in_executor(pool, parse, source, result)
+                    except Exception as e:
+                        print(f"  {source} 解析失败: {e}")
+                        result = None
+                await handle(source, result)
+            except Exception as e:
+                print(f"  {source} 处理失败: {e}")
+            finally:
+                queue.task_done()
+
+    owns_pool = pool is None
+    if owns_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    consumers = [asyncio.create_task(consume(pool)) for _ in range(workers)]
+    try:
+        producers = [asyncio.create_task(produce(source)) for source in sources]
+        _, pending = await asyncio.wait(producers, timeout=timeout) if producers else (set(), set())
+        for producer in pending:
+            producer.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        # 取消只放弃还在请求中的数据源，已取得的内容在消费者腾出队列后继续入队
+        for item in fetched:
+            await queue.put(item)
+        await queue.join()
+        return len(pending) - len(fetched)
+    finally:
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        if owns_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
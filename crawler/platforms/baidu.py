@@ -0,0 +1,53 @@
+"""百度热搜：爬取热搜榜页面，数据在页面的 <!--s-data:...--> 注释中"""
+
+import json
+
+NAME = '百度热搜'
+URL = 'https://top.baidu.com/board?tab=realtime'
+
+BAIDU_DATA_PREFIX = '<!--s-data:'
+BAIDU_DATA_SUFFIX = '-->'
+
+def find_baidu_data(html):
+    """
+    查找 <!--s-data:...--> 注释中的 JSON 文本，没有时返回 None
+    与正则 <!--s-data:(.*?)--> 的匹配结果一致（内容中不能有换行），
+    但只用 str.find 顺序扫描，不需要在每个位置尝试匹配
+    """
+    pos = 0
+    while True:
+        start = html.find(BAIDU_DATA_PREFIX, pos)
+        if start == -1:
+            return None
+        start += len(BAIDU_DATA_PREFIX)
+        end = html.find(BAIDU_DATA_SUFFIX, start)
+        if end == -1:
+            return None
+        newline = html.find('\n', start, end)
+        if newline == -1:
+            return html[start:end]
+        # 注释内容跨行，正则不会匹配，从换行之后继续查找
+        pos = newline
+
+def parse(html, top_n=20):
+    """解析百度热搜榜页面"""
+    payload = find_baidu_data(html)
+
+    items = []
+    if payload is not None:
+        data = json.loads(payload)
+        cards = data.get('data', {}).get('cards', [])
+
+        for card in cards:
+            if card.get('type') == 'toplist1':
+                for idx, item in enumerate(card.get('content', [])[:top_n], 1):
+                    items.append({
+                        'platform_id': 'baidu',
+                        'title': item.get('word', ''),
+                        'url': item.get('url', ''),
+                        'rank': idx,
+                        'hot_value': str(item.get('hotScore', '')),
+                    })
+                break
+
+    return items
@@ -0,0 +1,23 @@
+"""B站热门：使用B站热门视频 API"""
+
+import json
+
+NAME = 'B站热门'
+URL = 'https://api.bilibili.com/x/web-interface/popular'
+
+def parse(text, top_n=20):
+    """解析B站热门 API 返回的 JSON"""
+    data = json.loads(text)
+
+    items = []
+    if data.get('code') == 0:
+        for idx, item in enumerate(data.get('data', {}).get('list', [])[:top_n], 1):
+            items.append({
+                'platform_id': 'bilibili',
+                'title': item.get('title', ''),
+                'url': item.get('short_link_v2', ''),
+                'rank': idx,
+                'hot_value': str(item.get('stat', {}).get('view', '')),
+            })
+
+    return items
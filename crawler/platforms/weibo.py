@@ -0,0 +1,45 @@
+"""微博热搜：爬取热搜榜页面"""
+
+from bs4 import SoupStrainer
+
+from html_parser import make_soup
+
+NAME = '微博热搜'
+URL = 'https://s.weibo.com/top/summary'
+
+# 微博热搜页面中需要的单元格：td-02 为标题，td-03 为热度
+WEIBO_CELL_CLASSES = {'td-02', 'td-03'}
+
+def _is_weibo_cell(class_value):
+    # 解析过程中 class 属性是未拆分的字符串，多个 class 时需要拆开比较
+    return class_value is not None and not WEIBO_CELL_CLASSES.isdisjoint(class_value.split())
+
+WEIBO_CELLS = SoupStrainer('td', class_=_is_weibo_cell)
+
+def parse(html, top_n=20, parser=None):
+    """解析微博热搜榜页面"""
+    soup = make_soup(html, parser, parse_only=WEIBO_CELLS)
+    items = []
+
+    # 查找热搜列表
+    hot_list = soup.find_all('td', class_='td-02')
+
+    for idx, item in enumerate(hot_list[:top_n], 1):
+        link = item.find('a')
+        if link:
+            title = link.get_text(strip=True)
+            href = link.get('href', '')
+
+            # 获取热度值
+            hot_span = item.find_next('td', class_='td-03')
+            hot_value = hot_span.get_text(strip=True) if hot_span else ''
+
+            items.append({
+                'platform_id': 'weibo',
+                'title': title,
+                'url': f"https://s.weibo.com{href}" if href else '',
+                'rank': idx,
+                'hot_value': hot_value,
+            })
+
+    return items
@@ -0,0 +1,23 @@
+"""知乎热榜：使用知乎 API"""
+
+import json
+
+NAME = '知乎热榜'
+URL = 'https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total'
+
+def parse(text, top_n=20):
+    """解析知乎热榜 API 返回的 JSON"""
+    data = json.loads(text)
+
+    items = []
+    for idx, item in enumerate(data.get('data', [])[:top_n], 1):
+        target = item.get('target', {})
+        items.append({
+            'platform_id': 'zhihu',
+            'title': target.get('title', ''),
+            'url': target.get('url', ''),
+            'rank': idx,
+            'hot_value': str(item.get('detail_text', '')),
+        })
+
+    return items
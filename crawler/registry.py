@@ -0,0 +1,108 @@
+"""
+TrendRadar 平台插件注册表
+crawler_v2 的每个平台是一个插件模块，模块中定义：
+- NAME：平台名称；URL：抓取地址
+- parse(text, top_n)：把响应文本解析成条目列表
+- 可选 TOP_N / TIMEOUT / RATE / RETRIES / HEADERS / ENCODING 覆盖默认限制
+- 可选 fetch(platform, cache)：需要特殊请求方式时自定义抓取，返回条目列表或 UNCHANGED
+
+插件来源：
+- platforms/ 目录，以及环境变量 CRAWLER_PLUGIN_PATH 中列出的目录（每个 .py 文件一个平台）
+- 已安装包中 trendradar.platforms 分组的 entry point（指向插件模块）
+发现阶段只列出平台 ID，插件模块在平台被启用、第一次使用时才导入
+"""
+
+import os
+import importlib.util
+from functools import lru_cache
+from importlib.metadata import entry_points
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'platforms')
+ENTRY_POINT_GROUP = 'trendradar.platforms'
+
+# 插件未指定时使用的默认限制
+DEFAULT_TOP_N = 20          # 每次保留的条目数
+DEFAULT_TIMEOUT = 10        # 请求超时（秒）
+DEFAULT_RATE = 0.5          # 每秒最多请求次数（按主机限速，见 http_client.set_rate_limit）
+DEFAULT_RETRIES = 2         # 遇到 429 / 5xx 或连接错误时的重试次数
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+
+_loaded = {}
+
+def plugin_dirs():
+    """插件目录列表，内置目录在前"""
+    extra = os.environ.get('CRAWLER_PLUGIN_PATH', '')
+    return [PLUGIN_DIR] + [path for path in extra.split(os.pathsep) if path]
+
+def _file_loader(platform_id, path):
+    def load():
+        spec = importlib.util.spec_from_file_location(f'trendradar_platform_{platform_id}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
+
+@lru_cache(maxsize=None)
+def discover():
+    """发现所有平台插件（不导入插件模块）：{platform_id: loader}"""
+    loaders = {}
+
+    for directory in plugin_dirs():
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            platform_id, ext = os.path.splitext(filename)
+            if ext != '.py' or platform_id.startswith('_'):
+                continue
+            loaders.setdefault(platform_id, _file_loader(platform_id, os.path.join(directory, filename)))
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        loaders.setdefault(entry_point.name, entry_point.load)
+
+    return loaders
+
+class Platform:
+    """已加载的平台插件"""
+
+    def __init__(self, platform_id, module):
+        self.id = platform_id
+        self.module = module
+        self.name = getattr(module, 'NAME', platform_id)
+        self.url = getattr(module, 'URL', None)
+        self.top_n = getattr(module, 'TOP_N', DEFAULT_TOP_N)
+        self.timeout = getattr(module, 'TIMEOUT', DEFAULT_TIMEOUT)
+        self.rate = getattr(module, 'RATE', DEFAULT_RATE)
+        self.retries = getattr(module, 'RETRIES', DEFAULT_RETRIES)
+        self.headers = getattr(module, 'HEADERS', DEFAULT_HEADERS)
+        self.encoding = getattr(module, 'ENCODING', 'utf-8')
+        self.fetch = getattr(module, 'fetch', None)
+
+    def parse(self, text, **kwargs):
+        return self.module.parse(text, self.top_n, **kwargs)
+
+def load_platform(platform_id):
+    """导入平台插件（每个平台只导入一次）"""
+    if platform_id not in _loaded:
+        loaders = discover()
+        if platform_id not in loaders:
+            raise KeyError(f"未找到平台插件: {platform_id}")
+        _loaded[platform_id] = Platform(platform_id, loaders[platform_id]())
+    return _loaded[platform_id]
+
+def enabled_platforms(selected=None):
+    """
+    本次运行启用的平台 ID
+    selected 或环境变量 CRAWLER_PLATFORMS（逗号分隔）指定时只启用这些平台，否则启用全部已发现的平台
+    """
+    available = discover()
+    selected = selected or os.environ.get('CRAWLER_PLATFORMS')
+    if not selected:
+        return list(available)
+
+    platform_ids = [pid.strip() for pid in selected.split(',') if pid.strip()]
+    unknown = [pid for pid in platform_ids if pid not in available]
+    if unknown:
+        raise ValueError(f"未找到平台插件: {', '.join(unknown)}，可选: {', '.join(available)}")
+    return platform_ids
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+TrendRadar 飙升榜
+每次抓取结束时读取最近一段时间的 rank_history，用 NumPy 对整个窗口向量化计算每个在榜条目的：
+- rank_delta：与上一次抓取相比上升的名次
+- hot_growth：热度（hot_value 解析为数值）相对上一次抓取每小时的增长率
+- score：按时间指数衰减的趋势分，越近的上升权重越大；
+  名次变化按平台榜单长度归一化，便于跨平台比较；新上榜的条目视为从榜单末尾升上来
+各平台和全站（scope = 'all'）得分最高的条目写入 rising_items，首页和 API 直接读取
+每个平台使用它最近一次写入的榜单（与首页快照相同），只重写本次抓取到的平台和全站的榜单，
+守护进程每轮只抓取部分平台、或两个爬虫分别运行时，其他平台的飙升榜保持不变
+
+使用方法:
+    python rising.py                 # 按最近一次抓取重新计算
+"""
+
+import os
+import re
+import sys
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+# 计算使用的历史窗口
+RISING_WINDOW = timedelta(hours=24)
+# 趋势分的半衰期：越早的变化权重越低
+RISING_HALF_LIFE = timedelta(hours=3)
+# 热度增长（对数）在趋势分中的权重
+HOT_WEIGHT = 0.5
+# 单次热度增长计入趋势分的上限（倍数），避免热度从占位值跳到正常值时压过名次变化
+MAX_HOT_STEP = 10
+# 每个平台 / 全站保留的条目数
+RISING_TOP_K = 20
+# 全站榜单的范围名
+OVERALL_SCOPE = 'all'
+
+HOT_VALUE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(万|亿|[wWkK])?')
+HOT_VALUE_UNITS = {None: 1, '万': 1e4, 'w': 1e4, 'W': 1e4, '亿': 1e8, 'k': 1e3, 'K': 1e3}
+
+def parse_hot_value(text):
+    """把 '1234万热度'、'3.2亿'、'1,234,567' 这类热度解析为数值，无法解析时返回 NaN"""
+    match = HOT_VALUE_PATTERN.search((text or '').replace(',', ''))
+    if not match:
+        return np.nan
+    return float(match.group(1)) * HOT_VALUE_UNITS[match.group(2)]
+
+def parse_hot_values(values):
+    """批量解析热度：相同的字符串只解析一次"""
+    unique, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return np.array([parse_hot_value(value) for value in unique], dtype=np.float64)[inverse]
+
+# 窗口内每个平台最近一次写入的榜单
+BOARD_ITEMS_SQL = """
+    SELECT n.*
+    FROM news_items n
+    JOIN (
+        SELECT platform_id, MAX(last_crawl_time) AS board_time
+        FROM news_items
+        WHERE last_crawl_time > %(start)s AND last_crawl_time <= %(end)s
+        GROUP BY platform_id
+    ) b ON b.platform_id = n.platform_id AND n.last_crawl_time = b.board_time
+"""
+
+def load_window(cursor, crawl_time):
+    """
+    读取窗口内各平台当前榜单上的条目的排名历史，按 (条目, 抓取时间) 排序
+    返回 (历史行, 条目信息 {id: (platform_id, title, url, hot_value, 首次抓取时间戳)})
+    """
+    params = {'start': crawl_time - RISING_WINDOW, 'end': crawl_time}
+    cursor.execute(f"""
+        SELECT rh.news_item_id, EXTRACT(EPOCH FROM rh.crawl_time), rh.rank, COALESCE(rh.hot_value, '')
+        FROM rank_history rh
+        JOIN ({BOARD_ITEMS_SQL}) n ON n.id = rh.news_item_id
+        WHERE rh.crawl_time > %(start)s AND rh.crawl_time <= %(end)s
+        ORDER BY rh.news_item_id, rh.crawl_time
+    """, params)
+    history = cursor.fetchall()
+
+    cursor.execute(f"""
+        SELECT id, platform_id, title, url, hot_value, EXTRACT(EPOCH FROM first_crawl_time)
+        FROM ({BOARD_ITEMS_SQL}) n
+    """, params)
+    items = {row[0]: row[1:] for row in cursor.fetchall()}
+    return history, items
+
+def compute_scores(item_ids, times, ranks, hot, platform_codes, first_seen):
+    """
+    向量化计算每个条目的指标，输入为按 (条目, 时间) 排序的等长数组：
+    item_ids / times（秒）/ ranks / hot（NaN 表示无法解析）/ platform_codes（平台编号），
+    first_seen 为每行所属条目的首次抓取时间（秒）；以最近一次抓取时间为当前时间
+    返回 (条目 id, 当前排名, 上一次排名, rank_delta, hot_growth, score)，每个条目一行
+    """
+    count = len(item_ids)
+    now = times.max()
+    window_start = now - RISING_WINDOW.total_seconds()
+    starts = np.flatnonzero(np.r_[True, item_ids[1:] != item_ids[:-1]])
+    ends = np.r_[starts[1:], count] - 1
+    group = np.cumsum(np.r_[True, item_ids[1:] != item_ids[:-1]]) - 1
+
+    # 各平台窗口内的榜单长度，用于归一化名次变化
+    board_size = np.zeros(platform_codes.max() + 1)
+    np.maximum.at(board_size, platform_codes, ranks + 1)
+    board_size = board_size[platform_codes]
+
+    # 相邻两次抓取的变化：名次上升为正，热度取对数增长
+    same = np.r_[False, item_ids[1:] == item_ids[:-1]]
+    previous_rank = np.r_[np.nan, ranks[:-1]]
+    climb = np.where(same, previous_rank - ranks, 0.0)
+    # 窗口内新上榜的条目，第一次出现视为从榜单末尾升上来
+    entered = ~same & (first_seen > window_start)
+    climb = np.where(entered, board_size - ranks, climb)
+
+    previous_hot = np.r_[np.nan, hot[:-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hot_log = np.where(same & (hot > 0) & (previous_hot > 0), np.log(hot / previous_hot), 0.0)
+    hot_log = np.clip(hot_log, -np.log(MAX_HOT_STEP), np.log(MAX_HOT_STEP))
+
+    weight = np.exp2(-(now - times) / RISING_HALF_LIFE.total_seconds())
+    score = np.bincount(group, weight * (climb / board_size + HOT_WEIGHT * hot_log), minlength=len(starts))
+
+    # 最近一步的名次和热度变化
+    has_previous = ends > starts
+    last_previous = np.where(has_previous, ends - 1, ends)
+    rank_now = ranks[ends]
+    rank_before = np.where(has_previous, ranks[last_previous], np.nan)
+    hours = np.where(has_previous, (times[ends] - times[last_previous]) / 3600, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hot_growth = (hot[ends] - hot[last_previous]) / hot[last_previous] / hours
+    hot_growth = np.where(has_previous & (hot[last_previous] > 0) & np.isfinite(hot_growth), hot_growth, np.nan)
+
+    return item_ids[starts], rank_now, rank_before, rank_before - rank_now, hot_growth, score
+
+def _value(number, cast):
+    return None if np.isnan(number) else cast(number)
+
+def refresh_rising(cursor, crawl_time, platforms=None, top_k=RISING_TOP_K):
+    """
+    重新计算飙升榜并写入 rising_items，返回写入的行数；在调用方的事务中执行
+    platforms 为本次抓取成功的平台，只重写这些平台和全站的榜单；为 None 时重写所有平台
+    """
+    # 两个爬虫同时结束时依次重写，避免全站榜单的主键冲突
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext('rising_items'))")
+    history, items = load_window(cursor, crawl_time)
+    if platforms is None:
+        cursor.execute("DELETE FROM rising_items")
+    else:
+        cursor.execute("DELETE FROM rising_items WHERE scope = ANY(%s)", ([OVERALL_SCOPE, *platforms],))
+    if not history:
+        return 0
+
+    item_ids, times, ranks, hot_values = zip(*history)
+    item_ids = np.array(item_ids, dtype=np.int64)
+    times = np.array(times, dtype=np.float64)
+    ranks = np.array(ranks, dtype=np.float64)
+    hot = parse_hot_values(hot_values)
+
+    # 每行所属条目的平台编号和首次抓取时间
+    platform_names, platform_codes = np.unique(
+        np.array([items[item_id][0] for item_id in item_ids], dtype=object).astype(str), return_inverse=True)
+    first_seen = np.array([items[item_id][4] for item_id in item_ids], dtype=np.float64)
+
+    ids, rank_now, rank_before, rank_delta, hot_growth, score = compute_scores(
+        item_ids, times, ranks, hot, platform_codes, first_seen)
+    item_platforms = platform_names[platform_codes[np.searchsorted(item_ids, ids)]]
+    scoped_platforms = None if platforms is None else set(platforms)
+
+    rows = []
+    scopes = [(OVERALL_SCOPE, np.ones(len(ids), dtype=bool))]
+    scopes += [(platform_id, item_platforms == platform_id) for platform_id in platform_names
+               if scoped_platforms is None or platform_id in scoped_platforms]
+    for scope, mask in scopes:
+        candidates = np.flatnonzero(mask & (score > 0))
+        # 按得分从高到低取前 top_k 条
+        top = candidates[np.argsort(-score[candidates], kind='stable')[:top_k]]
+        for position, index in enumerate(top, start=1):
+            platform_id, title, url, hot_value, _ = items[int(ids[index])]
+            rows.append((
+                scope, position, int(ids[index]), platform_id, title, url,
+                int(rank_now[index]), _value(rank_before[index], int), _value(rank_delta[index], int),
+                hot_value, _value(hot_growth[index], float), float(score[index]), crawl_time,
+            ))
+
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO rising_items
+                (scope, position, news_item_id, platform_id, title, url, rank, previous_rank,
+                 rank_delta, hot_value, hot_growth, score, crawl_time)
+            VALUES %s
+        """, rows)
+    return len(rows)
+
+def get_database_connection():
+    """获取数据库连接"""
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        raise ValueError("DATABASE_URL 环境变量未设置")
+    return psycopg2.connect(db_url)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='按最近一次抓取重新计算 TrendRadar 飙升榜')
+    parser.add_argument('--top-k', type=int, default=RISING_TOP_K, help='每个平台 / 全站保留的条目数')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print(f"开始计算飙升榜 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(crawl_time) FROM crawl_records")
+        crawl_time = cursor.fetchone()[0]
+        if crawl_time is None:
+            print("⚠️ 还没有抓取记录")
+            sys.exit(0)
+        count = refresh_rising(cursor, crawl_time, top_k=args.top_k)
+        conn.commit()
+        print(f"✓ 飙升榜: 写入 {count} 条（抓取时间 {crawl_time}）")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 计算失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+TrendRadar 趋势汇总表维护
+按平台维护小时 / 天两级汇总（platform_stats_hourly / platform_stats_daily），
+趋势查询只需读取 天数 × 平台数 行，不必扫描 rank_history
+
+使用方法:
+    python rollups.py --backfill            # 回填全部历史
+    python rollups.py --backfill --days 30  # 只回填最近 30 天
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+import psycopg2
+
+# 按天汇总时使用的时区
+ROLLUP_TIMEZONE = 'Asia/Shanghai'
+
+HOURLY_SQL = """
+    INSERT INTO platform_stats_hourly
+        (platform_id, bucket, item_count, new_items, observations, avg_rank, updated_at)
+    SELECT
+        n.platform_id,
+        date_trunc('hour', rh.crawl_time) AS bucket,
+        COUNT(DISTINCT rh.news_item_id),
+        COUNT(DISTINCT rh.news_item_id) FILTER (
+            WHERE n.first_crawl_time >= date_trunc('hour', rh.crawl_time)
+            AND n.first_crawl_time < date_trunc('hour', rh.crawl_time) + INTERVAL '1 hour'
+        ),
+        COUNT(*),
+        AVG(rh.rank),
+        NOW()
+    FROM rank_history rh
+    JOIN news_items n ON n.id = rh.news_item_id
+    WHERE rh.crawl_time >= date_trunc('hour', %(start)s::timestamptz)
+    AND rh.crawl_time < date_trunc('hour', %(end)s::timestamptz) + INTERVAL '1 hour'
+    GROUP BY 1, 2
+    ON CONFLICT (platform_id, bucket) DO UPDATE SET
+        item_count = EXCLUDED.item_count,
+        new_items = EXCLUDED.new_items,
+        observations = EXCLUDED.observations,
+        avg_rank = EXCLUDED.avg_rank,
+        updated_at = EXCLUDED.updated_at
+"""
+
+DAILY_SQL = """
+    INSERT INTO platform_stats_daily
+        (platform_id, day, item_count, new_items, observations, avg_rank, updated_at)
+    SELECT
+        n.platform_id,
+        (rh.crawl_time AT TIME ZONE %(tz)s)::date AS day,
+        COUNT(DISTINCT rh.news_item_id),
+        COUNT(DISTINCT rh.news_item_id) FILTER (
+            WHERE (n.first_crawl_time AT TIME ZONE %(tz)s)::date = (rh.crawl_time AT TIME ZONE %(tz)s)::date
+        ),
+        COUNT(*),
+        AVG(rh.rank),
+        NOW()
+    FROM rank_history rh
+    JOIN news_items n ON n.id = rh.news_item_id
+    WHERE rh.crawl_time >= ((%(start)s::timestamptz AT TIME ZONE %(tz)s)::date)::timestamp AT TIME ZONE %(tz)s
+    AND rh.crawl_time < ((%(end)s::timestamptz AT TIME ZONE %(tz)s)::date + 1)::timestamp AT TIME ZONE %(tz)s
+    GROUP BY 1, 2
+    ON CONFLICT (platform_id, day) DO UPDATE SET
+        item_count = EXCLUDED.item_count,
+        new_items = EXCLUDED.new_items,
+        observations = EXCLUDED.observations,
+        avg_rank = EXCLUDED.avg_rank,
+        updated_at = EXCLUDED.updated_at
+"""
+
+def refresh_rollups(cursor, start, end=None):
+    """
+    重新计算覆盖 [start, end] 的所有小时 / 天汇总行
+    每次抓取结束时传入本次抓取时间，只重算当前小时和当天，开销与历史长度无关
+    """
+    params = {'start': start, 'end': end or start, 'tz': ROLLUP_TIMEZONE}
+    cursor.execute(HOURLY_SQL, params)
+    cursor.execute(DAILY_SQL, params)
+
+def get_database_connection():
+    """获取数据库连接"""
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        raise ValueError("DATABASE_URL 环境变量未设置")
+    return psycopg2.connect(db_url)
+
+# 回填时检查每天的数据是否完整：该天每次抓取写入的排名历史中，仍能关联到 news_items 的行数
+# 不少于抓取记录的 total_items。汇总需要从 news_items 取平台，news_items 的保留期（1 天）
+# 远短于排名历史，条目被清理后的日期只能得到部分计数
+COVERAGE_SQL = """
+    SELECT
+        (r.crawl_time AT TIME ZONE %(tz)s)::date AS day,
+        BOOL_AND(COALESCE(h.row_count, 0) >= r.total_items) AS complete
+    FROM crawl_records r
+    LEFT JOIN (
+        SELECT rh.crawl_time, COUNT(*) AS row_count
+        FROM rank_history rh
+        JOIN news_items n ON n.id = rh.news_item_id
+        WHERE rh.crawl_time >= %(since)s
+        GROUP BY rh.crawl_time
+    ) h ON h.crawl_time = r.crawl_time
+    WHERE r.crawl_time >= %(since)s
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+def backfill(conn, days=None):
+    """
+    按天（ROLLUP_TIMEZONE 的自然日）回填汇总表，每天单独提交，避免长事务
+    排名历史或对应的新闻条目已被保留期部分清理的天会跳过，不用不完整的数据覆盖已有的汇总行
+    """
+    cursor = conn.cursor()
+    tz = ZoneInfo(ROLLUP_TIMEZONE)
+
+    try:
+        cursor.execute("SELECT MIN(crawl_time), MAX(crawl_time) FROM crawl_records")
+        since, last = cursor.fetchone()
+        if last is None:
+            print("  没有抓取记录需要汇总")
+            return
+
+        if days:
+            first_day = last.astimezone(tz).date() - timedelta(days=days - 1)
+            since = datetime.combine(first_day, time(), tzinfo=tz)
+
+        cursor.execute(COVERAGE_SQL, {'since': since, 'tz': ROLLUP_TIMEZONE})
+        coverage = cursor.fetchall()
+
+        total_days = 0
+        skipped_days = 0
+        for day, complete in coverage:
+            if not complete:
+                skipped_days += 1
+                print(f"  ⚠️  {day.strftime('%Y-%m-%d')} 排名历史或新闻条目不完整（已被清理），跳过")
+                continue
+
+            day_start = datetime.combine(day, time(), tzinfo=tz)
+            day_end = day_start + timedelta(days=1) - timedelta(microseconds=1)
+            refresh_rollups(cursor, day_start, day_end)
+            conn.commit()
+            total_days += 1
+            print(f"  ✓ {day.strftime('%Y-%m-%d')} 汇总完成")
+
+        print(f"✓ 回填完成，共处理 {total_days} 天，跳过 {skipped_days} 天")
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='维护 TrendRadar 趋势汇总表')
+    parser.add_argument('--backfill', action='store_true', help='根据 rank_history 回填汇总表')
+    parser.add_argument('--days', type=int, default=None, help='只回填最近 N 天')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    if not args.backfill:
+        print("请指定 --backfill")
+        sys.exit(1)
+
+    print(f"开始回填汇总表 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    conn = get_database_connection()
+    try:
+        backfill(conn, args.days)
+    except Exception as e:
+        print(f"❌ 回填失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        conn.close()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+TrendRadar RSS 抓取
+从 rss_feeds 读取启用的订阅源，并发抓取后写入 rss_items：
+- 按订阅源带上条件请求头（ETag / Last-Modified），返回 304 或条目没有变化时跳过写库
+- RSS 2.0 / Atom 都用 iterparse 逐个条目解析，处理完的元素立即清除，大订阅源不会构建完整 DOM
+- 丢弃超过订阅源 max_age_days 的条目，同一订阅源内按 guid 去重后批量 upsert，
+  内容没有变化的已有条目不会被重写
+
+使用方法:
+    python rss_ingest.py                        # 抓取全部启用的订阅源
+    python rss_ingest.py --feeds hn,solidot     # 只抓取指定订阅源（逗号分隔）
+    python rss_ingest.py --parse-workers 4      # 在 4 个解析进程中解析
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from urllib.parse import urlparse
+import xml.etree.ElementTree as ET
+import psycopg2
+from psycopg2.extras import execute_values
+
+try:
+    import http_client
+    from pipeline import QUEUE_SIZE, run_pipeline
+    from board_cache import BoardCache, CACHE_DIR, UNCHANGED
+except ImportError:
+    print("请安装依赖: pip install httpx")
+    sys.exit(1)
+
+RSS_CACHE_FILE = 'rss.json'
+
+RSS_MAX_PER_HOST = 4        # 每个主机的最大并发请求数
+RSS_RUN_TIMEOUT = 60        # 整次运行的超时时间（秒）
+RSS_PARSE_WORKERS = 0       # 解析进程数，0 表示在事件循环中直接解析
+RSS_TIMEOUT = 15            # 单个订阅源的请求超时（秒）
+RSS_RETRIES = 1
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; TrendRadar-Dashboard RSS)',
+    'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8',
+}
+
+# 计算内容哈希时使用的条目字段（条目没有变化时跳过写库）
+RSS_FIELDS = ('guid', 'title', 'link', 'published_at')
+
+# 条目元素（RSS 的 item、Atom 的 entry）
+ENTRY_TAGS = {'item', 'entry'}
+
+def get_database_connection():
+    """获取数据库连接"""
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        raise ValueError("DATABASE_URL 环境变量未设置")
+    return psycopg2.connect(db_url)
+
+def local_name(tag):
+    """去掉命名空间：{http://www.w3.org/2005/Atom}entry -> entry"""
+    return tag.rsplit('}', 1)[-1]
+
+def parse_date(text):
+    """解析 RFC 822（RSS）或 ISO 8601（Atom）时间，无法解析时返回 None"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        value = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def parse_entry(elem):
+    """把一个 item / entry 元素解析成条目"""
+    fields = {}
+    link = None
+
+    for child in elem:
+        name = local_name(child.tag)
+        text = (child.text or '').strip()
+
+        if name == 'link':
+            # Atom 的链接在 href 属性中，优先使用 rel="alternate"
+            href = child.get('href')
+            if href is None:
+                link = link or text
+            elif child.get('rel', 'alternate') == 'alternate':
+                link = href
+            else:
+                link = link or href
+        elif name == 'author':
+            # Atom 的作者在 <name> 子元素中
+            author_name = next((c.text for c in child if local_name(c.tag) == 'name'), None)
+            fields.setdefault('author', (author_name or text).strip())
+        elif text:
+            fields.setdefault(name, text)
+
+    published = (fields.get('pubDate') or fields.get('published')
+                 or fields.get('updated') or fields.get('date'))
+    link = link or ''
+    title = fields.get('title', '')
+    guid = fields.get('guid') or fields.get('id') or link or title
+
+    return {
+        'guid': guid,
+        'title': title,
+        'link': link,
+        'published_at': parse_date(published),
+        'summary': fields.get('description') or fields.get('summary'),
+        'content': fields.get('encoded') or fields.get('content'),
+        'author': fields.get('author') or fields.get('creator'),
+    }
+
+def parse_feed(feed_id, content, max_ages=None):
+    """
+    解析 RSS / Atom 内容（模块级函数，可在解析进程中执行）
+    max_ages 为 {feed_id: max_age_days}，丢弃过期条目；同一 guid 只保留第一次出现的条目
+    """
+    max_age_days = (max_ages or {}).get(feed_id)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days) if max_age_days else None
+
+    items = {}
+    for _, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+        if local_name(elem.tag) not in ENTRY_TAGS:
+            continue
+
+        item = parse_entry(elem)
+        # 条目处理完立即释放子元素，内存占用不随订阅源大小增长
+        elem.clear()
+
+        if not item['guid']:
+            continue
+        if cutoff and item['published_at'] and item['published_at'] < cutoff:
+            continue
+        items.setdefault(item['guid'], item)
+
+    return list(items.values())
+
+def load_feeds(conn, selected=None):
+    """读取启用的订阅源：[(id, name, url, max_age_days)]"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, name, url, max_age_days
+        FROM rss_feeds
+        WHERE enabled
+        ORDER BY id
+    """)
+    feeds = cursor.fetchall()
+    cursor.close()
+    conn.rollback()
+
+    if selected:
+        feed_ids = {feed_id.strip() for feed_id in selected.split(',') if feed_id.strip()}
+        feeds = [feed for feed in feeds if feed[0] in feed_ids]
+    return feeds
+
+def upsert_items(conn, feed_id, items):
+    """批量写入订阅源条目，返回 (新增数, 更新数)；内容没有变化的已有条目不更新"""
+    cursor = conn.cursor()
+
+    try:
+        rows = execute_values(cursor, """
+            INSERT INTO rss_items
+                (feed_id, guid, title, link, published_at, summary, content, author)
+            VALUES %s
+            ON CONFLICT (feed_id, guid) DO UPDATE SET
+                title = EXCLUDED.title,
+                link = EXCLUDED.link,
+                published_at = EXCLUDED.published_at,
+                summary = EXCLUDED.summary,
+                content = EXCLUDED.content,
+                author = EXCLUDED.author
+            WHERE (rss_items.title, rss_items.link, rss_items.published_at,
+                   rss_items.summary, rss_items.content, rss_items.author)
+            IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.link, EXCLUDED.published_at,
+                              EXCLUDED.summary, EXCLUDED.content, EXCLUDED.author)
+            RETURNING (xmax = 0)
+        """, [
+            (feed_id, item['guid'], item['title'], item['link'], item['published_at'],
+             item['summary'], item['content'], item['author'])
+            for item in items
+        ], fetch=True)
+        conn.commit()
+
+        inserted = sum(1 for (is_insert,) in rows if is_insert)
+        return inserted, len(rows) - inserted
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+async def fetch_feed(client, semaphores, cache, feed_id, url):
+    """请求订阅源，返回原始内容；服务端返回 304 时返回 UNCHANGED"""
+    host = urlparse(url).netloc
+    headers = {**HEADERS, **cache.request_headers(feed_id)}
+
+    async with semaphores[host]:
+        response = await http_client.async_get(
+            client, url, headers=headers, timeout=RSS_TIMEOUT, retries=RSS_RETRIES)
+
+    if response.status_code == 304:
+        return UNCHANGED
+    response.raise_for_status()
+    cache.remember(feed_id, response)
+    return response.content
+
+async def ingest_feeds(client, conn, cache, feeds, max_per_host=RSS_MAX_PER_HOST,
+                       run_timeout=RSS_RUN_TIMEOUT, parse_workers=RSS_PARSE_WORKERS, queue_size=QUEUE_SIZE):
+    """
+    并发抓取订阅源并写入数据库
+    返回统计：{'success', 'unchanged', 'failed', 'inserted', 'updated'}
+    """
+    stats = {'success': 0, 'unchanged': 0, 'failed': 0, 'inserted': 0, 'updated': 0}
+    urls = {feed_id: url for feed_id, _, url, _ in feeds}
+    parse = partial(parse_feed, max_ages={feed_id: max_age for feed_id, _, _, max_age in feeds})
+
+    semaphores = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+    # 多个解析结果可能同时到达，数据库连接同一时间只给一个订阅源使用
+    db_lock = asyncio.Lock()
+
+    async def fetch(feed_id):
+        try:
+            return await fetch_feed(client, semaphores, cache, feed_id, urls[feed_id])
+        except Exception as e:
+            print(f"❌ {feed_id} 抓取失败: {e}")
+            return None
+
+    async def handle(feed_id, items):
+        if items == UNCHANGED or (items and cache.is_unchanged(feed_id, items)):
+            stats['unchanged'] += 1
+            return
+        if not isinstance(items, list):
+            # 抓取或解析失败：丢弃缓存，不保存这次响应的校验头，下次完整请求
+            cache.forget(feed_id)
+            stats['failed'] += 1
+            return
+
+        if items:
+            async with db_lock:
+                inserted, updated = await asyncio.to_thread(upsert_items, conn, feed_id, items)
+            stats['inserted'] += inserted
+            stats['updated'] += updated
+            print(f"  ✓ {feed_id}: {len(items)} 条，新增 {inserted} 条，更新 {updated} 条")
+        cache.commit(feed_id, items)
+        stats['success'] += 1
+
+    if parse_workers > 0:
+        abandoned = await run_pipeline(
+            list(urls), fetch, parse, handle, parse_workers, queue_size, run_timeout)
+        if abandoned:
+            print(f"❌ 运行超时（{run_timeout}秒），放弃 {abandoned} 个未完成的订阅源")
+    else:
+        async def fetch_and_parse(feed_id):
+            content = await fetch(feed_id)
+            if not isinstance(content, bytes):
+                return feed_id, content
+            try:
+                return feed_id, parse(feed_id, content)
+            except Exception as e:
+                print(f"❌ {feed_id} 解析失败: {e}")
+                return feed_id, None
+
+        tasks = [asyncio.create_task(fetch_and_parse(feed_id)) for feed_id in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=run_timeout):
+                feed_id, items = await next_done
+                try:
+                    await handle(feed_id, items)
+                except Exception as e:
+                    print(f"❌ {feed_id} 写入失败: {e}")
+
+        except asyncio.TimeoutError:
+            pending = [task for task in tasks if not task.done()]
+            print(f"❌ 运行超时（{run_timeout}秒），放弃 {len(pending)} 个未完成的订阅源")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    stats['failed'] = len(feeds) - stats['success'] - stats['unchanged']
+    return stats
+
+async def ingest_all_feeds(selected=None, max_per_host=RSS_MAX_PER_HOST, run_timeout=RSS_RUN_TIMEOUT,
+                           parse_workers=RSS_PARSE_WORKERS, queue_size=QUEUE_SIZE):
+    """抓取所有启用的订阅源"""
+    print(f"\n{'='*60}")
+    print(f"TrendRadar RSS 抓取")
+    print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+    conn = get_database_connection()
+    feeds = load_feeds(conn, selected)
+    if not feeds:
+        print("没有启用的订阅源")
+        conn.close()
+        return
+
+    cache = BoardCache(os.path.join(CACHE_DIR, RSS_CACHE_FILE), fields=RSS_FIELDS)
+    started = time.perf_counter()
+
+    async with http_client.create_async_client() as client:
+        stats = await ingest_feeds(client, conn, cache, feeds, max_per_host, run_timeout, parse_workers, queue_size)
+
+    conn.close()
+    cache.save()
+
+    print(f"\n{'='*60}")
+    print(f"✓ 抓取完成！{len(feeds)} 个订阅源，成功 {stats['success']}，未变化 {stats['unchanged']}，"
+          f"失败 {stats['failed']}；新增 {stats['inserted']} 条，更新 {stats['updated']} 条，"
+          f"耗时 {time.perf_counter() - started:.1f} 秒")
+    print(f"{'='*60}\n")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='TrendRadar RSS 抓取')
+    parser.add_argument('--feeds', default=None, help='只抓取指定订阅源，逗号分隔（默认全部启用的订阅源）')
+    parser.add_argument('--max-per-host', type=int, default=RSS_MAX_PER_HOST, help='每个主机的最大并发请求数')
+    parser.add_argument('--run-timeout', type=float, default=RSS_RUN_TIMEOUT, help='整次运行的超时时间（秒）')
+    parser.add_argument('--parse-workers', type=int, default=RSS_PARSE_WORKERS,
+                        help='解析进程数，0 表示在事件循环中直接解析')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE, help='等待解析的响应最多排队的数量')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    try:
+        asyncio.run(ingest_all_feeds(
+            args.feeds, args.max_per_host, args.run_timeout, args.parse_workers, args.queue_size))
+    except Exception as e:
+        print(f"❌ RSS 抓取失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
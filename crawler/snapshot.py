@@ -0,0 +1,148 @@
+"""
+TrendRadar 首页快照
+每次抓取结束时把首页需要的数据组装成一个 JSON 文档，写入 dashboard_snapshot 表（只有一行）：
+- 各平台当前热榜的前 N 条、最近 24 小时的条目数和最近一次抓取状态
+- 最新热点列表、全站飙升榜（rising_items）和最近几天的趋势（读取每日汇总表）
+文档预先序列化并计算 ETag，/api/dashboard 只需按主键读取一行，客户端已是最新时返回 304
+"""
+
+import json
+import hashlib
+from datetime import timedelta
+
+from rollups import ROLLUP_TIMEZONE
+
+# 每个平台保留的热榜条数
+SNAPSHOT_TOP_N = 20
+# 最新热点列表条数
+SNAPSHOT_LATEST = 30
+# 飙升榜条数
+SNAPSHOT_RISING = 10
+# 趋势天数
+SNAPSHOT_TREND_DAYS = 7
+# 平台条目数统计的时间范围
+SNAPSHOT_WINDOW = timedelta(hours=24)
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+def _rows(cursor):
+    columns = [column.name for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def build_snapshot(cursor, crawl_time):
+    """组装快照文档"""
+    since = crawl_time - SNAPSHOT_WINDOW
+
+    cursor.execute("""
+        WITH counts AS (
+            SELECT platform_id, COUNT(*) AS item_count, MAX(last_crawl_time) AS board_time
+            FROM news_items
+            WHERE last_crawl_time >= %(since)s
+            GROUP BY platform_id
+        ), status AS (
+            SELECT DISTINCT ON (s.platform_id) s.platform_id, s.status, r.crawl_time
+            FROM crawl_source_status s
+            JOIN crawl_records r ON r.id = s.crawl_record_id
+            WHERE r.crawl_time >= %(since)s
+            ORDER BY s.platform_id, r.crawl_time DESC
+        )
+        SELECT
+            p.id AS platform_id,
+            p.name AS platform_name,
+            COALESCE(c.item_count, 0) AS item_count,
+            c.board_time,
+            st.status,
+            st.crawl_time AS status_time
+        FROM platforms p
+        LEFT JOIN counts c ON c.platform_id = p.id
+        LEFT JOIN status st ON st.platform_id = p.id
+        WHERE p.is_active
+        ORDER BY item_count DESC, p.id
+    """, {'since': since})
+    platforms = _rows(cursor)
+
+    # 当前热榜：每个平台最近一次写入的那批条目，按排名取前 N 条
+    cursor.execute("""
+        SELECT platform_id, id, title, url, rank, hot_value, crawl_count, first_crawl_time, last_crawl_time
+        FROM (
+            SELECT n.*, ROW_NUMBER() OVER (PARTITION BY n.platform_id ORDER BY n.rank, n.id) AS position
+            FROM news_items n
+            JOIN (
+                SELECT platform_id, MAX(last_crawl_time) AS board_time
+                FROM news_items
+                WHERE last_crawl_time >= %(since)s
+                GROUP BY platform_id
+            ) b ON b.platform_id = n.platform_id AND n.last_crawl_time = b.board_time
+        ) t
+        WHERE position <= %(top_n)s
+        ORDER BY platform_id, rank, id
+    """, {'since': since, 'top_n': SNAPSHOT_TOP_N})
+    boards = {}
+    for item in _rows(cursor):
+        boards.setdefault(item.pop('platform_id'), []).append(item)
+    for platform in platforms:
+        platform['items'] = boards.get(platform['platform_id'], [])
+
+    cursor.execute("""
+        SELECT n.id, n.title, n.platform_id, p.name AS platform_name, n.url, n.rank,
+               n.hot_value, n.crawl_count, n.last_crawl_time
+        FROM news_items n
+        LEFT JOIN platforms p ON p.id = n.platform_id
+        ORDER BY n.last_crawl_time DESC, n.id DESC
+        LIMIT %s
+    """, (SNAPSHOT_LATEST,))
+    latest = _rows(cursor)
+
+    cursor.execute("""
+        SELECT r.news_item_id AS id, r.title, r.platform_id, p.name AS platform_name, r.url, r.rank,
+               r.previous_rank, r.rank_delta, r.hot_value, r.hot_growth, r.score
+        FROM rising_items r
+        LEFT JOIN platforms p ON p.id = r.platform_id
+        WHERE r.scope = 'all'
+        ORDER BY r.position
+        LIMIT %s
+    """, (SNAPSHOT_RISING,))
+    rising = _rows(cursor)
+
+    cursor.execute("""
+        SELECT to_char(day, 'YYYY-MM-DD') AS date, platform_id, item_count
+        FROM platform_stats_daily
+        WHERE day > (%s::timestamptz AT TIME ZONE %s)::date - %s
+        ORDER BY day, platform_id
+    """, (crawl_time, ROLLUP_TIMEZONE, SNAPSHOT_TREND_DAYS))
+    trend = {}
+    for row in _rows(cursor):
+        day = trend.setdefault(row['date'], {'date': row['date'], 'count': 0, 'platforms': {}})
+        day['platforms'][row['platform_id']] = row['item_count']
+        day['count'] += row['item_count']
+
+    return {
+        'crawl_time': crawl_time,
+        'total_items': sum(platform['item_count'] for platform in platforms),
+        'platforms': platforms,
+        'latest': latest,
+        'rising': rising,
+        'trend': list(trend.values()),
+    }
+
+def refresh_snapshot(cursor, crawl_time):
+    """重建快照并写入 dashboard_snapshot，返回 (版本号, ETag)；在调用方的事务中执行"""
+    document = json.dumps(build_snapshot(cursor, crawl_time),
+                          ensure_ascii=False, separators=(',', ':'), default=_json_default)
+    etag = hashlib.sha1(document.encode('utf-8')).hexdigest()
+
+    cursor.execute("""
+        INSERT INTO dashboard_snapshot (id, version, etag, document, crawl_time, updated_at)
+        VALUES (1, 1, %s, %s, %s, NOW())
+        ON CONFLICT (id) DO UPDATE SET
+            version = dashboard_snapshot.version + 1,
+            etag = EXCLUDED.etag,
+            document = EXCLUDED.document,
+            crawl_time = EXCLUDED.crawl_time,
+            updated_at = EXCLUDED.updated_at
+        WHERE dashboard_snapshot.etag <> EXCLUDED.etag
+        RETURNING version
+    """, (etag, document, crawl_time))
+    row = cursor.fetchone()
+    return (row[0] if row else None), etag
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+TrendRadar 数据源健康状态
+- 熔断：按数据源主机统计连续失败次数，达到阈值后熔断，冷却期内直接跳过该主机的所有平台；
+  冷却结束后只放行一个探测请求（半开），成功则恢复，失败则以加倍的冷却时间重新熔断
+- 健康评分：按平台记录最近若干次抓取的成功与耗时，计算成功率、平均耗时和评分
+状态保存在本地缓存目录（与热榜缓存相同），在多次运行之间保留
+
+使用方法:
+    python source_health.py     # 查看各数据源和平台的健康状态
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+
+from board_cache import CACHE_DIR
+
+HEALTH_FILE = 'health.json'
+
+# 连续失败多少次后熔断
+FAILURE_THRESHOLD = 3
+# 熔断冷却时间（秒），每次探测失败后加倍，最多 OPEN_COOLDOWN_MAX
+OPEN_COOLDOWN = 600
+OPEN_COOLDOWN_MAX = 6 * 3600
+
+# 每个平台保留的最近抓取记录数
+HEALTH_WINDOW = 20
+# 平均耗时不超过该值（毫秒）时不扣分
+LATENCY_TARGET_MS = 2000
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class SourceHealth:
+    """按主机的熔断器和按平台的健康评分"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, HEALTH_FILE)
+        self.circuits = {}
+        self.platforms = {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.circuits = data.get('circuits', {})
+            self.platforms = data.get('platforms', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  健康状态文件读取失败，忽略: {e}")
+
+    def _circuit(self, host):
+        return self.circuits.setdefault(host, {'state': CLOSED, 'failures': 0, 'trips': 0})
+
+    @staticmethod
+    def _cooldown(circuit):
+        return min(OPEN_COOLDOWN_MAX, OPEN_COOLDOWN * 2 ** max(0, circuit['trips'] - 1))
+
+    def allow(self, host):
+        """是否允许请求该主机；熔断冷却结束后只放行一个探测请求"""
+        circuit = self._circuit(host)
+        now = time.time()
+
+        if circuit['state'] == CLOSED:
+            return True
+
+        if circuit['state'] == OPEN:
+            if now - circuit['opened_at'] < self._cooldown(circuit):
+                return False
+            circuit['state'] = HALF_OPEN
+            circuit['probe_at'] = now
+            return True
+
+        # 半开状态：探测请求未返回前不放行其他请求；探测进程异常退出时，冷却后重新探测
+        if now - circuit.get('probe_at', 0) >= self._cooldown(circuit):
+            circuit['probe_at'] = now
+            return True
+        return False
+
+    def record(self, host, platform_id, ok, latency):
+        """记录一次抓取结果，latency 为耗时（秒）"""
+        circuit = self._circuit(host)
+        now = time.time()
+
+        if ok:
+            if circuit['state'] != CLOSED:
+                print(f"  ✓ {host} 已恢复，解除熔断")
+            circuit.update({'state': CLOSED, 'failures': 0, 'trips': 0})
+        else:
+            circuit['failures'] += 1
+            if circuit['state'] == HALF_OPEN or circuit['failures'] >= FAILURE_THRESHOLD:
+                if circuit['state'] != OPEN:
+                    circuit['trips'] += 1
+                circuit['state'] = OPEN
+                circuit['opened_at'] = now
+                print(f"  ⚠️  {host} 连续失败 {circuit['failures']} 次，"
+                      f"熔断 {self._cooldown(circuit) // 60} 分钟")
+
+        results = self.platforms.setdefault(platform_id, [])
+        results.append([round(now), bool(ok), round(latency * 1000)])
+        del results[:-HEALTH_WINDOW]
+
+    def score(self, platform_id):
+        """平台的健康评分：{'success_rate', 'avg_latency_ms', 'score'}，没有记录时返回 None"""
+        results = self.platforms.get(platform_id)
+        if not results:
+            return None
+
+        success_rate = sum(1 for _, ok, _ in results if ok) / len(results)
+        latencies = [latency for _, ok, latency in results if ok]
+        avg_latency = sum(latencies) / len(latencies) if latencies else None
+        latency_factor = min(1.0, LATENCY_TARGET_MS / avg_latency) if avg_latency else 1.0
+        return {
+            'success_rate': round(success_rate, 3),
+            'avg_latency_ms': round(avg_latency) if avg_latency is not None else None,
+            'score': round(100 * success_rate * latency_factor),
+        }
+
+    def save(self):
+        """原子写入健康状态文件"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'circuits': self.circuits, 'platforms': self.platforms}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"  ⚠️  健康状态文件写入失败: {e}")
+
+def print_report(health):
+    print("数据源:")
+    for host, circuit in sorted(health.circuits.items()):
+        line = f"  {host:<32}{circuit['state']:<12}连续失败 {circuit['failures']}"
+        if circuit['state'] != CLOSED:
+            opened_at = datetime.fromtimestamp(circuit['opened_at']).strftime('%Y-%m-%d %H:%M:%S')
+            line += f"，熔断于 {opened_at}"
+        print(line)
+
+    print("\n平台:")
+    for platform_id in sorted(health.platforms):
+        stats = health.score(platform_id)
+        latency = f"{stats['avg_latency_ms']}ms" if stats['avg_latency_ms'] is not None else '-'
+        print(f"  {platform_id:<16}评分 {stats['score']:>3}  成功率 {stats['success_rate']:.0%}  平均耗时 {latency}")
+
+if __name__ == '__main__':
+    print_report(SourceHealth())
@@ -0,0 +1,85 @@
+"""
+TrendRadar 实时更新通知
+爬虫写入时把变化记入 news_updates 表，并在同一个事务里 NOTIFY，事务提交后监听方才会收到：
+- delta：某个平台本次写入的变化（新上榜、排名变化、掉出榜单的条目）
+- snapshot：首页快照已更新
+通知只携带 news_updates 的 id（NOTIFY 的内容有 8000 字节上限），
+监听方按 id 读取完整内容，断线重连后也可以按 id 补齐错过的更新
+"""
+
+import json
+
+# LISTEN / NOTIFY 频道
+NOTIFY_CHANNEL = 'news_updates'
+# news_updates 保留天数（maintenance.py 清理）
+UPDATES_RETENTION_DAYS = 1
+
+def load_previous_board(cursor, platform_id, crawl_time):
+    """该平台上一次抓取时的榜单：{title: (id, rank)}"""
+    cursor.execute("""
+        SELECT id, title, rank
+        FROM news_items
+        WHERE platform_id = %(platform_id)s
+          AND last_crawl_time = (
+              SELECT MAX(last_crawl_time) FROM news_items
+              WHERE platform_id = %(platform_id)s AND last_crawl_time < %(crawl_time)s
+          )
+    """, {'platform_id': platform_id, 'crawl_time': crawl_time})
+    return {title: (item_id, rank) for item_id, title, rank in cursor.fetchall()}
+
+def build_delta(items, item_ids, previous_board):
+    """
+    比较本批数据与上一次的榜单
+    - new：新上榜的条目（包括之前出现过、重新回到榜单的条目）
+    - moved：两次都在榜、排名变化的条目
+    - dropped：上一次在榜、本次没有抓到的条目
+    """
+    titles = {item['title'] for item in items}
+    delta = {'new': [], 'moved': [], 'dropped': []}
+
+    for item in items:
+        item_id = item_ids.get(item['title'])
+        if item_id is None:
+            continue
+        previous = previous_board.get(item['title'])
+        if previous is None:
+            delta['new'].append({
+                'id': item_id,
+                'title': item['title'],
+                'url': item['url'],
+                'rank': item['rank'],
+                'hot_value': item['hot_value'],
+            })
+        elif previous[1] != item['rank']:
+            delta['moved'].append({
+                'id': item_id,
+                'title': item['title'],
+                'rank': item['rank'],
+                'previous_rank': previous[1],
+            })
+
+    for title, (item_id, rank) in previous_board.items():
+        if title not in titles:
+            delta['dropped'].append({'id': item_id, 'title': title, 'rank': rank})
+
+    return delta
+
+def publish_update(cursor, event, payload, platform_id=None, crawl_time=None):
+    """记录一条更新并通知监听方，在调用方的事务中执行，返回更新 id"""
+    cursor.execute("""
+        INSERT INTO news_updates (event, platform_id, crawl_time, payload)
+        VALUES (%s, %s, %s, %s)
+        RETURNING id
+    """, (event, platform_id, crawl_time,
+          json.dumps(payload, ensure_ascii=False, separators=(',', ':'),
+                     default=lambda value: value.isoformat())))
+    update_id = cursor.fetchone()[0]
+    cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, str(update_id)))
+    return update_id
+
+def publish_delta(cursor, platform_id, crawl_time, delta):
+    """有变化时发布平台增量，返回更新 id；没有变化时返回 None"""
+    if not any(delta.values()):
+        return None
+    payload = {'platform_id': platform_id, 'crawl_time': crawl_time, **delta}
+    return publish_update(cursor, 'delta', payload, platform_id, crawl_time)
@@ -2,28 +2,57 @@
 """
 TrendRadar SQLite 到 Supabase PostgreSQL 数据迁移脚本
 
+按 id 分批读取 SQLite，用 COPY FROM STDIN 写入 PostgreSQL，内存占用与数据量无关：
+- 每批在一个事务中写入并记录进度（migration_progress 表），失败时只丢失当前一批，--resume 从断点继续
+- 新闻先由各文件并行写入暂存表（migration_news_staging），全部暂存后单线程按 (platform_id, title)
+  合并到 news_items；SQLite id 到 PostgreSQL id 的映射从暂存表导出到 ID 映射文件，
+  排名历史和标题变更据此换成新的 news_item_id
+- 可以一次迁移一个目录或通配符匹配的多个每日文件：多个文件并行迁移，每个工作线程使用一个 PostgreSQL 连接，
+  不同日期中的同一条新闻合并为一条
+
 使用方法:
     python migrate_to_supabase.py --sqlite-db output/news/2025-01-27.db --supabase-url https://xxx.supabase.co --supabase-key your-key
+    python migrate_to_supabase.py --sqlite-db output/news/ ... --workers 8              # 迁移目录中的所有 .db 文件
+    python migrate_to_supabase.py --sqlite-db 'output/news/2025-*.db' ...              # 通配符
+    python migrate_to_supabase.py --sqlite-db output/news/ ... --resume                 # 从上次中断处继续
 
 依赖:
     pip install psycopg2-binary python-dotenv
 """
 
+import io
+import os
+import sys
+import glob
+import queue
 import sqlite3
 import argparse
-import os
+import threading
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Sequence
 import psycopg2
 from psycopg2.extras import execute_batch
 
+# SQLite news_items 读取的列（sqlite_id 即 SQLite 中的 id），与暂存表 migration_news_staging 的列一致
+NEWS_COLUMNS = (
+    'sqlite_id', 'title', 'platform_id', 'rank', 'url', 'mobile_url',
+    'first_crawl_time', 'last_crawl_time', 'crawl_count', 'created_at', 'updated_at',
+)
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description='迁移 TrendRadar 数据到 Supabase')
-    parser.add_argument('--sqlite-db', required=True, help='SQLite 数据库文件路径')
+    parser.add_argument('--sqlite-db', required=True,
+                        help='SQLite 数据库文件路径，也可以是目录（迁移其中所有 .db 文件）或通配符')
     parser.add_argument('--supabase-url', required=True, help='Supabase 项目 URL')
     parser.add_argument('--supabase-key', required=True, help='Supabase 服务密钥')
-    parser.add_argument('--batch-size', type=int, default=100, help='批量插入大小')
+    parser.add_argument('--batch-size', type=int, default=100, help='平台和 RSS 订阅源的批量插入大小')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='新闻、排名历史等大表每批迁移的行数')
+    parser.add_argument('--workers', type=int, default=4, help='并行迁移的文件数，也是 PostgreSQL 连接数上限')
+    parser.add_argument('--resume', action='store_true', help='从上次中断处继续迁移')
+    parser.add_argument('--restart', action='store_true', help='清除这些文件的迁移进度，重新迁移')
+    parser.add_argument('--id-map', default=None,
+                        help='ID 映射文件路径（默认 <SQLite 文件>.idmap；:memory: 表示只保存在内存中）')
     return parser.parse_args()
 
 
@@ -80,45 +109,328 @@ def migrate_platforms(sqlite_cursor, pg_cursor, batch_size=100):
     print(f"  ✓ 迁移了 {len(data)} 个平台")
 
 
-def migrate_news_items(sqlite_cursor, pg_cursor, batch_size=100):
-    """迁移新闻数据"""
-    print("迁移新闻数据...")
+def sqlite_has_table(sqlite_cursor, name: str) -> bool:
+    sqlite_cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,))
+    return sqlite_cursor.fetchone() is not None
 
-    sqlite_cursor.execute("""
-        SELECT title, platform_id, rank, url, mobile_url,
-               first_crawl_time, last_crawl_time, crawl_count,
-               created_at, updated_at
-        FROM news_items
+
+def ensure_progress_table(pg_cursor):
+    """迁移进度表：每个源文件每张表已迁移到的 SQLite id，与数据在同一事务中提交"""
+    pg_cursor.execute("""
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            last_id BIGINT NOT NULL DEFAULT 0,
+            rows BIGINT NOT NULL DEFAULT 0,
+            done BOOLEAN NOT NULL DEFAULT FALSE,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, table_name)
+        )
+    """)
+
+
+def load_progress(pg_cursor, source: str) -> Dict[str, tuple]:
+    """{表名: (last_id, rows, done)}"""
+    pg_cursor.execute(
+        "SELECT table_name, last_id, rows, done FROM migration_progress WHERE source = %s", (source,))
+    return {row[0]: row[1:] for row in pg_cursor.fetchall()}
+
+
+def save_progress(pg_cursor, source: str, table: str, last_id: int, rows: int, done: bool = False):
+    pg_cursor.execute("""
+        INSERT INTO migration_progress (source, table_name, last_id, rows, done, updated_at)
+        VALUES (%s, %s, %s, %s, %s, NOW())
+        ON CONFLICT (source, table_name) DO UPDATE SET
+            last_id = EXCLUDED.last_id,
+            rows = EXCLUDED.rows,
+            done = EXCLUDED.done,
+            updated_at = EXCLUDED.updated_at
+    """, (source, table, last_id, rows, done))
+
+
+def reset_progress(pg_cursor, source: str):
+    pg_cursor.execute("DELETE FROM migration_progress WHERE source = %s", (source,))
+
+
+def attach_id_map(sqlite_conn, path: str):
+    """
+    把 SQLite news_items.id -> PostgreSQL news_items.id 的映射附加到源库连接上（库名 idmap），
+    迁移排名历史和标题变更时直接 JOIN；path 为 :memory: 时映射只保存在内存中
+    """
+    sqlite_conn.execute("ATTACH DATABASE ? AS idmap", (path,))
+    sqlite_conn.execute("""
+        CREATE TABLE IF NOT EXISTS idmap.news_item_ids (
+            sqlite_id INTEGER PRIMARY KEY,
+            pg_id INTEGER NOT NULL
+        )
+    """)
+    sqlite_conn.commit()
+
+
+def iter_chunks(sqlite_conn, query: str, start_id: int, chunk_size: int) -> Iterator[list]:
+    """按 id 分批读取（键集分页），query 的第一列为 id，以 "WHERE <id> > ? ORDER BY <id> LIMIT ?" 结尾"""
+    last_id = start_id
+    while True:
+        rows = sqlite_conn.execute(query, (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def copy_value(value) -> str:
+    """COPY 文本格式的字段：None 写为 \\N，转义反斜杠和换行 / 制表符"""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_rows(pg_cursor, table: str, columns: Sequence[str], rows: Iterable[tuple]):
+    """用 COPY FROM STDIN 写入一批行"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    pg_cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def run_chunks(sqlite_conn, pg_conn, source: str, table: str, progress: Dict[str, tuple],
+               query: str, chunk_size: int, write_chunk, label: str) -> int:
+    """
+    分批迁移一张表：每批在一个 PostgreSQL 事务中写入数据并记录进度，失败时只丢失当前一批。
+    write_chunk(pg_cursor, rows) 返回写入的行数
+    """
+    last_id, total, done = progress.get(table, (0, 0, False))
+    if done:
+        print(f"[{label}]   {table} 已完成，跳过（共 {total} 行）")
+        return total
+
+    pg_cursor = pg_conn.cursor()
+    try:
+        for rows in iter_chunks(sqlite_conn, query, last_id, chunk_size):
+            total += write_chunk(pg_cursor, rows)
+            last_id = rows[-1][0]
+            save_progress(pg_cursor, source, table, last_id, total)
+            pg_conn.commit()
+            print(f"[{label}]   ... {table} 已迁移 {total} 行（id <= {last_id}）")
+
+        save_progress(pg_cursor, source, table, last_id, total, done=True)
+        pg_conn.commit()
+    except Exception:
+        pg_conn.rollback()
+        raise
+    finally:
+        pg_cursor.close()
+
+    return total
+
+
+def ensure_staging_table(pg_cursor):
+    """
+    新闻暂存表：各工作线程并行把 SQLite 新闻原样写入这里，再由 merge_staged_news 统一合并到 news_items；
+    pg_id 为合并后对应的 PostgreSQL id，NULL 表示尚未合并
+    """
+    pg_cursor.execute("""
+        CREATE TABLE IF NOT EXISTS migration_news_staging (
+            source TEXT NOT NULL,
+            sqlite_id BIGINT NOT NULL,
+            title TEXT, platform_id TEXT, rank INTEGER, url TEXT, mobile_url TEXT,
+            first_crawl_time TIMESTAMP WITH TIME ZONE, last_crawl_time TIMESTAMP WITH TIME ZONE,
+            crawl_count INTEGER, created_at TIMESTAMP WITH TIME ZONE, updated_at TIMESTAMP WITH TIME ZONE,
+            pg_id BIGINT,
+            PRIMARY KEY (source, sqlite_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_migration_news_staging_pending
+            ON migration_news_staging (platform_id, title) WHERE pg_id IS NULL;
     """)
 
-    news_items = sqlite_cursor.fetchall()
 
-    if not news_items:
-        print("  没有新闻数据需要迁移")
+def stage_news_items(sqlite_conn, pg_conn, source: str, progress: Dict[str, tuple],
+                     chunk_size: int = 5000, label: str = ''):
+    """把新闻原样写入暂存表：不读写 news_items，也不加锁，多个文件可以并行写入"""
+    print(f"[{label}] 暂存新闻数据...")
+
+    def write_chunk(pg_cursor, rows):
+        copy_rows(pg_cursor, 'migration_news_staging', ('source',) + NEWS_COLUMNS,
+                  ((source,) + tuple(row) for row in rows))
+        return len(rows)
+
+    total = run_chunks(sqlite_conn, pg_conn, source, 'news_items', progress, f"""
+        SELECT {', '.join(column if column != 'sqlite_id' else 'id' for column in NEWS_COLUMNS)}
+        FROM news_items
+        WHERE id > ? ORDER BY id LIMIT ?
+    """, chunk_size, write_chunk, label)
+    print(f"[{label}]   ✓ 暂存了 {total} 条新闻")
+
+
+def merge_staged_news(pg_conn):
+    """
+    把暂存表中尚未合并的新闻合并到 news_items，在所有文件暂存完成后单线程执行一次
+    同一 (platform_id, title) 在多个文件或已有数据中出现时合并为一条：
+    first_crawl_time 取最早，last_crawl_time 取最晚，crawl_count 累加，排名和链接取最后一次抓取的值
+    每个平台一个事务：持有与爬虫（db_writer）相同的按平台咨询锁，合并后回填暂存行的 pg_id，中断后重新执行只合并剩余的平台
+    """
+    print("合并新闻数据...")
+    counts = {'inserted': 0, 'merged': 0}
+    pg_cursor = pg_conn.cursor()
+    try:
+        pg_cursor.execute("""
+            SELECT DISTINCT platform_id FROM migration_news_staging
+            WHERE pg_id IS NULL ORDER BY platform_id
+        """)
+        platform_ids = [row[0] for row in pg_cursor.fetchall()]
+
+        for platform_id in platform_ids:
+            pg_cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"news_items:{platform_id}",))
+            pg_cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS migrate_news_merged (
+                    platform_id TEXT, title TEXT, rank INTEGER, url TEXT, mobile_url TEXT,
+                    first_crawl_time TIMESTAMP WITH TIME ZONE, last_crawl_time TIMESTAMP WITH TIME ZONE,
+                    crawl_count INTEGER, created_at TIMESTAMP WITH TIME ZONE
+                ) ON COMMIT DELETE ROWS
+            """)
+
+            # 先合并暂存表内的重复条目
+            pg_cursor.execute("""
+                INSERT INTO migrate_news_merged
+                SELECT
+                    platform_id, title,
+                    (ARRAY_AGG(rank ORDER BY last_crawl_time DESC))[1],
+                    (ARRAY_AGG(COALESCE(url, '') ORDER BY last_crawl_time DESC))[1],
+                    (ARRAY_AGG(COALESCE(mobile_url, '') ORDER BY last_crawl_time DESC))[1],
+                    MIN(first_crawl_time), MAX(last_crawl_time),
+                    SUM(COALESCE(crawl_count, 1)),
+                    MIN(COALESCE(created_at, NOW()))
+                FROM migration_news_staging
+                WHERE platform_id = %s AND pg_id IS NULL
+                GROUP BY platform_id, title
+            """, (platform_id,))
+
+            # 已有条目：合并抓取时间和次数（回填 pg_id 与合并在同一事务中提交，不会重复累加）
+            pg_cursor.execute("""
+                UPDATE news_items n SET
+                    first_crawl_time = LEAST(n.first_crawl_time, m.first_crawl_time),
+                    last_crawl_time = GREATEST(n.last_crawl_time, m.last_crawl_time),
+                    crawl_count = n.crawl_count + m.crawl_count,
+                    rank = CASE WHEN m.last_crawl_time > n.last_crawl_time THEN m.rank ELSE n.rank END,
+                    url = CASE WHEN m.last_crawl_time > n.last_crawl_time THEN m.url ELSE n.url END,
+                    mobile_url = CASE WHEN m.last_crawl_time > n.last_crawl_time THEN m.mobile_url ELSE n.mobile_url END,
+                    updated_at = NOW()
+                FROM migrate_news_merged m
+                WHERE n.platform_id = m.platform_id AND n.title = m.title
+            """)
+            counts['merged'] += pg_cursor.rowcount
+
+            pg_cursor.execute("""
+                INSERT INTO news_items
+                    (title, platform_id, rank, url, mobile_url,
+                     first_crawl_time, last_crawl_time, crawl_count, created_at, updated_at)
+                SELECT
+                    m.title, m.platform_id, m.rank, m.url, m.mobile_url,
+                    m.first_crawl_time, m.last_crawl_time, m.crawl_count, m.created_at, NOW()
+                FROM migrate_news_merged m
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM news_items n
+                    WHERE n.platform_id = m.platform_id AND n.title = m.title
+                )
+                ON CONFLICT DO NOTHING
+            """)
+            counts['inserted'] += pg_cursor.rowcount
+
+            pg_cursor.execute("""
+                UPDATE migration_news_staging s SET pg_id = ids.id
+                FROM (
+                    SELECT m.title, MIN(n.id) AS id
+                    FROM migrate_news_merged m
+                    JOIN news_items n ON n.platform_id = m.platform_id AND n.title = m.title
+                    GROUP BY m.title
+                ) ids
+                WHERE s.platform_id = %s AND s.pg_id IS NULL AND s.title = ids.title
+            """, (platform_id,))
+            pg_conn.commit()
+            print(f"  ... {platform_id} 已合并")
+    except Exception:
+        pg_conn.rollback()
+        raise
+    finally:
+        pg_cursor.close()
+
+    print(f"  ✓ 合并完成（新增 {counts['inserted']} 条，与已有条目合并 {counts['merged']} 条）")
+
+
+def export_id_map(sqlite_conn, pg_conn, source: str, chunk_size: int = 5000):
+    """把暂存表中该文件的 SQLite id -> PostgreSQL id 写入 ID 映射，重复执行时覆盖"""
+    pg_cursor = pg_conn.cursor(name='migration_id_map')
+    try:
+        pg_cursor.execute(
+            "SELECT sqlite_id, pg_id FROM migration_news_staging WHERE source = %s AND pg_id IS NOT NULL",
+            (source,))
+        while True:
+            rows = pg_cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            sqlite_conn.executemany(
+                "INSERT OR REPLACE INTO idmap.news_item_ids (sqlite_id, pg_id) VALUES (?, ?)", rows)
+        sqlite_conn.commit()
+    finally:
+        pg_cursor.close()
+        pg_conn.commit()
+
+
+def drop_staged_news(pg_conn, source: str):
+    """该文件的排名历史和标题变更迁移完成后，删除它的暂存新闻"""
+    pg_cursor = pg_conn.cursor()
+    try:
+        pg_cursor.execute("DELETE FROM migration_news_staging WHERE source = %s", (source,))
+        pg_conn.commit()
+    finally:
+        pg_cursor.close()
+
+
+def migrate_mapped_rows(sqlite_conn, pg_conn, source: str, progress: Dict[str, tuple], table: str,
+                        columns: Sequence[str], chunk_size: int = 5000, label: str = ''):
+    """迁移引用 news_item_id 的表，通过 ID 映射换成 PostgreSQL 中的 id；找不到对应新闻的行跳过"""
+    sqlite_cursor = sqlite_conn.cursor()
+    if not sqlite_has_table(sqlite_cursor, table):
+        print(f"[{label}]   没有 {table} 数据需要迁移")
         return
 
-    # 批量插入
-    execute_batch(
-        pg_cursor,
-        """INSERT INTO news_items
-           (title, platform_id, rank, url, mobile_url,
-            first_crawl_time, last_crawl_time, crawl_count,
-            created_at, updated_at)
-           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-        news_items,
-        page_size=batch_size
-    )
+    skipped = 0
+
+    def write_chunk(pg_cursor, rows):
+        nonlocal skipped
+        mapped = [row[1:] for row in rows if row[1] is not None]
+        skipped += len(rows) - len(mapped)
+        if mapped:
+            copy_rows(pg_cursor, table, ('news_item_id',) + tuple(columns), mapped)
+        return len(mapped)
 
-    print(f"  ✓ 迁移了 {len(news_items)} 条新闻")
+    total = run_chunks(sqlite_conn, pg_conn, source, table, progress, f"""
+        SELECT t.id, m.pg_id, {', '.join(f't.{column}' for column in columns)}
+        FROM {table} t
+        LEFT JOIN idmap.news_item_ids m ON m.sqlite_id = t.news_item_id
+        WHERE t.id > ? ORDER BY t.id LIMIT ?
+    """, chunk_size, write_chunk, label)
 
+    print(f"[{label}]   ✓ 迁移了 {total} 行" + (f"，{skipped} 行找不到对应新闻已跳过" if skipped else ""))
 
-def migrate_rank_history(sqlite_cursor, pg_cursor, batch_size=100):
+
+def migrate_rank_history(sqlite_conn, pg_conn, source: str, progress: Dict[str, tuple],
+                         chunk_size: int = 5000, label: str = ''):
     """迁移排名历史数据"""
-    print("迁移排名历史...")
+    print(f"[{label}] 迁移排名历史...")
+    migrate_mapped_rows(sqlite_conn, pg_conn, source, progress, 'rank_history',
+                        ('rank', 'crawl_time', 'created_at'), chunk_size, label)
+
 
-    # 注意: 需要映射 news_item_id
-    # 这里简化处理，假设 ID 一致或跳过
-    print("  ⚠️  排名历史迁移需要手动处理 ID 映射")
+def migrate_title_changes(sqlite_conn, pg_conn, source: str, progress: Dict[str, tuple],
+                          chunk_size: int = 5000, label: str = ''):
+    """迁移标题变更数据"""
+    print(f"[{label}] 迁移标题变更...")
+    migrate_mapped_rows(sqlite_conn, pg_conn, source, progress, 'title_changes',
+                        ('old_title', 'new_title', 'changed_at'), chunk_size, label)
 
 
 def migrate_rss_data(sqlite_cursor, pg_cursor, batch_size=100):
@@ -155,48 +467,180 @@ def migrate_rss_data(sqlite_cursor, pg_cursor, batch_size=100):
         print(f"  ✓ 迁移了 {len(feeds)} 个 RSS 订阅源")
 
 
+def resolve_sqlite_files(path: str) -> List[str]:
+    """--sqlite-db 可以是单个文件、目录（其中所有 .db 文件）或通配符"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.db')))
+    return sorted(glob.glob(path))
+
+
+def stage_file(sqlite_path: str, pg_conn, args):
+    """第一阶段：把一个 SQLite 文件的新闻写入暂存表"""
+    label = os.path.basename(sqlite_path)
+    source = os.path.abspath(sqlite_path)
+
+    pg_cursor = pg_conn.cursor()
+    if args.restart:
+        reset_progress(pg_cursor, source)
+        pg_cursor.execute("DELETE FROM migration_news_staging WHERE source = %s", (source,))
+    progress = load_progress(pg_cursor, source)
+    pg_conn.commit()
+    pg_cursor.close()
+
+    if progress and not args.resume:
+        raise RuntimeError("该文件已有迁移进度，使用 --resume 继续迁移，或使用 --restart 重新迁移")
+
+    sqlite_conn = sqlite3.connect(sqlite_path)
+    try:
+        stage_news_items(sqlite_conn, pg_conn, source, progress, args.chunk_size, label)
+    finally:
+        sqlite_conn.close()
+
+
+def migrate_file(sqlite_path: str, pg_conn, args):
+    """第三阶段：新闻合并完成后，迁移一个 SQLite 文件的排名历史和标题变更"""
+    label = os.path.basename(sqlite_path)
+    source = os.path.abspath(sqlite_path)
+    id_map_path = args.id_map or f"{sqlite_path}.idmap"
+
+    pg_cursor = pg_conn.cursor()
+    progress = load_progress(pg_cursor, source)
+    pg_conn.commit()
+    pg_cursor.close()
+
+    # ID 映射每次都从暂存表重新生成，续传时不依赖上次留下的映射文件
+    if id_map_path != ':memory:' and os.path.exists(id_map_path):
+        os.remove(id_map_path)
+
+    sqlite_conn = sqlite3.connect(sqlite_path)
+    try:
+        attach_id_map(sqlite_conn, id_map_path)
+        export_id_map(sqlite_conn, pg_conn, source, args.chunk_size)
+        migrate_rank_history(sqlite_conn, pg_conn, source, progress, args.chunk_size, label)
+        migrate_title_changes(sqlite_conn, pg_conn, source, progress, args.chunk_size, label)
+    finally:
+        sqlite_conn.close()
+    drop_staged_news(pg_conn, source)
+
+
+def migration_worker(files: queue.Queue, args, failures: Dict[str, str], migrate):
+    """每个工作线程使用一个 PostgreSQL 连接，依次对队列中的文件执行 migrate(文件, 连接, args)"""
+    pg_conn = get_pg_connection(args.supabase_url, args.supabase_key)
+    try:
+        while True:
+            try:
+                sqlite_path = files.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                migrate(sqlite_path, pg_conn, args)
+                print(f"[{os.path.basename(sqlite_path)}] ✓ 完成")
+            except Exception as e:
+                pg_conn.rollback()
+                failures[sqlite_path] = str(e)
+                print(f"[{os.path.basename(sqlite_path)}] ✗ 迁移失败: {e}")
+    finally:
+        pg_conn.close()
+
+
+def run_workers(sqlite_files: List[str], args, workers: int, migrate) -> Dict[str, str]:
+    """按文件并行执行 migrate，返回 {失败的文件: 错误}；PostgreSQL 连接数不超过 workers"""
+    files = queue.Queue()
+    for sqlite_path in sqlite_files:
+        files.put(sqlite_path)
+    failures = {}
+    threads = [
+        threading.Thread(target=migration_worker, args=(files, args, failures, migrate), daemon=True)
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return failures
+
+
+def report_failures(failures: Dict[str, str]):
+    print("\n" + "=" * 60)
+    print(f"✗ {len(failures)} 个文件迁移失败（已完成的批次已保存，修复问题后使用 --resume 继续）:")
+    for sqlite_path, error in failures.items():
+        print(f"  {sqlite_path}: {error}")
+    print("=" * 60)
+    sys.exit(1)
+
+
 def main():
     args = parse_args()
+    sqlite_files = resolve_sqlite_files(args.sqlite_db)
+    if not sqlite_files:
+        print(f"✗ 没有找到 SQLite 文件: {args.sqlite_db}")
+        sys.exit(1)
+    if args.id_map and args.id_map != ':memory:' and len(sqlite_files) > 1:
+        print("✗ 迁移多个文件时每个文件使用各自的 ID 映射，不能指定 --id-map 文件")
+        sys.exit(1)
+    workers = max(1, min(args.workers, len(sqlite_files)))
 
     print("=" * 60)
     print("TrendRadar 数据迁移工具")
     print("=" * 60)
-    print(f"SQLite 数据库: {args.sqlite_db}")
+    print(f"SQLite 数据库: {args.sqlite_db}（{len(sqlite_files)} 个文件）")
     print(f"Supabase URL: {args.supabase_url}")
+    print(f"并行数: {workers}")
     print("=" * 60)
 
     # 连接数据库
     print("\n连接数据库...")
-    sqlite_conn = sqlite3.connect(args.sqlite_db)
-    sqlite_cursor = sqlite_conn.cursor()
-
     pg_conn = get_pg_connection(args.supabase_url, args.supabase_key)
     pg_cursor = pg_conn.cursor()
 
     try:
+        ensure_progress_table(pg_cursor)
+        ensure_staging_table(pg_cursor)
+        pg_conn.commit()
+
         # 开始迁移
         print("\n开始迁移...\n")
 
-        migrate_platforms(sqlite_cursor, pg_cursor, args.batch_size)
-        migrate_news_items(sqlite_cursor, pg_cursor, args.batch_size)
-        migrate_rss_data(sqlite_cursor, pg_cursor, args.batch_size)
-
-        # 提交事务
+        # 平台和 RSS 订阅源数据量小，先按顺序写入（新闻引用平台），重复执行时覆盖即可
+        for sqlite_path in sqlite_files:
+            sqlite_conn = sqlite3.connect(sqlite_path)
+            try:
+                sqlite_cursor = sqlite_conn.cursor()
+                migrate_platforms(sqlite_cursor, pg_cursor, args.batch_size)
+                migrate_rss_data(sqlite_cursor, pg_cursor, args.batch_size)
+            finally:
+                sqlite_conn.close()
         pg_conn.commit()
 
-        print("\n" + "=" * 60)
-        print("✓ 迁移完成！")
-        print("=" * 60)
-
     except Exception as e:
         print(f"\n✗ 迁移失败: {e}")
         pg_conn.rollback()
         raise
 
     finally:
-        sqlite_conn.close()
         pg_conn.close()
 
+    # 新闻分三个阶段迁移，只有合并阶段需要与爬虫共用的按平台咨询锁，PostgreSQL 连接数不超过 workers：
+    # 1. 按文件并行写入暂存表；2. 单线程把暂存新闻合并到 news_items；3. 按文件并行迁移排名历史和标题变更
+    failures = run_workers(sqlite_files, args, workers, stage_file)
+    if failures:
+        report_failures(failures)
+
+    pg_conn = get_pg_connection(args.supabase_url, args.supabase_key)
+    try:
+        merge_staged_news(pg_conn)
+    finally:
+        pg_conn.close()
+
+    failures = run_workers(sqlite_files, args, workers, migrate_file)
+    if failures:
+        report_failures(failures)
+
+    print("\n" + "=" * 60)
+    print(f"✓ 迁移完成！共 {len(sqlite_files)} 个文件")
+    print("=" * 60)
+
 
 if __name__ == '__main__':
     main()
@@ -1,4 +1,5 @@
-import { useQuery } from '@tanstack/react-query'
+import { useEffect } from 'react'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { api } from '@/lib/api'
 
 export function usePlatforms() {
@@ -24,6 +25,26 @@ export function useNewsByPlatform(platformId: string, limit = 20) {
   })
 }
 
+export function useDashboard() {
+  return useQuery({
+    queryKey: ['dashboard'],
+    queryFn: api.getDashboard,
+    refetchInterval: 300000, // 实时推送不可用时每5分钟重新验证，快照未变化时只传输响应头
+  })
+}
+
+// 收到爬虫推送的更新后让相关查询失效，代替定时轮询
+export function useLiveUpdates() {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    return api.subscribeUpdates({
+      delta: () => queryClient.invalidateQueries({ queryKey: ['news'] }),
+      snapshot: () => queryClient.invalidateQueries({ queryKey: ['dashboard'] }),
+    })
+  }, [queryClient])
+}
+
 export function usePlatformStats(date?: string) {
   return useQuery({
     queryKey: ['stats', 'platforms', date],
@@ -45,6 +66,13 @@ export function useTrendData(days = 7) {
   })
 }
 
+export function useRisingItems(platformId?: string, limit = 20) {
+  return useQuery({
+    queryKey: ['stats', 'rising', platformId, limit],
+    queryFn: () => api.getRisingItems(platformId, limit),
+  })
+}
+
 export function useRSSFeeds() {
   return useQuery({
     queryKey: ['rss', 'feeds'],
@@ -1,4 +1,5 @@
 import { createClient } from '@supabase/supabase-js'
+import type { DashboardSnapshot, NewsDelta, NewsItem } from '../types'
 
 const supabaseUrl = import.meta.env.VITE_SUPABASE_URL || ''
 const supabaseAnonKey = import.meta.env.VITE_SUPABASE_ANON_KEY || ''
@@ -48,19 +49,26 @@ export const api = {
     return data
   },
 
-  async getNewsByDateRange(startDate: string, endDate: string) {
-    const { data, error } = await supabase
-      .from('news_items')
-      .select(`
-        *,
-        platforms (id, name)
-      `)
-      .gte('last_crawl_time', startDate)
-      .lte('last_crawl_time', endDate)
-      .order('last_crawl_time', { ascending: false })
+  // 通过 /api/items 按 (last_crawl_time, id) 键集分页读取，逐页请求直到没有下一页
+  async getNewsByDateRange(startDate: string, endDate: string, fields?: string[]) {
+    const items: Partial<NewsItem>[] = []
+    let cursor: string | null = null
 
-    if (error) throw error
-    return data
+    do {
+      const params = new URLSearchParams({ start: startDate, end: endDate, format: 'json', limit: '1000' })
+      if (fields) params.set('fields', fields.join(','))
+      if (cursor) params.set('cursor', cursor)
+
+      const response = await fetch(`${API_BASE_URL}/items?${params}`)
+      if (!response.ok) throw new Error('Failed to fetch news items')
+      const page = await response.json()
+      if (page.error) throw new Error(page.error)
+
+      items.push(...page.data)
+      cursor = page.next_cursor
+    } while (cursor)
+
+    return items
   },
 
   // 排名历史
@@ -75,6 +83,26 @@ export const api = {
     return data
   },
 
+  // 首页快照：爬虫每次抓取后生成，浏览器通过 ETag 重新验证，未变化时服务器返回 304
+  async getDashboard(): Promise<DashboardSnapshot> {
+    const response = await fetch(`${API_BASE_URL}/dashboard`, { cache: 'no-cache' })
+    if (!response.ok) throw new Error('Failed to fetch dashboard')
+    return response.json()
+  },
+
+  // 实时更新：订阅 /api/events，返回取消订阅的函数；断线后浏览器带 Last-Event-ID 自动重连
+  subscribeUpdates(handlers: { delta?: (delta: NewsDelta) => void; snapshot?: () => void }) {
+    const source = new EventSource(`${API_BASE_URL}/events`)
+    if (handlers.delta) {
+      const onDelta = handlers.delta
+      source.addEventListener('delta', (event) => onDelta(JSON.parse((event as MessageEvent).data)))
+    }
+    if (handlers.snapshot) {
+      source.addEventListener('snapshot', handlers.snapshot)
+    }
+    return () => source.close()
+  },
+
   // 统计分析
   async getPlatformStats(date?: string) {
     const response = await fetch(`${API_BASE_URL}/stats/platforms${date ? `?date=${date}` : ''}`)
@@ -94,6 +122,14 @@ export const api = {
     return response.json()
   },
 
+  async getRisingItems(platformId?: string, limit = 20) {
+    const params = new URLSearchParams({ limit: String(limit) })
+    if (platformId) params.set('platform', platformId)
+    const response = await fetch(`${API_BASE_URL}/stats/rising?${params}`)
+    if (!response.ok) throw new Error('Failed to fetch rising items')
+    return response.json()
+  },
+
   // RSS 相关
   async getRSSFeeds() {
     const response = await fetch(`${API_BASE_URL}/rss/feeds`)
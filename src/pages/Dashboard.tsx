@@ -1,12 +1,14 @@
-import { useLatestNews, usePlatformStats, useTrendData } from '@/hooks/useData'
+import { useDashboard, useLiveUpdates } from '@/hooks/useData'
 import ReactECharts from 'echarts-for-react'
 import { formatRelativeTime, getPlatformColor } from '@/lib/utils'
-import type { NewsItem, PlatformStat, TrendData } from '@/types'
+import type { DashboardPlatform, NewsItem, RisingItem, TrendData } from '@/types'
 
 export default function Dashboard() {
-  const { data: latestNews, isLoading: newsLoading } = useLatestNews(30)
-  const { data: platformStats, isLoading: statsLoading } = usePlatformStats()
-  const { data: trendData, isLoading: trendLoading } = useTrendData(7)
+  const { data: snapshot, isLoading } = useDashboard()
+  useLiveUpdates()
+  const latestNews = snapshot?.latest
+  const platformStats = snapshot?.platforms
+  const trendData = snapshot?.trend
 
   // 平台分布饼图配置
   const platformChartOption = {
@@ -18,8 +20,8 @@ export default function Dashboard() {
         name: '热点数量',
         type: 'pie',
         radius: '50%',
-        data: platformStats?.map((stat: PlatformStat) => ({
-          value: stat.total_items,
+        data: platformStats?.map((stat: DashboardPlatform) => ({
+          value: stat.item_count,
           name: stat.platform_name,
           itemStyle: { color: getPlatformColor(stat.platform_id) },
         })) || [],
@@ -54,7 +56,7 @@ export default function Dashboard() {
     ],
   }
 
-  if (newsLoading || statsLoading || trendLoading) {
+  if (isLoading) {
     return (
       <div className="flex items-center justify-center h-64">
         <div className="text-gray-500">加载中...</div>
@@ -69,7 +71,7 @@ export default function Dashboard() {
         <div className="bg-white rounded-lg shadow p-6">
           <div className="text-sm text-gray-500">总热点数</div>
           <div className="text-3xl font-bold text-gray-900 mt-2">
-            {latestNews?.length || 0}
+            {snapshot?.total_items || 0}
           </div>
         </div>
         <div className="bg-white rounded-lg shadow p-6">
@@ -96,6 +98,46 @@ export default function Dashboard() {
         </div>
       </div>
 
+      {/* 飙升榜（爬虫每次抓取后计算） */}
+      {snapshot?.rising && snapshot.rising.length > 0 && (
+        <div className="bg-white rounded-lg shadow">
+          <div className="px-6 py-4 border-b">
+            <h2 className="text-lg font-semibold text-gray-900">飙升榜</h2>
+          </div>
+          <div className="divide-y">
+            {snapshot.rising.map((item: RisingItem) => (
+              <div key={item.id} className="px-6 py-3 flex items-center justify-between hover:bg-gray-50 transition-colors">
+                <div className="flex items-center space-x-3 min-w-0">
+                  <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-blue-100 text-blue-800">
+                    {item.platform_name || item.platform_id}
+                  </span>
+                  {item.url ? (
+                    <a
+                      href={item.url}
+                      target="_blank"
+                      rel="noopener noreferrer"
+                      className="truncate text-gray-900 hover:text-blue-600"
+                    >
+                      {item.title}
+                    </a>
+                  ) : (
+                    <span className="truncate text-gray-900">{item.title}</span>
+                  )}
+                </div>
+                <div className="ml-4 shrink-0 text-sm">
+                  <span className="text-gray-500">#{item.rank}</span>
+                  {item.rank_delta !== null ? (
+                    item.rank_delta > 0 && <span className="ml-2 text-red-600">↑{item.rank_delta}</span>
+                  ) : (
+                    <span className="ml-2 text-red-600">新</span>
+                  )}
+                </div>
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
       {/* 最新热点列表 */}
       <div className="bg-white rounded-lg shadow">
         <div className="px-6 py-4 border-b">
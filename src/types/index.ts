@@ -49,6 +49,47 @@ export interface TrendData {
   platforms: Record<string, number>
 }
 
+export interface RisingItem {
+  id: number
+  title: string
+  platform_id: string
+  platform_name?: string
+  url: string
+  rank: number
+  previous_rank: number | null
+  rank_delta: number | null
+  hot_value: string
+  hot_growth: number | null
+  score: number
+}
+
+export interface DashboardPlatform {
+  platform_id: string
+  platform_name: string
+  item_count: number
+  board_time: string | null
+  status: string | null
+  status_time: string | null
+  items: NewsItem[]
+}
+
+export interface DashboardSnapshot {
+  crawl_time: string
+  total_items: number
+  platforms: DashboardPlatform[]
+  latest: NewsItem[]
+  rising: RisingItem[]
+  trend: TrendData[]
+}
+
+export interface NewsDelta {
+  platform_id: string
+  crawl_time: string
+  new: Pick<NewsItem, 'id' | 'title' | 'url' | 'rank'>[]
+  moved: (Pick<NewsItem, 'id' | 'title' | 'rank'> & { previous_rank: number })[]
+  dropped: Pick<NewsItem, 'id' | 'title' | 'rank'>[]
+}
+
 export interface RSSFeed {
   id: string
   name: string
@@ -0,0 +1,132 @@
+-- TrendRadar news_items / rank_history 按时间分区迁移（可选）
+-- 在已执行 schema.sql 的数据库上运行一次，把两张表改为按天的范围分区表：
+-- - news_items 按 first_crawl_time 分区（该列写入后不再变化，更新不会在分区之间移动行）
+-- - rank_history 按 crawl_time 分区
+-- 之后由 crawler/maintenance.py 预先创建分区，并按保留期分离 / 归档 / 删除过期分区，
+-- 不再逐行 DELETE
+--
+-- 注意：
+-- - 分区表的主键和唯一索引必须包含分区键，因此 news_items 不再有 (platform_id, title) 唯一约束，
+--   爬虫写入时按平台加咨询锁避免重复插入
+-- - 其他表无法再通过外键引用 news_items(id)，rank_history / keyword_postings / title_changes
+--   的外键被移除，清理过期分区时由 maintenance.py 一并删除对应的行
+-- - 迁移在一个事务中复制现有数据，数据量较大时请在低峰期执行
+
+BEGIN;
+
+-- ============================================
+-- 移除引用 news_items(id) 的外键
+-- ============================================
+ALTER TABLE rank_history DROP CONSTRAINT IF EXISTS rank_history_news_item_id_fkey;
+ALTER TABLE keyword_postings DROP CONSTRAINT IF EXISTS keyword_postings_news_item_id_fkey;
+ALTER TABLE title_changes DROP CONSTRAINT IF EXISTS title_changes_news_item_id_fkey;
+
+DROP VIEW IF EXISTS news_items_with_platform;
+
+-- ============================================
+-- 新闻条目表
+-- ============================================
+ALTER TABLE news_items RENAME TO news_items_unpartitioned;
+
+CREATE TABLE news_items (
+    LIKE news_items_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, first_crawl_time),
+    FOREIGN KEY (platform_id) REFERENCES platforms(id),
+    FOREIGN KEY (topic_id) REFERENCES topics(id) ON DELETE SET NULL
+) PARTITION BY RANGE (first_crawl_time);
+
+-- 序列改为属于新表，删除旧表时保留
+ALTER SEQUENCE news_items_id_seq OWNED BY news_items.id;
+
+-- 兜底分区：时间超出已创建分区范围的行写入这里，保证写入不会失败
+CREATE TABLE news_items_default PARTITION OF news_items DEFAULT;
+
+-- ============================================
+-- 排名历史表
+-- ============================================
+ALTER TABLE rank_history RENAME TO rank_history_unpartitioned;
+
+CREATE TABLE rank_history (
+    LIKE rank_history_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, crawl_time)
+) PARTITION BY RANGE (crawl_time);
+
+ALTER SEQUENCE rank_history_id_seq OWNED BY rank_history.id;
+
+CREATE TABLE rank_history_default PARTITION OF rank_history DEFAULT;
+
+-- ============================================
+-- 按天创建分区（UTC），覆盖现有数据到未来 7 天
+-- ============================================
+DO $$
+DECLARE
+    target RECORD;
+    first_day DATE;
+    day DATE;
+BEGIN
+    FOR target IN
+        SELECT * FROM (VALUES
+            ('news_items', 'news_items_unpartitioned', 'first_crawl_time'),
+            ('rank_history', 'rank_history_unpartitioned', 'crawl_time')
+        ) AS t(parent, source, key_column)
+    LOOP
+        EXECUTE format('SELECT (MIN(%I) AT TIME ZONE ''UTC'')::date FROM %I', target.key_column, target.source)
+            INTO first_day;
+        first_day := LEAST(COALESCE(first_day, CURRENT_DATE), CURRENT_DATE);
+
+        FOR day IN SELECT generate_series(first_day, CURRENT_DATE + 7, INTERVAL '1 day')::date
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                target.parent || '_p' || to_char(day, 'YYYYMMDD'),
+                target.parent,
+                day::text || ' 00:00:00+00',
+                (day + 1)::text || ' 00:00:00+00'
+            );
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- ============================================
+-- 复制数据并删除旧表
+-- ============================================
+INSERT INTO news_items SELECT * FROM news_items_unpartitioned;
+INSERT INTO rank_history SELECT * FROM rank_history_unpartitioned;
+
+DROP TABLE news_items_unpartitioned;
+DROP TABLE rank_history_unpartitioned;
+
+-- ============================================
+-- 索引（在分区表上创建，自动应用到所有分区）
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_news_platform ON news_items(platform_id);
+CREATE INDEX IF NOT EXISTS idx_news_crawl_time ON news_items(last_crawl_time DESC);
+-- /api/items 按 (last_crawl_time, id) 键集分页
+CREATE INDEX IF NOT EXISTS idx_news_crawl_time_id ON news_items(last_crawl_time DESC, id DESC);
+-- 爬虫写入时查询平台上一次的榜单
+CREATE INDEX IF NOT EXISTS idx_news_platform_crawl_time ON news_items(platform_id, last_crawl_time DESC);
+CREATE INDEX IF NOT EXISTS idx_news_title ON news_items USING gin(to_tsvector('simple', title));
+-- 爬虫按 (platform_id, title) 查找已有条目
+CREATE INDEX IF NOT EXISTS idx_news_platform_title ON news_items(platform_id, title);
+CREATE INDEX IF NOT EXISTS idx_news_topic ON news_items(topic_id);
+
+CREATE INDEX IF NOT EXISTS idx_rank_history_news ON rank_history(news_item_id);
+CREATE INDEX IF NOT EXISTS idx_rank_history_time ON rank_history(crawl_time DESC);
+
+-- ============================================
+-- RLS 策略和视图
+-- ============================================
+ALTER TABLE news_items ENABLE ROW LEVEL SECURITY;
+ALTER TABLE rank_history ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow anonymous read access" ON news_items FOR SELECT USING (true);
+CREATE POLICY "Allow anonymous read access" ON rank_history FOR SELECT USING (true);
+
+CREATE OR REPLACE VIEW news_items_with_platform AS
+SELECT
+    n.*,
+    p.name as platform_name
+FROM news_items n
+LEFT JOIN platforms p ON n.platform_id = p.id;
+
+COMMIT;
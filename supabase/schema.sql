@@ -28,6 +28,24 @@ CREATE TABLE IF NOT EXISTS news_items (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 爬虫写入的热度值（早期版本的表没有该列）
+ALTER TABLE news_items ADD COLUMN IF NOT EXISTS hot_value TEXT DEFAULT '';
+
+-- ============================================
+-- 跨平台话题表（近似标题聚类）
+-- ============================================
+CREATE TABLE IF NOT EXISTS topics (
+    id BIGSERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    item_count INTEGER DEFAULT 1,
+    platforms TEXT[] DEFAULT '{}',
+    first_seen TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_seen TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- 条目所属话题
+ALTER TABLE news_items ADD COLUMN IF NOT EXISTS topic_id BIGINT REFERENCES topics(id) ON DELETE SET NULL;
+
 -- ============================================
 -- 标题变更历史表
 -- ============================================
@@ -50,6 +68,20 @@ CREATE TABLE IF NOT EXISTS rank_history (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 每次抓取时的热度值
+ALTER TABLE rank_history ADD COLUMN IF NOT EXISTS hot_value TEXT DEFAULT '';
+
+-- 清理过期新闻时连带删除其排名历史（按时间分区后由 maintenance.py 清理，见 partitioning.sql）
+-- 执行过 partitioning.sql 后 news_items(id) 不再唯一，不能再添加该外键，重新执行本脚本时跳过
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'news_items'::regclass) THEN
+        ALTER TABLE rank_history DROP CONSTRAINT IF EXISTS rank_history_news_item_id_fkey;
+        ALTER TABLE rank_history ADD CONSTRAINT rank_history_news_item_id_fkey
+            FOREIGN KEY (news_item_id) REFERENCES news_items(id) ON DELETE CASCADE;
+    END IF;
+END $$;
+
 -- ============================================
 -- 抓取记录表
 -- ============================================
@@ -70,6 +102,56 @@ CREATE TABLE IF NOT EXISTS crawl_source_status (
     PRIMARY KEY (crawl_record_id, platform_id)
 );
 
+-- ============================================
+-- 平台小时汇总表（爬虫每次运行结束时增量维护）
+-- ============================================
+CREATE TABLE IF NOT EXISTS platform_stats_hourly (
+    platform_id TEXT NOT NULL REFERENCES platforms(id),
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    item_count INTEGER DEFAULT 0,
+    new_items INTEGER DEFAULT 0,
+    observations INTEGER DEFAULT 0,
+    avg_rank REAL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (platform_id, bucket)
+);
+
+-- ============================================
+-- 平台每日汇总表（按 Asia/Shanghai 划分日期）
+-- ============================================
+CREATE TABLE IF NOT EXISTS platform_stats_daily (
+    platform_id TEXT NOT NULL REFERENCES platforms(id),
+    day DATE NOT NULL,
+    item_count INTEGER DEFAULT 0,
+    new_items INTEGER DEFAULT 0,
+    observations INTEGER DEFAULT 0,
+    avg_rank REAL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (platform_id, day)
+);
+
+-- ============================================
+-- 关键词倒排表（新闻入库时分词写入）
+-- ============================================
+CREATE TABLE IF NOT EXISTS keyword_postings (
+    keyword TEXT NOT NULL,
+    news_item_id BIGINT NOT NULL REFERENCES news_items(id) ON DELETE CASCADE,
+    platform_id TEXT NOT NULL,
+    first_seen TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (keyword, news_item_id)
+);
+
+-- ============================================
+-- 关键词每日计数表（按 Asia/Shanghai 划分日期）
+-- ============================================
+CREATE TABLE IF NOT EXISTS keyword_counts (
+    day DATE NOT NULL,
+    keyword TEXT NOT NULL,
+    item_count INTEGER DEFAULT 0,
+    platforms TEXT[] DEFAULT '{}',
+    PRIMARY KEY (day, keyword)
+);
+
 -- ============================================
 -- 推送记录表
 -- ============================================
@@ -115,6 +197,50 @@ CREATE TABLE IF NOT EXISTS rss_items (
     UNIQUE(feed_id, guid)
 );
 
+-- ============================================
+-- 首页快照表（只有一行，爬虫每次运行结束时重建，/api/dashboard 直接返回）
+-- ============================================
+CREATE TABLE IF NOT EXISTS dashboard_snapshot (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 1,
+    etag TEXT NOT NULL,
+    document TEXT NOT NULL,
+    crawl_time TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================
+-- 飙升榜（爬虫每次运行结束时根据 rank_history 重新计算）
+-- ============================================
+CREATE TABLE IF NOT EXISTS rising_items (
+    scope VARCHAR(50) NOT NULL,          -- 平台 ID，'all' 表示全站
+    position INTEGER NOT NULL,
+    news_item_id BIGINT NOT NULL,
+    platform_id VARCHAR(50) NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    rank INTEGER NOT NULL,
+    previous_rank INTEGER,
+    rank_delta INTEGER,
+    hot_value TEXT,
+    hot_growth DOUBLE PRECISION,         -- 热度每小时增长率
+    score DOUBLE PRECISION NOT NULL,     -- 指数衰减的趋势分
+    crawl_time TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (scope, position)
+);
+
+-- ============================================
+-- 实时更新表（爬虫写入时记录，通过 NOTIFY news_updates 通知 /api/events）
+-- ============================================
+CREATE TABLE IF NOT EXISTS news_updates (
+    id BIGSERIAL PRIMARY KEY,
+    event VARCHAR(20) NOT NULL,          -- delta / snapshot
+    platform_id VARCHAR(50),
+    crawl_time TIMESTAMP WITH TIME ZONE,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- ============================================
 -- 索引定义
 -- ============================================
@@ -124,22 +250,50 @@ CREATE INDEX IF NOT EXISTS idx_news_platform ON news_items(platform_id);
 
 -- 时间索引
 CREATE INDEX IF NOT EXISTS idx_news_crawl_time ON news_items(last_crawl_time DESC);
+-- /api/items 按 (last_crawl_time, id) 键集分页
+CREATE INDEX IF NOT EXISTS idx_news_crawl_time_id ON news_items(last_crawl_time DESC, id DESC);
+-- 爬虫写入时查询平台上一次的榜单
+CREATE INDEX IF NOT EXISTS idx_news_platform_crawl_time ON news_items(platform_id, last_crawl_time DESC);
 
 -- 标题索引
 CREATE INDEX IF NOT EXISTS idx_news_title ON news_items USING gin(to_tsvector('simple', title));
 
--- URL 唯一索引
-CREATE UNIQUE INDEX IF NOT EXISTS idx_news_url_platform
-    ON news_items(url, platform_id) WHERE url != '';
+-- 平台 + 标题唯一索引（爬虫按该键增量写入）、URL 唯一索引
+-- 分区表的唯一索引必须包含分区键，执行过 partitioning.sql 后跳过（写入时改用咨询锁去重）
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'news_items'::regclass) THEN
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_news_platform_title
+            ON news_items(platform_id, title);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_news_url_platform
+            ON news_items(url, platform_id) WHERE url != '';
+    END IF;
+END $$;
 
 -- 排名历史索引
 CREATE INDEX IF NOT EXISTS idx_rank_history_news ON rank_history(news_item_id);
 CREATE INDEX IF NOT EXISTS idx_rank_history_time ON rank_history(crawl_time DESC);
 
+-- 汇总表索引（趋势查询按时间范围读取）
+CREATE INDEX IF NOT EXISTS idx_stats_hourly_bucket ON platform_stats_hourly(bucket DESC);
+CREATE INDEX IF NOT EXISTS idx_stats_daily_day ON platform_stats_daily(day DESC);
+
+-- 话题索引
+CREATE INDEX IF NOT EXISTS idx_news_topic ON news_items(topic_id);
+CREATE INDEX IF NOT EXISTS idx_topics_last_seen ON topics(last_seen DESC);
+
+-- 关键词索引
+CREATE INDEX IF NOT EXISTS idx_keyword_postings_item ON keyword_postings(news_item_id);
+CREATE INDEX IF NOT EXISTS idx_keyword_postings_platform ON keyword_postings(platform_id, first_seen DESC);
+CREATE INDEX IF NOT EXISTS idx_keyword_counts_top ON keyword_counts(day, item_count DESC);
+
 -- RSS 索引
 CREATE INDEX IF NOT EXISTS idx_rss_items_feed ON rss_items(feed_id);
 CREATE INDEX IF NOT EXISTS idx_rss_items_published ON rss_items(published_at DESC);
 
+-- 实时更新清理
+CREATE INDEX IF NOT EXISTS idx_news_updates_created ON news_updates(created_at);
+
 -- ============================================
 -- RLS (Row Level Security) 策略
 -- ============================================
@@ -150,13 +304,42 @@ ALTER TABLE news_items ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rank_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rss_feeds ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rss_items ENABLE ROW LEVEL SECURITY;
+ALTER TABLE platform_stats_hourly ENABLE ROW LEVEL SECURITY;
+ALTER TABLE platform_stats_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE keyword_postings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE keyword_counts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE topics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE dashboard_snapshot ENABLE ROW LEVEL SECURITY;
+ALTER TABLE news_updates ENABLE ROW LEVEL SECURITY;
+ALTER TABLE rising_items ENABLE ROW LEVEL SECURITY;
 
--- 允许匿名读取
+-- 允许匿名读取（先删除再创建，脚本可以重复执行）
+DROP POLICY IF EXISTS "Allow anonymous read access" ON platforms;
 CREATE POLICY "Allow anonymous read access" ON platforms FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON news_items;
 CREATE POLICY "Allow anonymous read access" ON news_items FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON rank_history;
 CREATE POLICY "Allow anonymous read access" ON rank_history FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON rss_feeds;
 CREATE POLICY "Allow anonymous read access" ON rss_feeds FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON rss_items;
 CREATE POLICY "Allow anonymous read access" ON rss_items FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON platform_stats_hourly;
+CREATE POLICY "Allow anonymous read access" ON platform_stats_hourly FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON platform_stats_daily;
+CREATE POLICY "Allow anonymous read access" ON platform_stats_daily FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON keyword_postings;
+CREATE POLICY "Allow anonymous read access" ON keyword_postings FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON keyword_counts;
+CREATE POLICY "Allow anonymous read access" ON keyword_counts FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON topics;
+CREATE POLICY "Allow anonymous read access" ON topics FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON dashboard_snapshot;
+CREATE POLICY "Allow anonymous read access" ON dashboard_snapshot FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON news_updates;
+CREATE POLICY "Allow anonymous read access" ON news_updates FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow anonymous read access" ON rising_items;
+CREATE POLICY "Allow anonymous read access" ON rising_items FOR SELECT USING (true);
 
 -- ============================================
 -- 视图定义